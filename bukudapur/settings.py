@@ -43,10 +43,15 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # kompres HTML/JSON/CSV (juga respons streaming); static sudah .gz/.br dari WhiteNoise.
+    # Django menambah padding acak ke body gzip (mitigasi BREACH untuk halaman ber-token CSRF)
+    "django.middleware.gzip.GZipMiddleware",
+    "core.middleware.PerfMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    "core.middleware.ActiveContractMiddleware",
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -55,7 +60,7 @@ ROOT_URLCONF = 'bukudapur.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.perf.TimedDjangoTemplates',  # DjangoTemplates + waktu render untuk PerfMiddleware
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,13 +86,17 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
 
+# ASGI=1: jalan di worker uvicorn (lihat Procfile). Koneksi ORM async dibuka per request
+# di thread terpisah, jadi koneksi persisten dimatikan agar tidak menumpuk.
+ASGI = os.getenv("ASGI", "0") == "1"
+
 if DATABASE_URL:
     # Railway/Postgres
     import dj_database_url
     DATABASES = {
         "default": dj_database_url.parse(
             DATABASE_URL,
-            conn_max_age=600,
+            conn_max_age=0 if ASGI else 600,
             ssl_require=True,
         )
     }
@@ -101,6 +110,29 @@ else:
     }
 
 
+# Cache (kontrak aktif + fragmen dashboard). Multi-worker sebaiknya pakai backend bersama:
+# CACHE_BACKEND=locmem (default) | file (CACHE_LOCATION = folder) | redis (CACHE_LOCATION = redis://..., butuh paket redis)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem").strip().lower()
+_CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "bukudapur"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
+_backend, _location = _CACHE_BACKENDS[CACHE_BACKEND]
+
+CACHES = {
+    "default": {
+        "BACKEND": _backend,
+        "LOCATION": os.getenv("CACHE_LOCATION", _location),
+    }
+}
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv("FRAGMENT_CACHE_TIMEOUT", str(60 * 60)))  # detik
+
+
+# index INCLUDE (covering) hanya berlaku di PostgreSQL; di SQLite lokal kolomnya diabaikan
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -137,12 +169,39 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    # nama file ber-hash + salinan .gz/.br (lihat core/storage.py); jalankan collectstatic saat deploy
+    "staticfiles": {"BACKEND": "core.storage.StaticStorage"},
+}
+# file ber-hash selalu di-cache 10 tahun (immutable); ini untuk file tanpa hash
+WHITENOISE_MAX_AGE = int(os.getenv("WHITENOISE_MAX_AGE", "3600"))
 
 import os
 
 ACCESS_CODE = os.getenv("ACCESS_CODE", "demo")
-PIN_HASH = os.getenv("PIN_HASH", "")  # nanti kita isi hash
+PIN_HASH = os.getenv("PIN_HASH", "")  # buat dengan: python manage.py hash_pin
+PIN_HASH_ITERATIONS = int(os.getenv("PIN_HASH_ITERATIONS", "600000"))  # biaya PBKDF2-SHA256
+LOGIN_MAX_ATTEMPTS = int(os.getenv("LOGIN_MAX_ATTEMPTS", "5"))  # gagal login per IP / access code ...
+LOGIN_WINDOW_SECONDS = int(os.getenv("LOGIN_WINDOW_SECONDS", "300"))  # ... dalam jendela ini
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))  # 1 di belakang proxy Railway
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "60"))  # baris per halaman History
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))  # baris per bulk_create saat import
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))  # baris per fetch saat export
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024  # XLSX di atas ini ditulis ke disk, bukan RAM
+ALERT_MARGIN_DAYS = int(os.getenv("ALERT_MARGIN_DAYS", "3"))  # alert jika N hari di bawah target margin ...
+ALERT_MARGIN_WINDOW = int(os.getenv("ALERT_MARGIN_WINDOW", "3"))  # ... dari M hari input terakhir
+ALERT_COST_SPIKE_WINDOW = int(os.getenv("ALERT_COST_SPIKE_WINDOW", "7"))  # rata-rata biaya/porsi N hari sebelumnya
+ALERT_COST_SPIKE_PCT = int(os.getenv("ALERT_COST_SPIKE_PCT", "30"))  # alert jika naik lebih dari ini (%)
+ALERT_AR_OVERDUE_MIN = int(os.getenv("ALERT_AR_OVERDUE_MIN", "0"))  # Rupiah; piutang lewat tempo di atas ini
+LEDGER_SNAPSHOT_EVERY = int(os.getenv("LEDGER_SNAPSHOT_EVERY", "500"))  # event jurnal per snapshot (batas replay)
+PERF_ENABLED = os.getenv("PERF_ENABLED", "1") == "1"  # query/latency per request -> /debug/perf/
+PERF_BUFFER_SIZE = int(os.getenv("PERF_BUFFER_SIZE", "5000"))  # jumlah request terakhir yang disimpan
+PERF_LOG = os.getenv("PERF_LOG", "0") == "1"  # 1 = tulis satu baris JSON per request ke logger core.perf
 SESSION_COOKIE_AGE = 60 * 60 * 12  # 12 jam
+# cached_db: cek login dari cache, tabel sesi hanya saat cache miss.
+# signed_cookies: tanpa DB sama sekali (isi sesi cuma flag login, ditandatangani SECRET_KEY).
+SESSION_ENGINE = "django.contrib.sessions.backends." + os.getenv("SESSION_BACKEND", "cached_db")
 SESSION_COOKIE_SECURE = False  # nanti True di production (HTTPS)
 CSRF_COOKIE_SECURE = False     # nanti True di production
 
@@ -0,0 +1,172 @@
+"""Early-warning rules, kept up to date on every ledger write.
+
+core/ledger.py calls evaluate() in the same transaction as the write. Each
+rule only looks at a bounded window (the last few entries, or the overdue
+credit rows via the due-date index), and the outcome is stored in Alert:
+one row per (contract, rule, key), switched on/off as the rule fires or
+clears. The dashboard then just reads the active rows, and
+`manage.py check_alerts` picks up new ones for notification (and refreshes
+AR due dates, which age without any write).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum, Value
+from django.utils import timezone
+
+from .models import Alert, Contract, DailyEntry
+from .money import HUNDRED, ZERO, format_rupiah, money, ratio
+
+MONEY = DecimalField(max_digits=18, decimal_places=2)
+
+COST_CATEGORIES = {
+    "cost_material": "bahan",
+    "cost_labor": "tenaga kerja",
+    "cost_overhead": "overhead",
+}
+
+# minimal hari pembanding sebelum lonjakan biaya dinilai
+MIN_SPIKE_BASELINE = 3
+
+
+@dataclass
+class Finding:
+    rule: str
+    message: str
+    value: Decimal
+    threshold: Decimal
+    as_of: date
+    key: str = ""
+
+
+# =========================
+# RULES
+# =========================
+def _recent_entries(contract, n: int) -> list[tuple]:
+    """(date, portions, material, labor, overhead) of the last n entries, newest first."""
+    return list(
+        DailyEntry.objects.filter(contract=contract)
+        .order_by("-date", "-id")
+        .values_list("date", "portions", *COST_CATEGORIES)[:n]
+    )
+
+
+def margin_rule(contract, rows: list[tuple]) -> list[Finding]:
+    """N of the last M days below the contract's target margin per portion."""
+    need, window = settings.ALERT_MARGIN_DAYS, settings.ALERT_MARGIN_WINDOW
+    rows = rows[:window]
+    if len(rows) < need:
+        return []
+
+    price = contract.price_per_portion
+    target = money(price * contract.target_margin_pct / HUNDRED)
+    margins = [price - ratio(mat + lab + ovh, portions) for _day, portions, mat, lab, ovh in rows]
+    below = [m for m in margins if m < target]
+    if len(below) < need:
+        return []
+
+    if len(rows) == len(below):
+        text = f"Margin di bawah target {len(below)} hari berturut-turut."
+    else:
+        text = f"Margin di bawah target {len(below)} dari {len(rows)} hari terakhir."
+    return [Finding(Alert.MARGIN_LOW, text, money(min(below)), target, rows[0][0])]
+
+
+def cost_spike_rule(contract, rows: list[tuple]) -> list[Finding]:
+    """Latest day's cost per portion, per category, vs the mean of the days before it."""
+    if len(rows) < MIN_SPIKE_BASELINE + 1:
+        return []
+
+    (day, portions, *latest), baseline = rows[0], rows[1 : settings.ALERT_COST_SPIKE_WINDOW + 1]
+    if not portions:
+        return []
+
+    factor = 1 + Decimal(settings.ALERT_COST_SPIKE_PCT) / HUNDRED
+    out = []
+    for i, (field, label) in enumerate(COST_CATEGORIES.items()):
+        mean = ratio(sum((r[2 + i] for r in baseline), ZERO), sum(r[1] for r in baseline))
+        current = ratio(latest[i], portions)
+        if mean and current > mean * factor:
+            pct = (current / mean - 1) * HUNDRED
+            out.append(
+                Finding(
+                    Alert.COST_SPIKE,
+                    f"Biaya {label} per porsi naik {pct:.0f}% dibanding rata-rata {len(baseline)} hari sebelumnya.",
+                    money(current),
+                    money(mean),
+                    day,
+                    key=field,
+                )
+            )
+    return out
+
+
+def ar_overdue_rule(contract, as_of: date) -> list[Finding]:
+    """Outstanding credit past its due date, above ALERT_AR_OVERDUE_MIN."""
+    sales = F("portions") * Value(contract.price_per_portion, output_field=MONEY)
+    agg = (
+        DailyEntry.objects.filter(contract=contract, payment_type="CREDIT", credit_due_date__lt=as_of)
+        .annotate(outstanding=ExpressionWrapper(sales - F("paid_amount"), output_field=MONEY))
+        .filter(outstanding__gt=0)
+        .aggregate(total=Sum("outstanding"), count=Count("id"))
+    )
+    total = agg["total"] or ZERO
+    threshold = Decimal(settings.ALERT_AR_OVERDUE_MIN)
+    if not agg["count"] or total <= threshold:
+        return []
+    text = f"Piutang lewat jatuh tempo {format_rupiah(total)} ({agg['count']} entri)."
+    return [Finding(Alert.AR_OVERDUE, text, total, threshold, as_of)]
+
+
+# =========================
+# EVALUATE / READ
+# =========================
+def _findings(contract, as_of: date) -> list[Finding]:
+    rows = _recent_entries(contract, max(settings.ALERT_MARGIN_WINDOW, settings.ALERT_COST_SPIKE_WINDOW + 1))
+    return [
+        *margin_rule(contract, rows),
+        *cost_spike_rule(contract, rows),
+        *ar_overdue_rule(contract, as_of),
+    ]
+
+
+def evaluate(contract_id: int, as_of: date | None = None) -> list[Alert]:
+    """Re-run every rule for the contract and sync the Alert rows; returns the active ones."""
+    contract = Contract.objects.filter(pk=contract_id).first()
+    if contract is None:
+        return []
+
+    now = timezone.now()
+    findings = {(f.rule, f.key): f for f in _findings(contract, as_of or timezone.localdate())}
+    existing = {(a.rule, a.key): a for a in Alert.objects.filter(contract=contract)}
+
+    active = []
+    for ident, f in findings.items():
+        alert = existing.get(ident) or Alert(contract=contract, rule=f.rule, key=f.key)
+        fields = {"message": f.message, "value": f.value, "threshold": f.threshold, "as_of": f.as_of}
+        if not alert.is_active or alert.pk is None:
+            # baru / muncul lagi: perlu dinotifikasi ulang
+            fields.update(is_active=True, raised_at=now, resolved_at=None, notified_at=None)
+        if alert.pk is None or any(getattr(alert, k) != v for k, v in fields.items()):
+            for k, v in fields.items():
+                setattr(alert, k, v)
+            alert.save()
+        active.append(alert)
+
+    stale = [a.pk for ident, a in existing.items() if a.is_active and ident not in findings]
+    if stale:
+        Alert.objects.filter(pk__in=stale).update(is_active=False, resolved_at=now)
+    return active
+
+
+def active_alerts(contract):
+    return Alert.objects.filter(contract=contract, is_active=True).order_by("rule", "key")
+
+
+def pending_notifications():
+    """Active alerts nobody has been told about yet (oldest first)."""
+    return Alert.objects.filter(is_active=True, notified_at__isnull=True).select_related("contract").order_by("raised_at")
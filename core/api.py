@@ -0,0 +1,94 @@
+"""Read-only JSON API (v1) for dashboard KPIs, chart series and cashflow.
+
+Every response carries a strong ETag built from the contract's data version
+(ContractSummary.version, bumped on each entry/cash/contract write), so
+polling clients that send If-None-Match get a 304 after a single indexed
+lookup when nothing has changed. Today's date is part of the tag too:
+the cashflow window, KPIs and alerts move at midnight without a write.
+"""
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition, require_GET
+
+from . import alerts, ledger, reports
+from .auth import require_api_auth
+from .models import Alert, Contract
+
+
+def _etag_for(contract_id, version, request) -> str:
+    today = timezone.localdate().isoformat()
+    return f"v1-{contract_id}-{version}-{today}-{request.resolver_match.url_name}"
+
+
+def current_etag(request, contract_id, **kwargs):
+    version = ledger.data_version(contract_id)
+    if version is None:
+        return None  # ringkasan belum dibangun; view akan membangunnya
+    return _etag_for(contract_id, version, request)
+
+
+def _json(request, contract, summary, payload: dict) -> JsonResponse:
+    response = JsonResponse({"contract": contract.pk, "version": summary.version, **payload})
+    if not response.has_header("ETag"):
+        response["ETag"] = quote_etag(_etag_for(contract.pk, summary.version, request))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def api_view(view_func):
+    return require_api_auth(require_GET(condition(etag_func=current_etag)(view_func)))
+
+
+@api_view
+def kpi(request, contract_id):
+    c = get_object_or_404(Contract, pk=contract_id)
+    summary = ledger.get_summary(c)
+    data = reports.dashboard_data(c)
+    active = [
+        {"rule": a.rule, "key": a.key, "message": a.message, "as_of": a.as_of} for a in alerts.active_alerts(c)
+    ]
+    margin = next((a for a in active if a["rule"] == Alert.MARGIN_LOW), None)
+    return _json(
+        request,
+        c,
+        summary,
+        {
+            "kpi": data["kpi"],
+            "alerts": active,
+            "warn": margin is not None,
+            "warn_text": margin["message"] if margin else None,
+        },
+    )
+
+
+@api_view
+def series(request, contract_id):
+    c = get_object_or_404(Contract, pk=contract_id)
+    summary = ledger.get_summary(c)
+    data = reports.dashboard_data(c)
+    return _json(
+        request,
+        c,
+        summary,
+        {
+            "labels": data["labels"],
+            "margin": data["margin_series"],
+            "target": data["target_series"],
+            "cost_breakdown": data["donut"],
+        },
+    )
+
+
+@api_view
+def cashflow(request, contract_id):
+    c = get_object_or_404(Contract, pk=contract_id)
+    summary = ledger.get_summary(c)
+    return _json(
+        request,
+        c,
+        summary,
+        {**reports.cashflow_totals(c, summary), "last7": reports.cashflow_rows(c, days=7)},
+    )
@@ -0,0 +1,60 @@
+"""Third-party front-end assets, vendored under core/static/core/vendor/.
+
+The pinned files are committed and served by WhiteNoise with hashed names
+and far-future caching like the app's own CSS/JS. `manage.py vendor_assets`
+fetches a missing file and refuses to write it unless the download matches
+the sha384 pinned here (the upstream SRI value); the release step runs it
+so a file that was never committed fails the deploy instead of being served
+unchecked. Only with DEBUG on does a missing file fall back to the CDN copy;
+otherwise the `core.W001` system check reports what is missing.
+"""
+from __future__ import annotations
+
+import functools
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core import checks
+from django.templatetags.static import static
+
+# nama -> (path static, URL asal yang dipin, sha384 file asal dalam format SRI atau None)
+VENDOR = {
+    "bootstrap.css": (
+        "core/vendor/bootstrap-5.3.3.min.css",
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css",
+        "sha384-QWTKZyjpPEjISv5WaRU9OFeRpok6YctnYmDr5pNlyT2bRjXh0JMhjY6hW+ALEwIH",
+    ),
+    "chart.js": (
+        "core/vendor/chart-4.4.1.umd.min.js",
+        "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js",
+        None,  # belum dipin: `vendor_assets --pin chart.js`, lalu isi hash dan commit filenya
+    ),
+}
+
+
+@functools.cache
+def is_vendored(path: str) -> bool:
+    return finders.find(path) is not None
+
+
+def vendor_url(name: str) -> str:
+    path, origin, _integrity = VENDOR[name]
+    if settings.DEBUG and not is_vendored(path):
+        return origin  # dev tanpa vendor_assets
+    return static(path)
+
+
+@checks.register(checks.Tags.staticfiles)
+def check_vendored(app_configs=None, **kwargs):
+    if settings.DEBUG:
+        return []
+    missing = [path for path, _origin, _integrity in VENDOR.values() if finders.find(path) is None]
+    if not missing:
+        return []
+    return [
+        checks.Warning(
+            f"Aset vendor belum ada: {', '.join(missing)}",
+            hint="Jalankan `python manage.py vendor_assets` lalu collectstatic (atau commit filenya).",
+            id="core.W001",
+        )
+    ]
@@ -1,31 +1,170 @@
+import base64
 import hashlib
 import hmac
+import logging
+import secrets
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction
 from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse
 
 SESSION_KEY = "is_authed"
 
+logger = logging.getLogger(__name__)
+
+# =========================
+# PIN HASH
+# =========================
+# format: pbkdf2_sha256$<iterasi>$<salt>$<hash base64>
+# format lama (v0): sha256 hex tanpa salt -> masih diterima, tapi minta upgrade
+PIN_ALGORITHM = "pbkdf2_sha256"
+
+
+def hash_pin(pin: str, iterations: int | None = None, salt: str | None = None) -> str:
+    iterations = iterations or settings.PIN_HASH_ITERATIONS
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", pin.encode("utf-8"), salt.encode("ascii"), iterations)
+    return f"{PIN_ALGORITHM}${iterations}${salt}${base64.b64encode(digest).decode('ascii')}"
 
-def hash_pin(pin: str) -> str:
-    # simple SHA256. Bisa kita upgrade jadi PBKDF2 nanti.
-    return hashlib.sha256(pin.encode("utf-8")).hexdigest()
+
+def verify_pin(pin: str, encoded: str) -> tuple[bool, bool]:
+    """(cocok, perlu_upgrade). perlu_upgrade = format lama atau iterasi di bawah setting."""
+    if encoded.startswith(PIN_ALGORITHM + "$"):
+        try:
+            _, iterations, salt, _ = encoded.split("$", 3)
+            iterations = int(iterations)
+        except ValueError:
+            return False, False
+        ok = hmac.compare_digest(hash_pin(pin, iterations, salt), encoded)
+        return ok, ok and iterations < settings.PIN_HASH_ITERATIONS
+
+    legacy = hashlib.sha256(pin.encode("utf-8")).hexdigest()
+    ok = hmac.compare_digest(legacy, encoded.lower())
+    return ok, ok
 
 
 def verify_login(access_code: str, pin: str) -> bool:
     if not settings.PIN_HASH:
         return False
 
-    if access_code != settings.ACCESS_CODE:
+    if not hmac.compare_digest(access_code.encode("utf-8"), settings.ACCESS_CODE.encode("utf-8")):
         return False
 
-    pin_h = hash_pin(pin)
-    return hmac.compare_digest(pin_h, settings.PIN_HASH)
+    ok, needs_upgrade = verify_pin(pin, settings.PIN_HASH)
+    if needs_upgrade:
+        # PIN_HASH ada di env, tidak bisa ditulis ulang dari sini
+        logger.warning("PIN_HASH memakai format/iterasi lama; buat yang baru dengan `manage.py hash_pin`.")
+    return ok
+
+
+# =========================
+# LOGIN RATE LIMIT
+# =========================
+class LoginRateLimiter:
+    """Sliding-window counter of failed logins per key (IP, access code), per process.
+
+    Checked before hashing, so a flood of guesses costs a dict lookup, not a KDF run.
+    """
+
+    def __init__(self, max_attempts: int | None = None, window_seconds: int | None = None, max_keys: int = 10_000):
+        # None = baca LOGIN_MAX_ATTEMPTS / LOGIN_WINDOW_SECONDS saat dipakai
+        self._max_attempts = max_attempts
+        self._window = window_seconds
+        self.max_keys = max_keys
+        self._hits: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_attempts(self) -> int:
+        return self._max_attempts or settings.LOGIN_MAX_ATTEMPTS
+
+    @property
+    def window(self) -> int:
+        return self._window or settings.LOGIN_WINDOW_SECONDS
+
+    def _recent(self, key: str, now: float) -> deque:
+        hits = self._hits.get(key)
+        if hits is None:
+            return deque()
+        while hits and hits[0] <= now - self.window:
+            hits.popleft()
+        if not hits:
+            del self._hits[key]
+        return hits
+
+    def retry_after(self, *keys: str) -> int:
+        """Seconds until every key is below the limit again (0 = boleh coba)."""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for key in keys:
+                hits = self._recent(key, now)
+                if len(hits) >= self.max_attempts:
+                    wait = max(wait, hits[len(hits) - self.max_attempts] + self.window - now)
+        return int(wait) + 1 if wait > 0 else 0
+
+    def hit(self, *keys: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._hits) >= self.max_keys:
+                # buang key yang sudah lewat jendela; kalau masih penuh, yang paling lama
+                for key in list(self._hits):
+                    self._recent(key, now)
+                while len(self._hits) >= self.max_keys:
+                    del self._hits[next(iter(self._hits))]
+            for key in keys:
+                self._hits.setdefault(key, deque()).append(now)
+
+    def reset(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._hits.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hits.clear()
+
+
+login_limiter = LoginRateLimiter()
+
+
+def client_ip(request) -> str:
+    # di belakang proxy (Railway), IP asli = entri ke-N dari kanan X-Forwarded-For
+    proxies = settings.TRUSTED_PROXY_COUNT
+    forwarded = [p.strip() for p in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if p.strip()]
+    if proxies and len(forwarded) >= proxies:
+        return forwarded[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def login_keys(request, access_code: str) -> tuple[str, str]:
+    return f"ip:{client_ip(request)}", f"code:{access_code.lower()}"
 
 
 def require_auth(view_func):
+    if iscoroutinefunction(view_func):
+        # view async (ASGI): baca sesi tanpa memblokir event loop
+        async def _awrapped(request, *args, **kwargs):
+            if await request.session.aget(SESSION_KEY):
+                return await view_func(request, *args, **kwargs)
+            return redirect(reverse("login"))
+        return _awrapped
+
     def _wrapped(request, *args, **kwargs):
         if request.session.get(SESSION_KEY):
             return view_func(request, *args, **kwargs)
         return redirect(reverse("login"))
-    return _wrapped
\ No newline at end of file
+    return _wrapped
+
+def require_api_auth(view_func):
+    # sama dengan require_auth, tapi 401 JSON (bukan redirect ke login) untuk klien API
+    def _wrapped(request, *args, **kwargs):
+        if request.session.get(SESSION_KEY):
+            return view_func(request, *args, **kwargs)
+        return JsonResponse({"error": "Belum login."}, status=401)
+    return _wrapped
@@ -0,0 +1,111 @@
+"""Conditional GET (ETag / Last-Modified -> 304) for the HTML report pages.
+
+Validators come from the contract's last write, never from the rendered
+body, so a 304 costs at most one indexed lookup and no rendering:
+
+- pages read straight from the DB use ContractSummary.version/updated_at
+  (bumped by every entry/cash/purchase/contract write, same as the API ETag);
+- pages built from cached fragments (dashboard, profit summary) use the
+  fragment generation, which lives in the cache, so a repeat view stays
+  DB-free and is never fresher or staler than the fragments it would serve.
+
+The ETag also mixes in today's date (due dates and "today" move without a
+write), the session's CSRF secret (pages carry delete forms) and the static
+manifest hash (a deploy changes asset URLs). Pages are sent `private,
+no-cache`: the browser keeps them but revalidates on every navigation.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from . import fragments
+from .contracts import for_request
+from .models import Contract, ContractSummary
+
+
+# =========================
+# STATE: (tag, last_modified) atau None = tanpa validator, selalu 200
+# =========================
+def summary_state(request):
+    c = for_request(request)
+    if c is None:
+        return None
+    row = ContractSummary.objects.filter(contract=c).values_list("version", "updated_at").first()
+    if row is None:
+        return None  # ringkasan belum dibangun; view yang membangunnya
+    return f"{c.pk}-{row[0]}", row[1]
+
+
+def fragment_state(request):
+    c = for_request(request)
+    if c is None:
+        return None
+    return f"{c.pk}-f{fragments.generation(c.pk)}", None
+
+
+def portfolio_state(request):
+    # semua kontrak: jumlah kontrak/ringkasan + total versi berubah pada tulis apa pun
+    agg = Contract.objects.aggregate(
+        n=Count("pk"), built=Count("summary"), version=Sum("summary__version"), at=Max("summary__updated_at")
+    )
+    return f"all-{agg['n']}-{agg['built']}-{agg['version'] or 0}", agg["at"]
+
+
+# =========================
+# DECORATOR
+# =========================
+def _manifest_hash() -> str:
+    return getattr(staticfiles_storage, "manifest_hash", "")
+
+
+def _validators(request, state) -> tuple[str | None, int | None]:
+    if request.method not in ("GET", "HEAD"):
+        return None, None
+    current = state(request)
+    if current is None:
+        return None, None
+
+    tag, last_modified = current
+    extra = "|".join((timezone.localdate().isoformat(), request.META.get("CSRF_COOKIE", ""), _manifest_hash()))
+    etag = f'"{tag}-{hashlib.sha256(extra.encode()).hexdigest()[:12]}"'
+    return etag, int(last_modified.timestamp()) if last_modified else None
+
+
+def _finish(response, etag: str | None, last_modified: int | None):
+    if etag and response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+        if last_modified and not response.has_header("Last-Modified"):
+            response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(state=summary_state):
+    """Answer If-None-Match / If-Modified-Since with 304 before the view runs."""
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            async def _awrapped(request, *args, **kwargs):
+                etag, last_modified = await sync_to_async(_validators)(request, state)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _finish(response, etag, last_modified)
+            return _awrapped
+
+        def _wrapped(request, *args, **kwargs):
+            etag, last_modified = _validators(request, state)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return _finish(response, etag, last_modified)
+        return _wrapped
+
+    return decorator
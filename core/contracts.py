@@ -0,0 +1,76 @@
+"""Active-contract lookup shared by every view.
+
+Two layers: a process-local copy and the Django cache. Both are tagged with
+a generation number kept in the Django cache; writes to Contract bump the
+generation (see core/signals.py), which makes every process refetch on its
+next request. With the default local-memory cache each worker only sees its
+own invalidations, so multi-worker deployments should point CACHES at a
+shared backend.
+"""
+from __future__ import annotations
+
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .models import Contract
+
+ACTIVE_KEY = "core:active_contract"
+GENERATION_KEY = "core:active_contract:gen"
+
+# (generation, contract) untuk proses ini
+_local: tuple[int | None, Contract | None] = (None, None)
+
+
+def _generation() -> int:
+    gen = cache.get(GENERATION_KEY)
+    if gen is None:
+        # mulai dari timestamp supaya generasi lama (sebelum key hilang) tidak bisa cocok lagi
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        gen = cache.get(GENERATION_KEY)
+    return gen
+
+
+def get_active_contract() -> Contract | None:
+    global _local
+
+    gen = _generation()
+    local_gen, contract = _local
+    if local_gen == gen:
+        return contract
+
+    cached = cache.get(ACTIVE_KEY)
+    if cached is not None and cached[0] == gen:
+        contract = cached[1]
+    else:
+        contract = Contract.objects.filter(is_active=True).order_by("-created_at").first()
+        cache.set(ACTIVE_KEY, (gen, contract), timeout=None)
+
+    _local = (gen, contract)
+    return contract
+
+
+def invalidate_active_contract() -> None:
+    global _local
+
+    _local = (None, None)
+    cache.delete(ACTIVE_KEY)
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def for_request(request) -> Contract | None:
+    """Active contract resolved once per request."""
+    if not hasattr(request, "_active_contract"):
+        request._active_contract = get_active_contract()
+    return request._active_contract
+
+
+async def afor_request(request) -> Contract | None:
+    """for_request() for async views."""
+    if not hasattr(request, "_active_contract"):
+        request._active_contract = await sync_to_async(get_active_contract)()
+    return request._active_contract
@@ -0,0 +1,162 @@
+"""CSV/XLSX export of the ledger.
+
+CSV is streamed straight from `.iterator(chunk_size=...)` querysets, so the
+worker never holds the whole file. XLSX cannot be produced incrementally
+over HTTP (it is a zip), so it is written with openpyxl's write-only mode
+into a spooled temp file that spills to disk past EXPORT_SPOOL_BYTES.
+"""
+from __future__ import annotations
+
+import csv
+import heapq
+import tempfile
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Case, ExpressionWrapper, F, Value, When
+from django.http import FileResponse, StreamingHttpResponse
+
+from .models import CashTransaction, DailyEntry
+from .reports import MONEY, sales_expression
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+ENTRY_HEADER = [
+    "date", "portions", "cost_material", "cost_labor", "cost_overhead", "total_cost",
+    "sales", "margin", "payment_type", "paid_amount", "ar_balance", "credit_due_date", "notes",
+]
+CASH_HEADER = ["date", "flow", "category", "amount", "notes"]
+LEDGER_HEADER = ["date", "source", "description", "cash_in", "cash_out", "cash_balance", "ar_balance"]
+
+
+class ExportFormatError(Exception):
+    pass
+
+
+class Echo:
+    """File-like object whose write() just returns the line (for csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+# =========================
+# ROW SOURCES
+# =========================
+def entry_rows(contract):
+    sales = sales_expression(contract.price_per_portion)
+    total_cost = ExpressionWrapper(
+        F("cost_material") + F("cost_labor") + F("cost_overhead"), output_field=MONEY
+    )
+    qs = (
+        DailyEntry.objects.filter(contract=contract)
+        .order_by("date", "id")
+        .annotate(sales=sales, total_cost=total_cost)
+        .annotate(
+            margin=ExpressionWrapper(F("sales") - F("total_cost"), output_field=MONEY),
+            ar_balance=Case(
+                When(payment_type="CREDIT", then=F("sales") - F("paid_amount")),
+                default=Value(Decimal("0")),
+                output_field=MONEY,
+            ),
+        )
+        .values_list(*ENTRY_HEADER)
+    )
+    return qs.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def cash_rows(contract):
+    qs = CashTransaction.objects.filter(contract=contract).order_by("date", "id").values_list(*CASH_HEADER)
+    return qs.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def ledger_rows(contract):
+    """Sales receipts and manual cash merged by date, with running cash and AR balances."""
+    sales = (
+        DailyEntry.objects.filter(contract=contract)
+        .order_by("date", "id")
+        .annotate(sales=sales_expression(contract.price_per_portion))
+        .values_list("date", "payment_type", "sales", "paid_amount")
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+    manual = (
+        CashTransaction.objects.filter(contract=contract)
+        .order_by("date", "id")
+        .values_list("date", "flow", "category", "amount")
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+
+    # 0 = penjualan dulu, 1 = kas manual, untuk tanggal yang sama
+    tagged = heapq.merge(
+        ((row[0], 0, row) for row in sales),
+        ((row[0], 1, row) for row in manual),
+        key=lambda t: (t[0], t[1]),
+    )
+
+    cash = Decimal("0")
+    ar = Decimal("0")
+    for _day, source, row in tagged:
+        if source == 0:
+            day, payment_type, sale, paid = row
+            cash += paid
+            if payment_type == "CREDIT":
+                ar += sale - paid
+            yield (day, "Penjualan", payment_type, paid, Decimal("0"), cash, ar)
+        else:
+            day, flow, category, amount = row
+            cash_in = amount if flow == CashTransaction.IN else Decimal("0")
+            cash_out = amount if flow == CashTransaction.OUT else Decimal("0")
+            cash += cash_in - cash_out
+            yield (day, "Kas", category, cash_in, cash_out, cash, ar)
+
+
+SOURCES = {
+    "entries": (ENTRY_HEADER, entry_rows),
+    "cash": (CASH_HEADER, cash_rows),
+    "ledger": (LEDGER_HEADER, ledger_rows),
+}
+
+
+# =========================
+# RESPONSES
+# =========================
+def _csv_response(header, rows, filename):
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _xlsx_response(header, rows, filename):
+    try:
+        from openpyxl import Workbook
+    except ImportError as exc:
+        raise ExportFormatError("Export XLSX butuh paket openpyxl.") from exc
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(header)
+    for row in rows:
+        ws.append(list(row))
+
+    out = tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_BYTES)
+    wb.save(out)
+    out.seek(0)
+    return FileResponse(out, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def export_response(contract, kind: str, fmt: str):
+    if kind not in SOURCES or fmt not in ("csv", "xlsx"):
+        raise ExportFormatError(f"Export tidak dikenal: {kind}.{fmt}")
+
+    header, source = SOURCES[kind]
+    filename = f"bukudapur-{contract.pk}-{kind}.{fmt}"
+    if fmt == "csv":
+        return _csv_response(header, source(contract), filename)
+    return _xlsx_response(header, source(contract), filename)
@@ -1,4 +1,5 @@
 from django import forms
+from .ledger import dates_with_payments
 from .models import Contract, DailyEntry
 
 class ContractForm(forms.ModelForm):
@@ -28,6 +29,63 @@ class DailyEntryForm(forms.ModelForm):
             "notes": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
         }
 
+class DailyEntryRowForm(DailyEntryForm):
+    # satu baris di Input Massal: widget ringkas untuk tabel
+    class Meta(DailyEntryForm.Meta):
+        widgets = {
+            "date": forms.DateInput(attrs={"type": "date", "class": "form-control form-control-sm"}),
+            "portions": forms.NumberInput(attrs={"class": "form-control form-control-sm"}),
+            "cost_material": forms.NumberInput(attrs={"class": "form-control form-control-sm", "step": "0.01"}),
+            "cost_labor": forms.NumberInput(attrs={"class": "form-control form-control-sm", "step": "0.01"}),
+            "cost_overhead": forms.NumberInput(attrs={"class": "form-control form-control-sm", "step": "0.01"}),
+            "payment_type": forms.Select(attrs={"class": "form-select form-select-sm"}),
+            "paid_amount": forms.NumberInput(attrs={"class": "form-control form-control-sm", "step": "0.01"}),
+            "credit_due_date": forms.DateInput(attrs={"type": "date", "class": "form-control form-control-sm"}),
+            "notes": forms.TextInput(attrs={"class": "form-control form-control-sm"}),
+        }
+
+    def has_changed(self):
+        # tanggal & tipe bayar terisi otomatis, biaya default 0: baris tanpa angka = baris kosong
+        for name in ("portions", "cost_material", "cost_labor", "cost_overhead", "paid_amount", "notes"):
+            value = (self.data.get(self.add_prefix(name)) or "").strip()
+            if value.strip("0.,"):
+                return True
+        return False
+
+
+class BaseDailyEntryBatchFormSet(forms.BaseFormSet):
+    def __init__(self, *args, contract=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.contract = contract
+
+    def initial_form_count(self):
+        # semua baris dihitung "extra", supaya baris kosong boleh dilewati
+        return super().initial_form_count() if self.is_bound else 0
+
+    def clean(self):
+        if any(self.errors):
+            return
+        seen = set()
+        for form in self.forms:
+            day = form.cleaned_data.get("date")
+            if day is None:
+                continue  # baris kosong
+            if day in seen:
+                raise forms.ValidationError(f"Tanggal {day:%d-%m-%Y} diisi lebih dari sekali.")
+            seen.add(day)
+
+        # tanggal yang sudah ada ditimpa, kecuali yang sudah punya pelunasan (paid_amount dari pelunasan)
+        if self.contract is not None and seen:
+            locked = dates_with_payments(self.contract, seen)
+            for form in self.forms:
+                if form.cleaned_data.get("date") in locked:
+                    form.add_error("date", "Tanggal ini sudah ada pelunasan piutang; ubah lewat Edit di History.")
+
+
+DailyEntryBatchFormSet = forms.formset_factory(
+    DailyEntryRowForm, formset=BaseDailyEntryBatchFormSet, extra=7, max_num=31, validate_max=True
+)
+
 from .models import CashTransaction
 
 class CashTransactionForm(forms.ModelForm):
@@ -40,4 +98,84 @@ class CashTransactionForm(forms.ModelForm):
             "category": forms.TextInput(attrs={"class": "form-control", "placeholder": "contoh: Belanja Harian"}),
             "amount": forms.NumberInput(attrs={"class": "form-control", "step": "0.01"}),
             "notes": forms.Textarea(attrs={"class": "form-control", "rows": 2}),
-        }    
\ No newline at end of file
+        }    
+
+class LedgerImportForm(forms.Form):
+    KIND_CHOICES = [
+        ("entries", "Input Harian"),
+        ("cash", "Transaksi Kas"),
+    ]
+
+    kind = forms.ChoiceField(choices=KIND_CHOICES, widget=forms.Select(attrs={"class": "form-select"}))
+    file = forms.FileField(widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,.xlsx"}))
+
+
+from .models import CreditPayment
+
+class CreditPaymentForm(forms.ModelForm):
+    class Meta:
+        model = CreditPayment
+        fields = ["date", "amount", "notes"]
+        widgets = {
+            "date": forms.DateInput(attrs={"type": "date", "class": "form-control"}),
+            "amount": forms.NumberInput(attrs={"class": "form-control", "step": "0.01"}),
+            "notes": forms.TextInput(attrs={"class": "form-control", "placeholder": "contoh: transfer BRI"}),
+        }
+
+    def __init__(self, *args, outstanding=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.outstanding = outstanding
+
+    def clean_amount(self):
+        amount = self.cleaned_data["amount"]
+        if amount <= 0:
+            raise forms.ValidationError("Nominal harus lebih dari 0.")
+        if self.outstanding is not None and amount > self.outstanding:
+            raise forms.ValidationError("Nominal melebihi sisa piutang.")
+        return amount
+
+
+from datetime import timedelta
+
+from .models import PurchaseLine
+
+class PurchaseLineForm(forms.ModelForm):
+    class Meta:
+        model = PurchaseLine
+        fields = ["ingredient", "unit", "qty", "unit_price", "cash_tx"]
+        widgets = {
+            "ingredient": forms.TextInput(attrs={"class": "form-control", "placeholder": "contoh: Beras"}),
+            "unit": forms.TextInput(attrs={"class": "form-control", "placeholder": "kg / liter / butir"}),
+            "qty": forms.NumberInput(attrs={"class": "form-control", "step": "0.001"}),
+            "unit_price": forms.NumberInput(attrs={"class": "form-control", "step": "0.01"}),
+            "cash_tx": forms.Select(attrs={"class": "form-select"}),
+        }
+
+    def __init__(self, *args, entry=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if entry is not None:
+            # transaksi kas keluar kontrak yang sama, sekitar tanggal entry
+            self.fields["cash_tx"].queryset = self.fields["cash_tx"].queryset.filter(
+                contract_id=entry.contract_id,
+                date__range=(entry.date - timedelta(days=7), entry.date + timedelta(days=7)),
+            )
+        self.fields["cash_tx"].empty_label = "— tidak dikaitkan —"
+
+    def clean_ingredient(self):
+        # "  beras  putih" dan "Beras putih" dihitung satu bahan di laporan
+        return " ".join(self.cleaned_data["ingredient"].split()).capitalize()
+
+    def clean_unit(self):
+        return self.cleaned_data["unit"].strip().lower()
+
+    def clean_qty(self):
+        qty = self.cleaned_data["qty"]
+        if qty <= 0:
+            raise forms.ValidationError("Jumlah harus lebih dari 0.")
+        return qty
+
+    def clean_unit_price(self):
+        price = self.cleaned_data["unit_price"]
+        if price < 0:
+            raise forms.ValidationError("Harga tidak boleh negatif.")
+        return price
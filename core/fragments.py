@@ -0,0 +1,113 @@
+"""Cached HTML fragments of the report pages (dashboard, profit summary).
+
+Fragments are keyed by contract id plus a per-contract generation kept in
+the Django cache, the same scheme core/contracts.py uses for the active
+contract. Every ledger write (and every Contract save) bumps the generation
+through `invalidate()`, so a repeated view between inputs is served from the
+cache without any DB query. The bump happens twice: right away, so nothing
+rendered during the write is reused, and again after commit, so nothing
+rendered from pre-commit rows survives either.
+
+The backend is whatever CACHES["default"] is (see CACHE_BACKEND in settings);
+with local memory each worker only sees its own invalidations, so
+multi-worker deployments should use file or Redis. Hit/miss counters are
+per process.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+GENERATION_KEY = "core:fragments:gen:{}"
+FRAGMENT_KEY = "core:fragment:{}:{}:{}"
+
+_stats: Counter = Counter()
+
+
+def generation(contract_id: int) -> int:
+    key = GENERATION_KEY.format(contract_id)
+    gen = cache.get(key)
+    if gen is None:
+        # mulai dari timestamp supaya fragmen lama (sebelum key hilang) tidak terpakai lagi
+        cache.add(key, time.time_ns(), timeout=None)
+        gen = cache.get(key)
+    return gen
+
+
+async def ageneration(contract_id: int) -> int:
+    key = GENERATION_KEY.format(contract_id)
+    gen = await cache.aget(key)
+    if gen is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        gen = await cache.aget(key)
+    return gen
+
+
+def _bump(contract_id: int) -> None:
+    try:
+        cache.incr(GENERATION_KEY.format(contract_id))
+    except ValueError:
+        pass  # belum ada: generasi baru dibuat saat dibaca
+
+
+def invalidate(contract_id: int) -> None:
+    _bump(contract_id)
+    transaction.on_commit(lambda: _bump(contract_id))
+
+
+def _render(templates: dict[str, str], keys: dict, cached: dict, context: dict | None) -> tuple[dict, dict]:
+    out = {}
+    missing = {}
+    for name, template in templates.items():
+        html = cached.get(keys[name])
+        if html is None:
+            _stats["miss"] += 1
+            html = render_to_string(template, context)
+            missing[keys[name]] = html
+        else:
+            _stats["hit"] += 1
+        out[name] = mark_safe(html)
+    return out, missing
+
+
+def render_many(contract_id: int, templates: dict[str, str], get_context: Callable[[], dict]) -> dict:
+    """{name: html} for each fragment; only misses are rendered, with one get_context() call."""
+    gen = generation(contract_id)
+    keys = {name: FRAGMENT_KEY.format(name, contract_id, gen) for name in templates}
+    cached = cache.get_many(keys.values())
+
+    context = get_context() if len(cached) < len(keys) else None
+    out, missing = _render(templates, keys, cached, context)
+    if missing:
+        cache.set_many(missing, timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+    return out
+
+
+async def arender_many(contract_id: int, templates: dict[str, str], get_context: Callable[[], Awaitable[dict]]) -> dict:
+    """render_many() for async views; get_context is a coroutine function."""
+    gen = await ageneration(contract_id)
+    keys = {name: FRAGMENT_KEY.format(name, contract_id, gen) for name in templates}
+    cached = await cache.aget_many(keys.values())
+
+    context = await get_context() if len(cached) < len(keys) else None
+    out, missing = _render(templates, keys, cached, context)
+    if missing:
+        await cache.aset_many(missing, timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+    return out
+
+
+def stats() -> dict:
+    hits, misses = _stats["hit"], _stats["miss"]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None}
+
+
+def reset_stats() -> None:
+    _stats.clear()
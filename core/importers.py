@@ -0,0 +1,148 @@
+"""Bulk import of daily entries / cash transactions from CSV or XLSX.
+
+Rows are read one at a time, validated with the same ModelForms as the
+input pages and written in batches through core/ledger.py, so memory stays
+bounded by the batch size regardless of file length.
+
+Header names are the form field names, e.g. for entries:
+date,portions,cost_material,cost_labor,cost_overhead,payment_type,paid_amount,credit_due_date,notes
+"""
+from __future__ import annotations
+
+import csv
+import io
+from pathlib import Path
+
+from django.conf import settings
+
+from . import ledger
+from .forms import CashTransactionForm, DailyEntryForm
+
+KINDS = {
+    "entries": DailyEntryForm,
+    "cash": CashTransactionForm,
+}
+
+# nilai default kalau kolom tidak ada / kosong (sama dengan default model)
+DEFAULTS = {
+    "entries": {
+        "cost_material": "0",
+        "cost_labor": "0",
+        "cost_overhead": "0",
+        "payment_type": "CASH",
+        "paid_amount": "0",
+    },
+    "cash": {},
+}
+
+MAX_REPORTED_ERRORS = 200
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def iter_rows(fileobj, filename: str):
+    """Yield (line_number, {header: value}) from a CSV or XLSX file."""
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".xlsx":
+        yield from _iter_xlsx(fileobj)
+    elif suffix in (".csv", ".txt"):
+        yield from _iter_csv(fileobj)
+    else:
+        raise ImportFormatError("Format file harus .csv atau .xlsx")
+
+
+def _iter_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.DictReader(text, dialect=dialect)
+    for row in reader:
+        yield reader.line_num, {(k or "").strip().lower(): v for k, v in row.items()}
+
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ImportFormatError("Import XLSX butuh paket openpyxl.") from exc
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h or "").strip().lower() for h in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            if all(v is None for v in values):
+                continue
+            yield line, dict(zip(header, values))
+    finally:
+        wb.close()
+
+
+def _clean(kind: str, row: dict) -> dict:
+    data = {k: ("" if v is None else v) for k, v in row.items() if k}
+    for key, default in DEFAULTS[kind].items():
+        if data.get(key) in (None, ""):
+            data[key] = default
+    return data
+
+
+def import_ledger(contract, kind: str, fileobj, filename: str, batch_size: int | None = None) -> dict:
+    """Validate and write every row; invalid rows are reported, not written.
+
+    Returns {"imported": int, "errors": [(line, message), ...], "error_count": int}.
+    """
+    if kind not in KINDS:
+        raise ImportFormatError(f"Jenis import tidak dikenal: {kind}")
+
+    form_class = KINDS[kind]
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    write = ledger.bulk_upsert_entries if kind == "entries" else ledger.bulk_create_cash
+
+    imported = 0
+    error_count = 0
+    errors: list[tuple[int, str]] = []
+    batch: list[tuple[int, object]] = []
+
+    def report(line: int, msg: str) -> None:
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append((line, msg))
+
+    def flush() -> int:
+        rows = batch
+        if kind == "entries":
+            # paid_amount entry yang sudah dilunasi sebagian = total pelunasannya; jangan ditimpa
+            paid = ledger.dates_with_payments(contract, {obj.date for _, obj in rows})
+            for line, obj in rows:
+                if obj.date in paid:
+                    report(line, "date: sudah ada pelunasan piutang untuk tanggal ini; ubah lewat halaman Piutang.")
+            rows = [(line, obj) for line, obj in rows if obj.date not in paid]
+        return write(contract, [obj for _, obj in rows]) if rows else 0
+
+    for line, row in iter_rows(fileobj, filename):
+        form = form_class(data=_clean(kind, row))
+        if not form.is_valid():
+            report(line, "; ".join(f"{field}: {' '.join(errs)}" for field, errs in form.errors.items()))
+            continue
+
+        obj = form.save(commit=False)
+        if kind == "entries":
+            ledger.autofill_paid_amount(obj, contract)
+        batch.append((line, obj))
+
+        if len(batch) >= batch_size:
+            imported += flush()
+            batch = []
+
+    if batch:
+        imported += flush()
+
+    return {"imported": imported, "errors": errors, "error_count": error_count}
@@ -0,0 +1,131 @@
+"""Append-only ledger journal and "as of" replay.
+
+core/ledger.py records one LedgerEvent per change to ContractSummary, in
+the same transaction: row create/update/delete (with the row values or the
+changed fields; bulk imports write one such event per row) and rebuilds
+(with whatever the rebuild corrected). Each event carries the summary delta it caused, so the summary
+at any moment is the sum of the deltas up to then.
+
+Every LEDGER_SNAPSHOT_EVERY events the current summary totals are copied
+to a LedgerSnapshot. replay() starts from the nearest snapshot and only
+adds the events after it, so it reads at most one snapshot interval.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import DecimalField
+from django.utils import timezone
+
+from .models import ContractSummary, LedgerEvent, LedgerSnapshot, LedgerTotals
+
+# kolom total (= ledger.SUMMARY_FIELDS) -> tipe, untuk membaca delta dari JSON
+TOTAL_TYPES = {
+    f.name: Decimal if isinstance(f, DecimalField) else int for f in LedgerTotals._meta.fields
+}
+
+
+def row_changes(before: dict | None, after: dict | None) -> dict:
+    """What to store in LedgerEvent.changes for a row going from `before` to `after`."""
+    if before is None:
+        return dict(after or {})
+    if after is None:
+        return dict(before)
+    return {k: [before.get(k), v] for k, v in after.items() if before.get(k) != v}
+
+
+def record(
+    contract_id: int,
+    source: str,
+    action: str,
+    delta: dict,
+    object_id: int | None = None,
+    changes: dict | None = None,
+) -> LedgerEvent:
+    """Append one event (call inside the write's transaction, after the summary update)."""
+    event = LedgerEvent.objects.create(
+        contract_id=contract_id,
+        source=source,
+        action=action,
+        object_id=object_id,
+        changes=changes or {},
+        delta={f: v for f, v in delta.items() if v},
+    )
+    _maybe_snapshot(contract_id, event)
+    return event
+
+
+def record_many(contract_id: int, source: str, events: list[dict]) -> list[LedgerEvent]:
+    """record() for a batch: one insert; each dict has action, object_id, changes, delta."""
+    created = LedgerEvent.objects.bulk_create(
+        LedgerEvent(
+            contract_id=contract_id,
+            source=source,
+            action=e["action"],
+            object_id=e["object_id"],
+            changes=e["changes"] or {},
+            delta={f: v for f, v in e["delta"].items() if v},
+        )
+        for e in events
+    )
+    if created:
+        _maybe_snapshot(contract_id, created[-1])
+    return created
+
+
+def _maybe_snapshot(contract_id: int, event: LedgerEvent) -> None:
+    last = (
+        LedgerSnapshot.objects.filter(contract_id=contract_id)
+        .order_by("-event_id")
+        .values_list("event_id", flat=True)
+        .first()
+    )
+    # id global naik terus: selisih id >= jumlah event kontrak ini, jadi count() hanya kalau perlu
+    if event.pk - (last or 0) >= settings.LEDGER_SNAPSHOT_EVERY and (
+        LedgerEvent.objects.filter(contract_id=contract_id, pk__gt=last or 0).count()
+        >= settings.LEDGER_SNAPSHOT_EVERY
+    ):
+        snapshot(contract_id, event)
+
+
+def snapshot(contract_id: int, event: LedgerEvent) -> LedgerSnapshot:
+    """Copy the current summary totals as the state right after `event`."""
+    totals = ContractSummary.objects.filter(contract_id=contract_id).values(*TOTAL_TYPES).first() or {}
+    return LedgerSnapshot.objects.create(
+        contract_id=contract_id, event_id=event.pk, taken_at=event.at, **totals
+    )
+
+
+def replay(contract, as_of: datetime | None = None) -> ContractSummary:
+    """Summary totals as they were at `as_of` (unsaved ContractSummary; default: now).
+
+    History before the journal started (the first "rebuild" event of each
+    contract) is not available: earlier timestamps replay to zero.
+    """
+    as_of = as_of or timezone.now()
+    snap = (
+        LedgerSnapshot.objects.filter(contract=contract, taken_at__lte=as_of).order_by("-event_id").first()
+    )
+    totals = {f: t(getattr(snap, f)) if snap else t(0) for f, t in TOTAL_TYPES.items()}
+
+    tail = LedgerEvent.objects.filter(
+        contract=contract, pk__gt=snap.event_id if snap else 0, at__lte=as_of
+    ).values_list("delta", flat=True)
+    for delta in tail.iterator():
+        for f, v in delta.items():
+            totals[f] += TOTAL_TYPES[f](v)
+
+    return ContractSummary(contract=contract, **totals)
+
+
+def replay_drift(contract) -> dict:
+    """Fields where replay(now) disagrees with the stored summary: {field: (stored, replayed)}."""
+    stored = ContractSummary.objects.filter(contract=contract).first()
+    replayed = replay(contract)
+    return {
+        f: (getattr(stored, f, None), getattr(replayed, f))
+        for f in TOTAL_TYPES
+        if stored is None or getattr(stored, f) != getattr(replayed, f)
+    }
@@ -0,0 +1,592 @@
+"""Write path for the ledger (DailyEntry + CashTransaction).
+
+Every create/edit/delete goes through the helpers below so that the
+per-contract ContractSummary and the weekly/monthly PeriodRollup rows are
+kept in sync inside the same DB transaction, together with the stored
+alerts (core/alerts.py) and the append-only journal (core/journal.py).
+Summary and trend pages then read a handful of rows instead of
+aggregating every entry.
+"""
+from __future__ import annotations
+
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from . import alerts, fragments, journal
+from .models import (
+    CashTransaction,
+    ContractSummary,
+    CreditPayment,
+    DailyEntry,
+    LedgerEvent,
+    PeriodRollup,
+    PurchaseLine,
+)
+from .money import money
+
+SUMMARY_FIELDS = (
+    "entry_count",
+    "portions",
+    "credit_portions",
+    "cost_material",
+    "cost_labor",
+    "cost_overhead",
+    "paid_cash",
+    "paid_credit",
+    "manual_in",
+    "manual_out",
+)
+
+# isi baris yang dicatat di jurnal (LedgerEvent.changes)
+ENTRY_ROW_FIELDS = (
+    "date",
+    "portions",
+    "cost_material",
+    "cost_labor",
+    "cost_overhead",
+    "payment_type",
+    "paid_amount",
+    "credit_due_date",
+    "notes",
+)
+CASH_ROW_FIELDS = ("date", "flow", "category", "amount", "notes")
+
+ZERO = Decimal("0")
+
+
+# =========================
+# SNAPSHOTS
+# =========================
+def entry_snapshot(entry: DailyEntry | None) -> dict | None:
+    """Contribution of one DailyEntry to the summary (None if not saved)."""
+    if entry is None or entry.pk is None:
+        return None
+
+    is_credit = entry.payment_type == "CREDIT"
+    paid = Decimal(entry.paid_amount or 0)
+    return {
+        "contract_id": entry.contract_id,
+        "date": entry.date,
+        "entry_count": 1,
+        "portions": int(entry.portions or 0),
+        "credit_portions": int(entry.portions or 0) if is_credit else 0,
+        "cost_material": Decimal(entry.cost_material or 0),
+        "cost_labor": Decimal(entry.cost_labor or 0),
+        "cost_overhead": Decimal(entry.cost_overhead or 0),
+        "paid_cash": ZERO if is_credit else paid,
+        "paid_credit": paid if is_credit else ZERO,
+        "row": {f: getattr(entry, f) for f in ENTRY_ROW_FIELDS},
+    }
+
+
+def cash_snapshot(tx: CashTransaction | None) -> dict | None:
+    """Contribution of one CashTransaction to the summary (None if not saved)."""
+    if tx is None or tx.pk is None or tx.contract_id is None:
+        return None
+
+    amount = Decimal(tx.amount or 0)
+    return {
+        "contract_id": tx.contract_id,
+        "date": tx.date,
+        "manual_in": amount if tx.flow == CashTransaction.IN else ZERO,
+        "manual_out": amount if tx.flow == CashTransaction.OUT else ZERO,
+        "row": {f: getattr(tx, f) for f in CASH_ROW_FIELDS},
+    }
+
+
+def _summary_keys(snap: dict) -> list:
+    return [snap["contract_id"]]
+
+
+def _rollup_keys(snap: dict) -> list:
+    return [(snap["contract_id"], period, start) for period, start in period_starts(snap["date"])]
+
+
+def _deltas(before: dict | None, after: dict | None, keys) -> dict:
+    """Field deltas going from `before` to `after`, grouped by `keys(snapshot)`."""
+    out: dict = {}
+    for snap, sign in ((before, -1), (after, 1)):
+        if not snap:
+            continue
+        for key in keys(snap):
+            d = out.setdefault(key, {})
+            for f in SUMMARY_FIELDS:
+                if f in snap:
+                    d[f] = d.get(f, 0) + sign * snap[f]
+    return out
+
+
+def _action(before: dict | None, after: dict | None) -> str:
+    return LedgerEvent.CREATE if before is None else LedgerEvent.DELETE if after is None else LedgerEvent.UPDATE
+
+
+def _apply(
+    before: dict | None,
+    after: dict | None,
+    source: str,
+    object_id: int | None,
+    action: str | None = None,
+) -> None:
+    event = {
+        "source": source,
+        "action": action or _action(before, after),
+        "object_id": object_id,
+        "changes": journal.row_changes(before and before["row"], after and after["row"]),
+    }
+
+    rebuilt = set()
+    for contract_id, delta in _deltas(before, after, _summary_keys).items():
+        changes = {f: F(f) + v for f, v in delta.items() if v}
+        updated = ContractSummary.objects.filter(contract_id=contract_id).update(
+            version=F("version") + 1, updated_at=timezone.now(), **changes
+        )
+        if not updated:
+            # belum ada baris ringkasan: hitung penuh (sudah termasuk tulisan ini)
+            rebuild_summary(contract_id, **event)
+            rebuilt.add(contract_id)
+        else:
+            journal.record(contract_id, delta=delta, **event)
+            fragments.invalidate(contract_id)
+            alerts.evaluate(contract_id)
+
+    _apply_rollups(_deltas(before, after, _rollup_keys), skip=rebuilt)
+
+
+def _apply_rollups(deltas: dict, skip=()) -> None:
+    for (contract_id, period, start), delta in deltas.items():
+        changes = {f: F(f) + v for f, v in delta.items() if v}
+        if contract_id in skip or not changes:
+            continue
+        rows = PeriodRollup.objects.filter(contract_id=contract_id, period=period, period_start=start)
+        if not rows.update(**changes):
+            PeriodRollup.objects.get_or_create(contract_id=contract_id, period=period, period_start=start)
+            rows.update(**changes)
+
+
+def _merge(into: dict, delta: dict) -> None:
+    for f, v in delta.items():
+        into[f] = into.get(f, 0) + v
+
+
+def _apply_many(contract_id: int, rows: list[tuple], source: str) -> None:
+    """_apply() for a batch of (before, after, object_id) rows of one contract.
+
+    One summary update, one update per touched period and one journal insert
+    for the whole batch; each row still gets its own event (changes + delta),
+    so imports replay and audit like single edits. The summary row must
+    already exist (see _ensure_summary).
+    """
+    events, total, rollups = [], {}, {}
+    for before, after, object_id in rows:
+        changes = journal.row_changes(before and before["row"], after and after["row"])
+        if before and after and not changes:
+            continue  # ditulis ulang dengan nilai yang sama
+        delta = _deltas(before, after, _summary_keys).get(contract_id, {})
+        events.append(
+            {"action": _action(before, after), "object_id": object_id, "changes": changes, "delta": delta}
+        )
+        _merge(total, delta)
+        for key, d in _deltas(before, after, _rollup_keys).items():
+            _merge(rollups.setdefault(key, {}), d)
+    if not events:
+        return
+
+    ContractSummary.objects.filter(contract_id=contract_id).update(
+        version=F("version") + 1, updated_at=timezone.now(), **{f: F(f) + v for f, v in total.items() if v}
+    )
+    journal.record_many(contract_id, source, events)
+    _apply_rollups(rollups)
+    fragments.invalidate(contract_id)
+    alerts.evaluate(contract_id)
+
+
+# =========================
+# WRITE HELPERS (dipakai views)
+# =========================
+def autofill_paid_amount(entry: DailyEntry, contract) -> None:
+    """Tunai tanpa nominal: anggap dibayar penuh (porsi * harga kontrak)."""
+    if entry.payment_type == "CASH" and not entry.paid_amount:
+        entry.paid_amount = Decimal(entry.portions or 0) * contract.price_per_portion
+
+
+def _locked_snapshot(model, pk: int | None, snapshot) -> dict | None:
+    """snapshot() of the row as committed, locked until the transaction ends.
+
+    The delta is computed from this, not from the instance the caller loaded
+    earlier: two concurrent edits of one row then apply one after the other.
+    """
+    if pk is None:
+        return None
+    return snapshot(model.objects.select_for_update().filter(pk=pk).first())
+
+
+def save_entry(entry: DailyEntry) -> DailyEntry:
+    with transaction.atomic():
+        before = _locked_snapshot(DailyEntry, entry.pk, entry_snapshot)
+        entry.save()
+        if before and before["date"] != entry.date:
+            PurchaseLine.objects.filter(entry=entry).update(date=entry.date)
+        _apply(before, entry_snapshot(entry), LedgerEvent.ENTRY, entry.pk)
+    return entry
+
+
+def delete_entry(entry: DailyEntry) -> None:
+    with transaction.atomic():
+        before, pk = _locked_snapshot(DailyEntry, entry.pk, entry_snapshot), entry.pk
+        entry.delete()
+        _apply(before, None, LedgerEvent.ENTRY, pk)
+
+
+def save_cash(tx: CashTransaction) -> CashTransaction:
+    with transaction.atomic():
+        before = _locked_snapshot(CashTransaction, tx.pk, cash_snapshot)
+        tx.save()
+        _apply(before, cash_snapshot(tx), LedgerEvent.CASH, tx.pk)
+    return tx
+
+
+def delete_cash(tx: CashTransaction) -> None:
+    with transaction.atomic():
+        before, pk = _locked_snapshot(CashTransaction, tx.pk, cash_snapshot), tx.pk
+        tx.delete()
+        _apply(before, None, LedgerEvent.CASH, pk)
+
+
+class PaymentExceedsOutstanding(ValueError):
+    pass
+
+
+INITIAL_PAYMENT_NOTE = "DP saat input"
+
+
+def _sync_paid(entry: DailyEntry) -> None:
+    """paid_amount = total pembayaran (dipanggil dengan baris entry terkunci)."""
+    total = CreditPayment.objects.filter(entry_id=entry.pk).aggregate(total=Sum("amount"))["total"]
+    entry.paid_amount = total or ZERO
+    entry.save(update_fields=["paid_amount"])
+
+
+def add_credit_payment(payment: CreditPayment) -> CreditPayment:
+    """Save a payment; the credit entry's paid_amount becomes the sum of its payments.
+
+    A down payment typed on the entry itself becomes the first payment, so
+    from then on paid_amount is always derived. Raises
+    PaymentExceedsOutstanding if the amount is more than what is still owed
+    (checked on the locked row, not the value the form saw).
+    """
+    with transaction.atomic():
+        entry = DailyEntry.objects.select_for_update(of=("self",)).select_related("contract").get(pk=payment.entry_id)
+        outstanding = entry.portions * entry.contract.price_per_portion - entry.paid_amount
+        if payment.amount > outstanding:
+            raise PaymentExceedsOutstanding(outstanding)
+
+        before = entry_snapshot(entry)
+        if entry.paid_amount and not CreditPayment.objects.filter(entry_id=entry.pk).exists():
+            CreditPayment.objects.create(
+                entry=entry, date=entry.date, amount=entry.paid_amount, notes=INITIAL_PAYMENT_NOTE
+            )
+        payment.save()
+        _sync_paid(entry)
+        _apply(before, entry_snapshot(entry), LedgerEvent.PAYMENT, payment.pk, LedgerEvent.CREATE)
+    return payment
+
+
+def delete_credit_payment(payment: CreditPayment) -> None:
+    with transaction.atomic():
+        entry = DailyEntry.objects.select_for_update().get(pk=payment.entry_id)
+        before, pk = entry_snapshot(entry), payment.pk
+        payment.delete()
+        _sync_paid(entry)
+        _apply(before, entry_snapshot(entry), LedgerEvent.PAYMENT, pk, LedgerEvent.DELETE)
+
+
+def _sync_material(entry: DailyEntry) -> None:
+    """cost_material = total rincian bahan (dipanggil dengan baris entry terkunci)."""
+    total = PurchaseLine.objects.filter(entry_id=entry.pk).aggregate(total=Sum("amount"))["total"]
+    entry.cost_material = total or ZERO
+    entry.save(update_fields=["cost_material"])
+
+
+def save_purchase(line: PurchaseLine) -> PurchaseLine:
+    """Save a purchase line and resync its entry's cost_material (summary/rollups follow)."""
+    with transaction.atomic():
+        entry = DailyEntry.objects.select_for_update().get(pk=line.entry_id)
+        before = entry_snapshot(entry)
+        action = LedgerEvent.CREATE if line.pk is None else LedgerEvent.UPDATE
+        line.contract_id, line.date = entry.contract_id, entry.date
+        line.amount = money(line.qty * line.unit_price)
+        line.save()
+        _sync_material(entry)
+        _apply(before, entry_snapshot(entry), LedgerEvent.PURCHASE, line.pk, action)
+    return line
+
+
+def delete_purchase(line: PurchaseLine) -> None:
+    with transaction.atomic():
+        entry = DailyEntry.objects.select_for_update().get(pk=line.entry_id)
+        before, pk = entry_snapshot(entry), line.pk
+        line.delete()
+        _sync_material(entry)
+        _apply(before, entry_snapshot(entry), LedgerEvent.PURCHASE, pk, LedgerEvent.DELETE)
+
+
+# =========================
+# BULK WRITES (import)
+# =========================
+ENTRY_UPSERT_FIELDS = [
+    "portions",
+    "cost_material",
+    "cost_labor",
+    "cost_overhead",
+    "notes",
+    "payment_type",
+    "paid_amount",
+    "credit_due_date",
+]
+
+
+def _ensure_summary(contract_id: int) -> None:
+    # bulk write menerapkan delta: baris ringkasan harus sudah ada sebelum baris baru ditulis
+    if not ContractSummary.objects.filter(contract_id=contract_id).exists():
+        rebuild_summary(contract_id)
+
+
+class EntryConflict(ValueError):
+    """A bulk write refused to touch existing entries; `dates` lists them."""
+
+    def __init__(self, dates):
+        self.dates = sorted(dates)
+        super().__init__(", ".join(f"{d:%d-%m-%Y}" for d in self.dates))
+
+
+def dates_with_payments(contract, dates) -> set:
+    """Dates (of `dates`) whose entry has credit payments: their paid_amount comes from the payments."""
+    return set(
+        CreditPayment.objects.filter(entry__contract=contract, entry__date__in=list(dates))
+        .values_list("entry__date", flat=True)
+    )
+
+
+def bulk_upsert_entries(contract, entries: list[DailyEntry], source: str = LedgerEvent.IMPORT) -> int:
+    """Insert-or-update entries on (contract, date) and apply the batch's delta.
+
+    Within one call the last row for a given date wins (ON CONFLICT cannot
+    touch the same row twice in one statement). Cost is proportional to the
+    batch, not to the contract: the summary is never re-aggregated here.
+
+    Raises EntryConflict, writing nothing, for dates whose entry has credit
+    payments. Overwritten rows are journaled as before/after diffs.
+    """
+    by_date = {}
+    for e in entries:
+        e.contract = contract
+        by_date[e.date] = e
+    dates = list(by_date)
+
+    with transaction.atomic():
+        _ensure_summary(contract.pk)
+        before = {
+            e.date: entry_snapshot(e)
+            for e in DailyEntry.objects.select_for_update().filter(contract=contract, date__in=dates)
+        }
+        conflicts = dates_with_payments(contract, before)
+        if conflicts:
+            raise EntryConflict(conflicts)
+
+        DailyEntry.objects.bulk_create(
+            list(by_date.values()),
+            update_conflicts=True,
+            unique_fields=["contract", "date"],
+            update_fields=ENTRY_UPSERT_FIELDS,
+        )
+        # tanggal yang punya rincian bahan: cost_material tetap dari rinciannya
+        line_totals = (
+            PurchaseLine.objects.filter(entry=OuterRef("pk")).order_by().values("entry").annotate(t=Sum("amount"))
+        )
+        DailyEntry.objects.filter(
+            pk__in=PurchaseLine.objects.filter(contract=contract, date__in=dates).values("entry_id")
+        ).update(cost_material=Subquery(line_totals.values("t")))
+
+        after = DailyEntry.objects.filter(contract=contract, date__in=dates).order_by("date")
+        _apply_many(contract.pk, [(before.get(e.date), entry_snapshot(e), e.pk) for e in after], source)
+    return len(by_date)
+
+
+def bulk_create_cash(contract, txs: list[CashTransaction]) -> int:
+    for tx in txs:
+        tx.contract = contract
+
+    with transaction.atomic():
+        _ensure_summary(contract.pk)
+        created = CashTransaction.objects.bulk_create(txs)
+        _apply_many(contract.pk, [(None, cash_snapshot(tx), tx.pk) for tx in created], LedgerEvent.IMPORT)
+    return len(txs)
+
+
+# =========================
+# READ / REBUILD
+# =========================
+# alias diberi prefix sum_ supaya tidak bentrok dengan nama field saat di-resolve
+def _entry_aggregates() -> dict:
+    credit = Q(payment_type="CREDIT")
+    return {
+        "sum_entry_count": Count("id"),
+        "sum_portions": Sum("portions"),
+        "sum_credit_portions": Sum("portions", filter=credit),
+        "sum_cost_material": Sum("cost_material"),
+        "sum_cost_labor": Sum("cost_labor"),
+        "sum_cost_overhead": Sum("cost_overhead"),
+        "sum_paid_cash": Sum("paid_amount", filter=~credit),
+        "sum_paid_credit": Sum("paid_amount", filter=credit),
+    }
+
+
+def _cash_aggregates() -> dict:
+    return {
+        "sum_manual_in": Sum("amount", filter=Q(flow=CashTransaction.IN)),
+        "sum_manual_out": Sum("amount", filter=Q(flow=CashTransaction.OUT)),
+    }
+
+
+def _totals(agg: dict) -> dict:
+    return {f: agg.get(f"sum_{f}") or 0 for f in SUMMARY_FIELDS}
+
+
+def compute_totals(contract_id: int) -> dict:
+    """Recompute summary fields from raw rows: one conditional aggregate per model."""
+    agg = DailyEntry.objects.filter(contract_id=contract_id).aggregate(**_entry_aggregates())
+    agg.update(CashTransaction.objects.filter(contract_id=contract_id).aggregate(**_cash_aggregates()))
+    return _totals(agg)
+
+
+def rebuild_summary(
+    contract_id: int,
+    source: str = LedgerEvent.REBUILD,
+    action: str = LedgerEvent.BULK,
+    object_id: int | None = None,
+    changes: dict | None = None,
+) -> ContractSummary:
+    """Recompute the contract's summary and all its period rollups from raw rows.
+
+    The difference to the previous summary is journaled as one event (a
+    plain rebuild only when it actually corrected something).
+    """
+    old = ContractSummary.objects.filter(contract_id=contract_id).values(*SUMMARY_FIELDS).first()
+    totals = compute_totals(contract_id)
+    summary, created = ContractSummary.objects.update_or_create(
+        contract_id=contract_id,
+        defaults=totals,
+        # mulai dari timestamp: baris yang dibuat ulang tidak mengulang versi (ETag) lama
+        create_defaults={**totals, "version": time.time_ns() // 1000},
+    )
+    if not created:
+        bump_version(contract_id)
+        summary.refresh_from_db(fields=["version", "updated_at"])
+    rebuild_rollups(contract_id)
+
+    delta = {f: totals[f] - (old[f] if old else 0) for f in SUMMARY_FIELDS}
+    if source != LedgerEvent.REBUILD or any(delta.values()):
+        journal.record(contract_id, source, action, delta, object_id, changes)
+    fragments.invalidate(contract_id)
+    alerts.evaluate(contract_id)
+    return summary
+
+
+def bump_version(contract_id: int) -> None:
+    """Mark the contract's derived data as changed (e.g. after a price edit)."""
+    ContractSummary.objects.filter(contract_id=contract_id).update(
+        version=F("version") + 1, updated_at=timezone.now()
+    )
+    fragments.invalidate(contract_id)
+    alerts.evaluate(contract_id)
+
+
+def data_version(contract_id: int) -> int | None:
+    """Current data version, or None if the summary has not been built yet."""
+    return (
+        ContractSummary.objects.filter(contract_id=contract_id).values_list("version", flat=True).first()
+    )
+
+
+def get_summary(contract) -> ContractSummary:
+    summary = ContractSummary.objects.filter(contract=contract).first()
+    if summary is None:
+        summary = rebuild_summary(contract.pk)
+    return summary
+
+
+async def aget_summary(contract) -> ContractSummary:
+    summary = await ContractSummary.objects.filter(contract=contract).afirst()
+    if summary is None:
+        summary = await sync_to_async(rebuild_summary)(contract.pk)
+    return summary
+
+
+def summary_drift(contract_id: int) -> dict:
+    """Fields where the stored summary disagrees with raw rows: {field: (stored, actual)}."""
+    stored = ContractSummary.objects.filter(contract_id=contract_id).first()
+    actual = compute_totals(contract_id)
+    drift = {}
+    for f in SUMMARY_FIELDS:
+        have = getattr(stored, f) if stored else None
+        if have is None or Decimal(have) != Decimal(actual[f]):
+            drift[f] = (have, actual[f])
+    return drift
+
+
+# =========================
+# PERIOD ROLLUPS (mingguan / bulanan)
+# =========================
+def period_starts(day) -> list[tuple[str, date]]:
+    return [
+        (PeriodRollup.WEEK, day - timedelta(days=day.weekday())),
+        (PeriodRollup.MONTH, day.replace(day=1)),
+    ]
+
+
+def compute_rollups(contract_id: int) -> dict[tuple[str, date], dict]:
+    """{(period, period_start): totals} from raw rows, one grouped query per model and period."""
+    out: dict = {}
+    for period, trunc in ((PeriodRollup.WEEK, TruncWeek), (PeriodRollup.MONTH, TruncMonth)):
+        for model, aggregates in ((DailyEntry, _entry_aggregates), (CashTransaction, _cash_aggregates)):
+            grouped = (
+                model.objects.filter(contract_id=contract_id)
+                .order_by()
+                .values(start=trunc("date"))
+                .annotate(**aggregates())
+            )
+            for row in grouped:
+                out.setdefault((period, row.pop("start")), {}).update(row)
+    return {key: _totals(agg) for key, agg in out.items()}
+
+
+def rebuild_rollups(contract_id: int) -> None:
+    PeriodRollup.objects.filter(contract_id=contract_id).delete()
+    PeriodRollup.objects.bulk_create(
+        PeriodRollup(contract_id=contract_id, period=period, period_start=start, **totals)
+        for (period, start), totals in compute_rollups(contract_id).items()
+    )
+
+
+def rollup_drift(contract_id: int) -> dict:
+    """Rollup rows that disagree with raw rows: {(period, start): (stored, actual)}."""
+    actual = compute_rollups(contract_id)
+    stored = {
+        (r.period, r.period_start): {f: getattr(r, f) for f in SUMMARY_FIELDS}
+        for r in PeriodRollup.objects.filter(contract_id=contract_id)
+    }
+    drift = {}
+    for key in set(actual) | set(stored):
+        have, want = stored.get(key), actual.get(key)
+        if want is None and have and not any(have.values()):
+            continue  # periode yang sudah kosong (semua nol) tidak dianggap drift
+        if have is None or want is None or any(Decimal(have[f]) != Decimal(want[f]) for f in SUMMARY_FIELDS):
+            drift[key] = (have, want)
+    return drift
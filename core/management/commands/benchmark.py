@@ -0,0 +1,212 @@
+import json
+import math
+import platform
+import time
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import perf, synthetic
+from core.auth import SESSION_KEY
+from core.models import CashTransaction, Contract, CreditPayment, DailyEntry, PurchaseLine
+from core.urls import urlpatterns
+
+DAYS_PER_CONTRACT = 10_000  # skala besar = lebih banyak kontrak, bukan rentang tanggal tak wajar
+SKIP = {"logout"}  # menghapus sesi benchmark
+NOISE_MS = 2.0  # selisih p50 di bawah ini tidak dihitung regresi
+# cache terpisah: cache.clear() di antara pengukuran tidak boleh menyentuh cache asli (Redis di production)
+BENCH_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark"}}
+
+# URL dengan <pk>: model + filter asal pk (kontrak aktif); URL <pk> lain dilewati
+PK_SOURCES = {
+    "entry_edit": (DailyEntry, {"contract__is_active": True}),
+    "entry_delete": (DailyEntry, {"contract__is_active": True}),
+    "entry_purchases": (DailyEntry, {"contract__is_active": True}),
+    "purchase_delete": (PurchaseLine, {"contract__is_active": True}),
+    "credit_payment_create": (DailyEntry, {"contract__is_active": True, "payment_type": "CREDIT"}),
+    "credit_payment_delete": (CreditPayment, {"entry__contract__is_active": True}),
+    "cash_edit": (CashTransaction, {"contract__is_active": True}),
+    "cash_delete": (CashTransaction, {"contract__is_active": True}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Ukur latency dan jumlah query setiap URL core pada DB uji sementara (dibuat seperti "
+        "manage.py test, DB asli tidak disentuh), untuk beberapa skala jumlah Input Harian. "
+        "Hasil berupa JSON; --compare membandingkan dengan laporan sebelumnya."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", default="100,10000", help="Jumlah Input Harian, dipisah koma (mis. 100,10000,1000000)")
+        parser.add_argument("--repeat", type=int, default=5, help="Pengukuran per URL (default 5)")
+        parser.add_argument("--warm", action="store_true", help="Jangan kosongkan cache di antara pengukuran")
+        parser.add_argument("--output", help="Tulis laporan JSON ke file ini (default stdout)")
+        parser.add_argument("--compare", help="Laporan JSON sebelumnya sebagai baseline")
+        parser.add_argument("--threshold", type=float, default=25.0, help="Batas kenaikan p50 dalam persen (default 25)")
+        parser.add_argument("--keepdb", action="store_true", help="Pakai ulang DB uji")
+
+    def handle(self, *args, **opts):
+        try:
+            scales = [int(s) for s in opts["scales"].split(",") if s.strip()]
+        except ValueError as exc:
+            raise CommandError("--scales harus berupa angka, mis. 100,10000") from exc
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=opts["keepdb"])
+        try:
+            results = []
+            with override_settings(CACHES=BENCH_CACHES):
+                for scale in scales:
+                    self.stderr.write(f"skala {scale}: seeding...")
+                    self._reset(scale)
+                    results += self._run(scale, opts["repeat"], opts["warm"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=opts["keepdb"])
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "vendor": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+                "repeat": opts["repeat"],
+                "warm": opts["warm"],
+            },
+            "results": results,
+        }
+        text = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                fh.write(text + "\n")
+        else:
+            self.stdout.write(text)
+
+        if opts["compare"]:
+            self._compare(opts["compare"], results, opts["threshold"])
+
+    # =========================
+    # DATA
+    # =========================
+    def _reset(self, scale: int) -> None:
+        CashTransaction.objects.all().delete()
+        Contract.objects.all().delete()
+        cache.clear()
+
+        days = min(scale, DAYS_PER_CONTRACT)
+        synthetic.seed(
+            contract_count=math.ceil(scale / days),
+            days=days,
+            cash_per_contract=max(1, days // 10),
+            activate=True,
+        )
+
+    def _url_kwargs(self, pattern) -> dict | None:
+        kwargs = {}
+        for name in pattern.pattern.converters:
+            if name == "contract_id":
+                kwargs[name] = Contract.objects.get(is_active=True).pk
+            elif name == "pk":
+                if pattern.name not in PK_SOURCES:
+                    return None
+                model, filters = PK_SOURCES[pattern.name]
+                kwargs[name] = model.objects.filter(**filters).values_list("pk", flat=True).first()
+                if kwargs[name] is None:
+                    return None  # data sintetis tidak punya baris ini
+            elif name == "kind":
+                kwargs[name] = "ledger"
+            elif name == "fmt":
+                kwargs[name] = "csv"
+            else:
+                return None
+        return kwargs
+
+    # =========================
+    # MEASURE
+    # =========================
+    def _run(self, scale: int, repeat: int, warm: bool) -> list[dict]:
+        client = Client()
+        session = client.session
+        session[SESSION_KEY] = True
+        session.save()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key  # signed_cookies
+
+        rows = []
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for pattern in urlpatterns:
+                if not pattern.name or pattern.name in SKIP:
+                    continue
+                kwargs = self._url_kwargs(pattern)
+                if kwargs is None:
+                    continue
+                path = reverse(pattern.name, kwargs=kwargs)
+
+                warmup = client.get(path)  # pemanasan (import, template loader)
+                warmup.getvalue()
+                if warmup.status_code == 405:
+                    continue  # hanya POST (hapus dsb.): tidak diukur lewat GET
+                timings, queries, status, size = [], 0, 0, 0
+                for _ in range(repeat):
+                    if not warm:
+                        cache.clear()
+                    with CaptureQueriesContext(connection) as ctx:
+                        t0 = time.perf_counter()
+                        response = client.get(path)
+                        size = len(response.getvalue())  # streaming export ikut terukur
+                        timings.append((time.perf_counter() - t0) * 1000)
+                    queries = max(queries, len(ctx.captured_queries))
+                    status = response.status_code
+
+                timings.sort()
+                rows.append(
+                    {
+                        "scale": scale,
+                        "name": pattern.name,
+                        "path": path,
+                        "status": status,
+                        "p50_ms": round(perf.percentile(timings, 50), 2),
+                        "p95_ms": round(perf.percentile(timings, 95), 2),
+                        "min_ms": round(timings[0], 2),
+                        "max_ms": round(timings[-1], 2),
+                        "queries": queries,
+                        "bytes": size,
+                    }
+                )
+                self.stderr.write(f"  {pattern.name:<16} p50={rows[-1]['p50_ms']:>9.2f}ms  q={queries}")
+        return rows
+
+    def _compare(self, baseline_path: str, results: list[dict], threshold: float) -> None:
+        try:
+            with open(baseline_path, encoding="utf-8") as fh:
+                baseline = {(r["scale"], r["name"]): r for r in json.load(fh)["results"]}
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Baseline tidak bisa dibaca: {exc}") from exc
+
+        regressions = []
+        for r in results:
+            base = baseline.get((r["scale"], r["name"]))
+            # redirect/404/405 bukan halaman yang dirender: tidak bisa jadi pembanding
+            if not base or not (_ok(r) and _ok(base)):
+                continue
+            slower = r["p50_ms"] > base["p50_ms"] * (1 + threshold / 100) and r["p50_ms"] - base["p50_ms"] > NOISE_MS
+            if slower or r["queries"] > base["queries"]:
+                regressions.append(
+                    f"[{r['scale']}] {r['name']}: p50 {base['p50_ms']} -> {r['p50_ms']} ms, "
+                    f"query {base['queries']} -> {r['queries']}"
+                )
+
+        for line in regressions:
+            self.stderr.write(line)
+        if regressions:
+            raise CommandError(f"{len(regressions)} URL lebih lambat dari baseline.")
+        self.stderr.write(self.style.SUCCESS("Tidak ada regresi dibanding baseline."))
+
+
+def _ok(row: dict) -> bool:
+    return 200 <= row.get("status", 0) < 300
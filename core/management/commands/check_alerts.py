@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import alerts, ledger
+from core.models import Contract
+
+
+class Command(BaseCommand):
+    help = (
+        "Hitung ulang alert kontrak aktif (umur piutang berubah walau tanpa input) "
+        "dan tampilkan alert baru yang belum dinotifikasi. Cocok dijalankan harian (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("contract_ids", nargs="*", type=int, help="Default: semua kontrak aktif")
+        parser.add_argument("--dry-run", action="store_true", help="Jangan tandai alert sebagai sudah dinotifikasi")
+
+    def handle(self, *args, contract_ids, dry_run, **options):
+        contracts = Contract.objects.filter(pk__in=contract_ids) if contract_ids else Contract.objects.filter(is_active=True)
+
+        for c in contracts.order_by("pk"):
+            before = {(a.rule, a.key, a.message) for a in alerts.active_alerts(c)}
+            after = {(a.rule, a.key, a.message) for a in alerts.evaluate(c.pk)}
+            if before != after:
+                # daftar alert ikut ETag API / cache dashboard
+                ledger.bump_version(c.pk)
+
+        pending = list(alerts.pending_notifications().filter(contract__in=contracts))
+        for a in pending:
+            self.stdout.write(f"[{a.contract_id}] {a.contract.name}: {a.message}")
+        if pending and not dry_run:
+            alerts.pending_notifications().filter(pk__in=[a.pk for a in pending]).update(notified_at=timezone.now())
+
+        self.stdout.write(self.style.SUCCESS(f"{len(pending)} alert baru."))
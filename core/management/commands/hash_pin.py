@@ -0,0 +1,24 @@
+from getpass import getpass
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.auth import hash_pin
+
+
+class Command(BaseCommand):
+    help = "Buat nilai PIN_HASH (PBKDF2-SHA256, bersalt) untuk env. Ganti hash SHA-256 lama dengan ini."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pin", help="PIN (default: ditanya tanpa ditampilkan)")
+        parser.add_argument("--iterations", type=int, help=f"Default: PIN_HASH_ITERATIONS ({settings.PIN_HASH_ITERATIONS})")
+
+    def handle(self, *args, pin, iterations, **options):
+        if pin is None:
+            pin = getpass("PIN: ")
+            if getpass("Ulangi PIN: ") != pin:
+                raise CommandError("PIN tidak sama.")
+        if not pin:
+            raise CommandError("PIN kosong.")
+
+        self.stdout.write(f"PIN_HASH={hash_pin(pin, iterations)}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import importers
+from core.contracts import get_active_contract
+from core.models import Contract
+
+
+class Command(BaseCommand):
+    help = "Import Input Harian / Transaksi Kas dari file CSV atau XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--kind", choices=sorted(importers.KINDS), default="entries")
+        parser.add_argument("--contract", type=int, help="ID kontrak (default: kontrak aktif)")
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, path, kind, contract, batch_size, **options):
+        c = Contract.objects.filter(pk=contract).first() if contract else get_active_contract()
+        if not c:
+            raise CommandError("Kontrak tidak ditemukan.")
+
+        try:
+            with open(path, "rb") as fh:
+                result = importers.import_ledger(c, kind, fh, path, batch_size=batch_size)
+        except (OSError, importers.ImportFormatError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        for line, msg in result["errors"]:
+            self.stderr.write(f"baris {line}: {msg}")
+
+        style = self.style.WARNING if result["error_count"] else self.style.SUCCESS
+        self.stdout.write(style(f"{result['imported']} baris tersimpan, {result['error_count']} ditolak ({c})."))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import ledger
+from core.models import Contract
+
+
+class Command(BaseCommand):
+    help = "Bangun ulang ContractSummary + PeriodRollup dari DailyEntry/CashTransaction, atau cek drift (--check)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("contract_ids", nargs="*", type=int, help="Default: semua kontrak")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Hanya laporkan selisih, jangan tulis. Exit code 1 jika ada drift.",
+        )
+
+    def handle(self, *args, contract_ids, check, **options):
+        contracts = Contract.objects.order_by("pk")
+        if contract_ids:
+            contracts = contracts.filter(pk__in=contract_ids)
+
+        drifted = 0
+        for c in contracts:
+            drift = ledger.summary_drift(c.pk)
+            rollup_drift = ledger.rollup_drift(c.pk)
+            if drift or rollup_drift:
+                drifted += 1
+                for field, (stored, actual) in drift.items():
+                    self.stdout.write(f"[{c.pk}] {field}: tersimpan={stored} seharusnya={actual}")
+                for (period, start), (stored, actual) in sorted(rollup_drift.items()):
+                    self.stdout.write(f"[{c.pk}] rollup {period} {start}: tersimpan={stored} seharusnya={actual}")
+
+            if not check:
+                ledger.rebuild_summary(c.pk)
+
+        if check:
+            if drifted:
+                raise CommandError(f"{drifted} kontrak punya ringkasan yang tidak sinkron.")
+            self.stdout.write(self.style.SUCCESS("Semua ringkasan sinkron."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{contracts.count()} ringkasan dibangun ulang ({drifted} sempat drift)."))
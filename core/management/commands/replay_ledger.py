@@ -0,0 +1,51 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import journal, ledger
+from core.models import Contract
+
+
+def _as_of(raw: str) -> datetime:
+    """`YYYY-MM-DD` (akhir hari itu) atau `YYYY-MM-DDTHH:MM[:SS]`, waktu lokal."""
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError as exc:
+        raise CommandError(f"Waktu tidak valid: {raw}") from exc
+    if "T" not in raw and " " not in raw:
+        value = datetime.combine(value.date(), time.max)
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+class Command(BaseCommand):
+    help = "Tampilkan ringkasan kontrak per waktu tertentu dari jurnal (snapshot + event), atau cek jurnal vs ringkasan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("contract_id", type=int)
+        parser.add_argument("--as-of", type=_as_of, help="YYYY-MM-DD atau YYYY-MM-DDTHH:MM (default: sekarang)")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Bandingkan replay sekarang dengan ContractSummary. Exit code 1 jika beda.",
+        )
+
+    def handle(self, *args, contract_id, as_of, check, **options):
+        contract = Contract.objects.filter(pk=contract_id).first()
+        if contract is None:
+            raise CommandError(f"Kontrak {contract_id} tidak ada.")
+
+        if check:
+            ledger.get_summary(contract)  # belum ada ringkasan: dibangun (dan dijurnal) dulu
+            drift = journal.replay_drift(contract)
+            for field, (stored, replayed) in drift.items():
+                self.stdout.write(f"[{contract_id}] {field}: tersimpan={stored} jurnal={replayed}")
+            if drift:
+                raise CommandError("Jurnal tidak cocok dengan ringkasan.")
+            self.stdout.write(self.style.SUCCESS("Jurnal cocok dengan ringkasan."))
+            return
+
+        summary = journal.replay(contract, as_of)
+        self.stdout.write(f"Kontrak {contract_id} per {timezone.localtime(as_of or timezone.now()):%Y-%m-%d %H:%M}")
+        for field in journal.TOTAL_TYPES:
+            self.stdout.write(f"  {field}: {getattr(summary, field)}")
@@ -0,0 +1,41 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from core import synthetic
+
+
+class Command(BaseCommand):
+    help = "Buat kontrak sintetis berisi Input Harian (tunai/kredit) dan Transaksi Kas untuk uji beban."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--contracts", type=int, default=1, help="Jumlah kontrak (default 1)")
+        parser.add_argument("--days", type=int, default=365, help="Input Harian per kontrak (default 365)")
+        parser.add_argument("--cash", type=int, default=100, help="Transaksi Kas per kontrak (default 100)")
+        parser.add_argument("--seed", type=int, default=0, help="Seed RNG, supaya data bisa diulang")
+        parser.add_argument("--start", type=date.fromisoformat, default=date(2020, 1, 1), help="Tanggal mulai (YYYY-MM-DD)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--clear", action="store_true", help="Hapus kontrak sintetis lama dulu")
+        parser.add_argument(
+            "--activate", action="store_true", help="Jadikan kontrak sintetis pertama aktif (kontrak asli tidak diubah)"
+        )
+
+    def handle(self, *args, **opts):
+        if opts["clear"]:
+            self.stdout.write(f"{synthetic.clear()} baris sintetis lama dihapus.")
+
+        result = synthetic.seed(
+            contract_count=opts["contracts"],
+            days=opts["days"],
+            cash_per_contract=opts["cash"],
+            rng_seed=opts["seed"],
+            start=opts["start"],
+            batch_size=opts["batch_size"],
+            activate=opts["activate"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(result['contracts'])} kontrak, {result['entries']} Input Harian, "
+                f"{result['cash']} Transaksi Kas dibuat."
+            )
+        )
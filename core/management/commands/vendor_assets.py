@@ -0,0 +1,63 @@
+import hashlib
+import re
+import urllib.request
+from base64 import b64encode
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.assets import VENDOR
+
+STATIC_DIR = Path(__file__).resolve().parents[2] / "static"
+
+# collectstatic (manifest) gagal kalau file .map yang dirujuk tidak ada; map tidak ikut di-vendor
+SOURCE_MAP = re.compile(rb"\n?(/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*)\s*$")
+
+
+def sri(body: bytes) -> str:
+    return "sha384-" + b64encode(hashlib.sha384(body).digest()).decode()
+
+
+class Command(BaseCommand):
+    help = (
+        "Unduh aset front-end yang dipin (Bootstrap, Chart.js) ke core/static/core/vendor/ untuk di-commit. "
+        "File yang tidak cocok dengan sha384 di core.assets.VENDOR tidak ditulis."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Unduh ulang walau file sudah ada")
+        parser.add_argument(
+            "--pin",
+            action="append",
+            default=[],
+            metavar="NAMA",
+            help="Tulis aset yang hash-nya belum dipin dan cetak sha384-nya untuk disalin ke VENDOR (mesin dev)",
+        )
+
+    def handle(self, *args, force, pin, **options):
+        for name, (path, url, integrity) in VENDOR.items():
+            target = STATIC_DIR / path
+            if target.exists() and not force:
+                self.stdout.write(f"{name}: sudah ada ({path})")
+                continue
+            if integrity is None and name not in pin:
+                raise CommandError(
+                    f"{name}: sha384 belum dipin di core.assets.VENDOR; jalankan `vendor_assets --pin {name}` "
+                    f"di mesin dev, periksa hasilnya, lalu commit file dan hash-nya"
+                )
+
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    body = response.read()
+            except OSError as exc:
+                raise CommandError(f"{name}: gagal mengunduh {url}: {exc}") from exc
+
+            # hash dicek atas file asli (sama dengan nilai SRI upstream), sebelum source map dibuang
+            digest = sri(body)
+            if integrity is not None and digest != integrity:
+                raise CommandError(f"{name}: sha384 tidak cocok ({digest}, harusnya {integrity}); file tidak ditulis")
+
+            body = SOURCE_MAP.sub(b"\n", body)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(body)
+            self.stdout.write(self.style.SUCCESS(f"{name}: {path} ({len(body)} byte, {digest})"))
@@ -0,0 +1,70 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+
+from . import perf
+from .contracts import for_request
+
+
+class ActiveContractMiddleware:
+    """Attach the (cached) active contract to the request as `request.active_contract`."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.active_contract = SimpleLazyObject(lambda: for_request(request))
+        return self.get_response(request)
+
+
+class PerfMiddleware:
+    """Record query count, DB/template time and latency per request (see core/perf.py)."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not settings.PERF_ENABLED:
+            raise MiddlewareNotUsed
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        perf.install(connection)
+        t0 = time.perf_counter()
+        sample, token = perf.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            sample.total_ms = (time.perf_counter() - t0) * 1000
+        return self._finish(request, response, sample, token)
+
+    async def __acall__(self, request):
+        t0 = time.perf_counter()
+        sample, token = perf.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            sample.total_ms = (time.perf_counter() - t0) * 1000
+        return self._finish(request, response, sample, token)
+
+    def _finish(self, request, response, sample, token):
+        match = getattr(request, "resolver_match", None)
+        sample.url_name = (match.view_name if match else "") or ""
+        sample.status = response.status_code
+        response["Server-Timing"] = perf.server_timing(sample)
+        perf.finish(sample, token)
+        return response
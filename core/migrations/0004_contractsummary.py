@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-16 22:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_cashtransaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractSummary',
+            fields=[
+                ('contract', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='core.contract')),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('portions', models.PositiveBigIntegerField(default=0)),
+                ('credit_portions', models.PositiveBigIntegerField(default=0)),
+                ('cost_material', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cost_labor', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cost_overhead', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('paid_cash', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('paid_credit', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('manual_in', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('manual_out', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
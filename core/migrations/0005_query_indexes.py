@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-16 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_contractsummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cashtransaction',
+            index=models.Index(fields=['contract', 'flow', 'date'], name='cash_contract_flow_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cashtransaction',
+            index=models.Index(fields=['contract', '-date', '-id'], name='cash_contract_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='contract_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyentry',
+            index=models.Index(fields=['contract', '-date', '-id'], name='entry_contract_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyentry',
+            index=models.Index(fields=['contract', 'payment_type'], include=('portions', 'paid_amount'), name='entry_contract_payment_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-16 22:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def drop_summaries(apps, schema_editor):
+    # ringkasan lama belum punya rollup: hapus supaya dibangun ulang penuh (ringkasan + rollup)
+    # saat pertama dibaca/ditulis, lihat core.ledger.rebuild_summary
+    apps.get_model("core", "ContractSummary").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('portions', models.PositiveBigIntegerField(default=0)),
+                ('credit_portions', models.PositiveBigIntegerField(default=0)),
+                ('cost_material', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cost_labor', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cost_overhead', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('paid_cash', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('paid_credit', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('manual_in', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('manual_out', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('period', models.CharField(choices=[('W', 'Mingguan'), ('M', 'Bulanan')], max_length=1)),
+                ('period_start', models.DateField()),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='core.contract')),
+            ],
+            options={
+                'ordering': ['period', 'period_start'],
+                'unique_together': {('contract', 'period', 'period_start')},
+            },
+        ),
+        migrations.RunPython(drop_summaries, migrations.RunPython.noop),
+    ]
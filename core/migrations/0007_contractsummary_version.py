@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-16 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_periodrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractsummary',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-16 22:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_contractsummary_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreditPayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('notes', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-date', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyentry',
+            index=models.Index(fields=['contract', 'payment_type', 'credit_due_date'], name='entry_contract_credit_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='creditpayment',
+            name='entry',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='core.dailyentry'),
+        ),
+    ]
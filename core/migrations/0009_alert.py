@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-16 22:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_ar_aging'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule', models.CharField(choices=[('margin_low', 'Margin di bawah target'), ('cost_spike', 'Lonjakan biaya'), ('ar_overdue', 'Piutang lewat jatuh tempo')], max_length=20)),
+                ('key', models.CharField(blank=True, max_length=30)),
+                ('message', models.CharField(max_length=200)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('threshold', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('as_of', models.DateField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('raised_at', models.DateTimeField()),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='core.contract')),
+            ],
+            options={
+                'ordering': ['rule', 'key'],
+                'indexes': [models.Index(condition=models.Q(('is_active', True)), fields=['contract', 'rule'], name='alert_contract_active_idx')],
+                'unique_together': {('contract', 'rule', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 6.0.2 on 2026-10-16 23:02
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def drop_summaries(apps, schema_editor):
+    # ringkasan yang ada belum punya jurnal: hapus supaya dibangun ulang lewat
+    # core.ledger.rebuild_summary, yang mencatat totalnya sebagai event awal
+    apps.get_model("core", "ContractSummary").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_alert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('at', models.DateTimeField(auto_now_add=True)),
+                ('source', models.CharField(choices=[('entry', 'Input Harian'), ('cash', 'Transaksi Kas'), ('payment', 'Pelunasan Piutang'), ('import', 'Import'), ('rebuild', 'Bangun ulang ringkasan')], max_length=10)),
+                ('action', models.CharField(choices=[('create', 'Tambah'), ('update', 'Ubah'), ('delete', 'Hapus'), ('bulk', 'Massal')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('changes', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('delta', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='core.contract')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['contract', 'id'], name='event_contract_seq_idx'), models.Index(fields=['contract', 'at'], name='event_contract_at_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('portions', models.PositiveBigIntegerField(default=0)),
+                ('credit_portions', models.PositiveBigIntegerField(default=0)),
+                ('cost_material', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cost_labor', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cost_overhead', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('paid_cash', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('paid_credit', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('manual_in', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('manual_out', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('event_id', models.PositiveBigIntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='core.contract')),
+            ],
+            options={
+                'ordering': ['event_id'],
+                'indexes': [models.Index(fields=['contract', 'taken_at'], name='snapshot_contract_at_idx')],
+                'unique_together': {('contract', 'event_id')},
+            },
+        ),
+        migrations.RunPython(drop_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-16 23:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_ledger_journal'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ledgerevent',
+            name='source',
+            field=models.CharField(choices=[('entry', 'Input Harian'), ('cash', 'Transaksi Kas'), ('payment', 'Pelunasan Piutang'), ('batch', 'Input Massal'), ('import', 'Import'), ('rebuild', 'Bangun ulang ringkasan')], max_length=10),
+        ),
+    ]
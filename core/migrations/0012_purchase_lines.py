@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-16 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_ledgerevent_batch_source'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ledgerevent',
+            name='source',
+            field=models.CharField(choices=[('entry', 'Input Harian'), ('cash', 'Transaksi Kas'), ('payment', 'Pelunasan Piutang'), ('purchase', 'Pembelian Bahan'), ('batch', 'Input Massal'), ('import', 'Import'), ('rebuild', 'Bangun ulang ringkasan')], max_length=10),
+        ),
+        migrations.CreateModel(
+            name='PurchaseLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('ingredient', models.CharField(max_length=80)),
+                ('unit', models.CharField(default='kg', max_length=16)),
+                ('qty', models.DecimalField(decimal_places=3, max_digits=12)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('cash_tx', models.ForeignKey(blank=True, limit_choices_to={'flow': 'OUT'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchase_lines', to='core.cashtransaction')),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to='core.contract')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to='core.dailyentry')),
+            ],
+            options={
+                'ordering': ['ingredient', 'id'],
+                'indexes': [models.Index(fields=['contract', 'date'], include=('ingredient', 'unit', 'qty', 'amount'), name='purchase_contract_date_idx'), models.Index(fields=['contract', 'ingredient', 'date'], name='purchase_contract_ingr_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,6 @@
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 class Contract(models.Model):
@@ -14,6 +17,16 @@ class Contract(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # get_active_contract(): is_active=True ORDER BY -created_at
+            models.Index(
+                fields=["-created_at"],
+                name="contract_active_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} ({'aktif' if self.is_active else 'nonaktif'})"
 
@@ -39,6 +52,21 @@ class DailyEntry(models.Model):
     class Meta:
         unique_together = [("contract", "date")]
         ordering = ["-date", "-id"]
+        indexes = [
+            # history: per kontrak, terbaru dulu (keyset di (date, id))
+            models.Index(fields=["contract", "-date", "-id"], name="entry_contract_recent_idx"),
+            # total tunai/kredit; INCLUDE hanya dipakai di PostgreSQL
+            models.Index(
+                fields=["contract", "payment_type"],
+                include=["portions", "paid_amount"],
+                name="entry_contract_payment_idx",
+            ),
+            # umur piutang: kredit per kontrak, urut jatuh tempo
+            models.Index(
+                fields=["contract", "payment_type", "credit_due_date"],
+                name="entry_contract_credit_due_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.portions} porsi"
@@ -51,8 +79,8 @@ class DailyEntry(models.Model):
     def sales_amount(self):
         # nilai penjualan = porsi * harga kontrak
         if self.contract_id and self.portions:
-            return float(self.portions) * float(self.contract.price_per_portion)
-        return 0.0
+            return self.portions * self.contract.price_per_portion
+        return Decimal("0")
         
     @property
     def total_cost(self):
@@ -86,6 +114,239 @@ class CashTransaction(models.Model):
 
     class Meta:
         ordering = ["-date", "-id"]
+        indexes = [
+            models.Index(fields=["contract", "flow", "date"], name="cash_contract_flow_date_idx"),
+            models.Index(fields=["contract", "-date", "-id"], name="cash_contract_recent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.flow} {self.category} {self.amount}"
+
+
+class CreditPayment(models.Model):
+    """Pelunasan (sebagian) penjualan kredit; entry.paid_amount = total pembayarannya (lihat ledger)."""
+
+    entry = models.ForeignKey(DailyEntry, on_delete=models.CASCADE, related_name="payments")
+    date = models.DateField()
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    notes = models.CharField(max_length=200, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-date", "-id"]
+
+    def __str__(self):
+        return f"{self.date} bayar {self.amount} ({self.entry.date})"
+
+class PurchaseLine(models.Model):
+    # rincian bahan satu Input Harian; total amount = DailyEntry.cost_material (dijaga core/ledger.py)
+    entry = models.ForeignKey(DailyEntry, on_delete=models.CASCADE, related_name="purchases")
+    cash_tx = models.ForeignKey(
+        CashTransaction,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="purchase_lines",
+        limit_choices_to={"flow": CashTransaction.OUT},
+    )
+
+    # salinan dari entry, supaya laporan per rentang tanggal tidak perlu join
+    contract = models.ForeignKey("Contract", on_delete=models.CASCADE, related_name="purchases")
+    date = models.DateField()
+
+    ingredient = models.CharField(max_length=80)
+    unit = models.CharField(max_length=16, default="kg")
+    qty = models.DecimalField(max_digits=12, decimal_places=3)
+    unit_price = models.DecimalField(max_digits=14, decimal_places=2)
+    amount = models.DecimalField(max_digits=16, decimal_places=2)  # qty * unit_price, dibulatkan ke sen
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["ingredient", "id"]
+        indexes = [
+            # top bahan per rentang tanggal; INCLUDE hanya dipakai di PostgreSQL
+            models.Index(
+                fields=["contract", "date"],
+                include=["ingredient", "unit", "qty", "amount"],
+                name="purchase_contract_date_idx",
+            ),
+            # riwayat harga satu bahan
+            models.Index(fields=["contract", "ingredient", "date"], name="purchase_contract_ingr_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.ingredient} {self.qty} {self.unit}"
+
+
+class LedgerTotals(models.Model):
+    # total berjalan yang dijaga oleh core/ledger.py (dipakai ContractSummary & PeriodRollup)
+    entry_count = models.PositiveIntegerField(default=0)
+    portions = models.PositiveBigIntegerField(default=0)
+    credit_portions = models.PositiveBigIntegerField(default=0)
+
+    cost_material = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    cost_labor = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    cost_overhead = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    paid_cash = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    paid_credit = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    manual_in = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    manual_out = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def total_cost(self):
+        return self.cost_material + self.cost_labor + self.cost_overhead
+
+    @property
+    def paid_total(self):
+        return self.paid_cash + self.paid_credit
+
+
+class ContractSummary(LedgerTotals):
+    # ringkasan berjalan per kontrak, di-update di transaksi yang sama dengan setiap tulis
+    # (lihat core/ledger.py). Bisa dibangun ulang: manage.py rebuild_summaries
+    contract = models.OneToOneField(
+        "Contract", on_delete=models.CASCADE, primary_key=True, related_name="summary"
+    )
+
+    # naik setiap ada tulis entry/kas/kontrak; dipakai untuk ETag & cache
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Ringkasan {self.contract_id}: {self.entry_count} entri, {self.portions} porsi"
+
+
+class PeriodRollup(LedgerTotals):
+    # total per minggu (mulai Senin) / per bulan, dijaga incremental oleh core/ledger.py
+    WEEK = "W"
+    MONTH = "M"
+    PERIOD_CHOICES = [
+        (WEEK, "Mingguan"),
+        (MONTH, "Bulanan"),
+    ]
+
+    contract = models.ForeignKey("Contract", on_delete=models.CASCADE, related_name="rollups")
+    period = models.CharField(max_length=1, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+
+    class Meta:
+        unique_together = [("contract", "period", "period_start")]
+        ordering = ["period", "period_start"]
+
+    def __str__(self):
+        return f"{self.contract_id} {self.period} {self.period_start}"
+
+
+class LedgerEvent(models.Model):
+    # jurnal append-only: satu baris per perubahan ledger (ditulis oleh core/ledger.py, lihat core/journal.py)
+    ENTRY = "entry"
+    CASH = "cash"
+    PAYMENT = "payment"
+    PURCHASE = "purchase"
+    BATCH = "batch"
+    IMPORT = "import"
+    REBUILD = "rebuild"
+    SOURCE_CHOICES = [
+        (ENTRY, "Input Harian"),
+        (CASH, "Transaksi Kas"),
+        (PAYMENT, "Pelunasan Piutang"),
+        (PURCHASE, "Pembelian Bahan"),
+        (BATCH, "Input Massal"),
+        (IMPORT, "Import"),
+        (REBUILD, "Bangun ulang ringkasan"),
+    ]
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    BULK = "bulk"
+    ACTION_CHOICES = [
+        (CREATE, "Tambah"),
+        (UPDATE, "Ubah"),
+        (DELETE, "Hapus"),
+        (BULK, "Massal"),
+    ]
+
+    contract = models.ForeignKey("Contract", on_delete=models.CASCADE, related_name="events")
+    at = models.DateTimeField(auto_now_add=True)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)  # bukan FK: barisnya bisa sudah dihapus
+
+    # create/delete: isi baris; update: {field: [lama, baru]} yang berubah saja
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # perubahan ContractSummary karena event ini ({field: nilai}, yang tidak nol saja)
+    delta = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # replay: event per kontrak sesudah snapshot, sampai waktu tertentu
+            models.Index(fields=["contract", "id"], name="event_contract_seq_idx"),
+            models.Index(fields=["contract", "at"], name="event_contract_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.contract_id} #{self.pk} {self.source} {self.action} {self.object_id or ''}".rstrip()
+
+
+class LedgerSnapshot(LedgerTotals):
+    # total ContractSummary sesudah event `event_id`; titik awal replay (core/journal.py)
+    contract = models.ForeignKey("Contract", on_delete=models.CASCADE, related_name="snapshots")
+    event_id = models.PositiveBigIntegerField()
+    taken_at = models.DateTimeField()  # = LedgerEvent.at dari event_id
+
+    class Meta:
+        unique_together = [("contract", "event_id")]
+        ordering = ["event_id"]
+        indexes = [models.Index(fields=["contract", "taken_at"], name="snapshot_contract_at_idx")]
+
+    def __str__(self):
+        return f"Snapshot {self.contract_id} @ event {self.event_id}"
+
+
+class Alert(models.Model):
+    # peringatan aktif per kontrak, dihitung ulang oleh core/alerts.py setiap ada tulis ledger
+    MARGIN_LOW = "margin_low"
+    COST_SPIKE = "cost_spike"
+    AR_OVERDUE = "ar_overdue"
+    RULE_CHOICES = [
+        (MARGIN_LOW, "Margin di bawah target"),
+        (COST_SPIKE, "Lonjakan biaya"),
+        (AR_OVERDUE, "Piutang lewat jatuh tempo"),
+    ]
+
+    contract = models.ForeignKey("Contract", on_delete=models.CASCADE, related_name="alerts")
+    rule = models.CharField(max_length=20, choices=RULE_CHOICES)
+    key = models.CharField(max_length=30, blank=True)  # mis. kategori biaya untuk COST_SPIKE
+
+    message = models.CharField(max_length=200)
+    value = models.DecimalField(max_digits=16, decimal_places=2)
+    threshold = models.DecimalField(max_digits=16, decimal_places=2)
+    as_of = models.DateField()  # tanggal data yang memicu
+
+    is_active = models.BooleanField(default=True)
+    raised_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    notified_at = models.DateTimeField(null=True, blank=True)  # diisi manage.py check_alerts
+
+    class Meta:
+        unique_together = [("contract", "rule", "key")]
+        ordering = ["rule", "key"]
+        indexes = [
+            # dashboard: alert aktif per kontrak
+            models.Index(
+                fields=["contract", "rule"],
+                name="alert_contract_active_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
-        return f"{self.date} {self.flow} {self.category} {self.amount}"
\ No newline at end of file
+        return f"{self.contract_id} {self.rule}{':' + self.key if self.key else ''} ({'aktif' if self.is_active else 'selesai'})"
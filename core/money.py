@@ -0,0 +1,52 @@
+"""Money helpers: keep amounts as Decimal end to end.
+
+Sums come out of SQL as Decimal; derived values (per-portion, ratios) are
+computed in Decimal and only rounded for display. Floats are used only at
+the Chart.js edge, where the browser needs plain numbers.
+"""
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+ZERO = Decimal("0")
+CENT = Decimal("0.01")
+UNIT = Decimal("1")
+HUNDRED = Decimal("100")
+
+# "1,234,567" -> "1.234.567" (format Indonesia)
+_THOUSANDS = str.maketrans(",", ".")
+
+
+def to_decimal(value) -> Decimal:
+    """Decimal from Decimal/int/str/float (floats via str, so 0.1 stays 0.1)."""
+    if isinstance(value, Decimal):
+        return value
+    if value is None:
+        return ZERO
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def money(value) -> Decimal:
+    """Round to sen (2 places), half-up."""
+    return to_decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def ratio(num, den) -> Decimal:
+    """num / den, or 0 when den is 0."""
+    den = to_decimal(den)
+    return to_decimal(num) / den if den else ZERO
+
+
+def format_rupiah(value) -> str:
+    """`Rp 1.234.567` (rounded half-up to whole rupiah). Raises on non-numeric input."""
+    amount = to_decimal(value).quantize(UNIT, rounding=ROUND_HALF_UP) + ZERO  # -0 -> 0
+    return "Rp " + format(amount, ",f").translate(_THOUSANDS)
+
+
+def try_format_rupiah(value):
+    try:
+        return format_rupiah(value)
+    except (TypeError, ValueError, InvalidOperation):
+        return value
@@ -0,0 +1,166 @@
+"""Per-request performance samples: SQL count/time, template time, total latency.
+
+PerfMiddleware (core/middleware.py) opens a Sample per request in a
+ContextVar; SQL is timed by an execute wrapper installed on every DB
+connection (so async ORM calls running in worker threads are counted too)
+and template rendering by the TimedDjangoTemplates backend. Finished samples go into a fixed-size
+in-memory ring buffer (per process) that /debug/perf/ summarises as
+p50/p95/p99 per URL name. Everything is a few perf_counter() calls per query
+or render, so it can stay on in production.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+from django.utils import timezone
+
+logger = logging.getLogger("core.perf")
+
+_current: ContextVar["Sample | None"] = ContextVar("core_perf_sample", default=None)
+_buffer: deque = deque(maxlen=settings.PERF_BUFFER_SIZE)
+
+
+@dataclass
+class Sample:
+    method: str
+    path: str
+    url_name: str = ""
+    status: int = 0
+    queries: int = 0
+    db_ms: float = 0.0
+    template_ms: float = 0.0
+    total_ms: float = 0.0
+    at: datetime = field(default_factory=timezone.now)
+    _render_depth: int = 0
+
+
+# =========================
+# COLLECTORS
+# =========================
+def start(request) -> tuple[Sample, object]:
+    sample = Sample(method=request.method, path=request.path)
+    return sample, _current.set(sample)
+
+
+def finish(sample: Sample, token) -> None:
+    _current.reset(token)
+    _buffer.append(sample)
+    if settings.PERF_LOG:
+        record = {k: v for k, v in asdict(sample).items() if not k.startswith("_")}
+        logger.info(json.dumps(record, separators=(",", ":"), default=str))
+
+
+def _timed_execute(execute, sql, params, many, context):
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.db_ms += (time.perf_counter() - t0) * 1000
+
+
+def install(connection) -> None:
+    """Add the query timer to a DB connection (once; see core/signals.py).
+
+    Inserted at the front so `with connection.execute_wrapper(...)` blocks,
+    which pop the last wrapper, never remove it.
+    """
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _timed_execute)
+
+
+def server_timing(sample: Sample) -> str:
+    return (
+        f'db;dur={sample.db_ms:.1f};desc="{sample.queries} queries", '
+        f"tpl;dur={sample.template_ms:.1f}, "
+        f"total;dur={sample.total_ms:.1f}"
+    )
+
+
+class _TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        sample = _current.get()
+        if sample is None or sample._render_depth:
+            return self.template.render(context, request)
+
+        sample._render_depth += 1
+        t0 = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            sample.template_ms += (time.perf_counter() - t0) * 1000
+            sample._render_depth -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates whose templates add their render time to the current sample."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+# =========================
+# REPORT
+# =========================
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+def report() -> list[dict]:
+    """One row per URL name from the ring buffer, slowest p95 first."""
+    groups: dict[str, list[Sample]] = {}
+    for s in list(_buffer):
+        groups.setdefault(s.url_name or s.path, []).append(s)
+
+    rows = []
+    for name, samples in groups.items():
+        total = sorted(s.total_ms for s in samples)
+        rows.append(
+            {
+                "name": name,
+                "count": len(samples),
+                "p50": percentile(total, 50),
+                "p95": percentile(total, 95),
+                "p99": percentile(total, 99),
+                "queries_avg": sum(s.queries for s in samples) / len(samples),
+                "queries_max": max(s.queries for s in samples),
+                "db_p95": percentile(sorted(s.db_ms for s in samples), 95),
+                "template_p95": percentile(sorted(s.template_ms for s in samples), 95),
+                "errors": sum(1 for s in samples if s.status >= 500),
+            }
+        )
+    rows.sort(key=lambda r: r["p95"], reverse=True)
+    return rows
+
+
+def recent(limit: int = 50) -> list[Sample]:
+    return list(_buffer)[-limit:][::-1]
+
+
+def clear() -> None:
+    _buffer.clear()
@@ -0,0 +1,370 @@
+"""Read-side queries for the report pages.
+
+Derived money columns are computed in SQL so the views never have to
+materialize DailyEntry objects just to multiply or add fields.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+from django.utils.timezone import now
+
+from . import ledger
+from .models import Contract, ContractSummary, DailyEntry, PeriodRollup, PurchaseLine
+from .money import CENT, HUNDRED, ZERO, money, ratio
+
+MONEY = DecimalField(max_digits=18, decimal_places=2)
+
+
+def sales_expression(price):
+    # nilai penjualan = porsi * harga kontrak
+    return ExpressionWrapper(F("portions") * Value(price, output_field=MONEY), output_field=MONEY)
+
+
+def cashflow_totals(contract, summary) -> dict:
+    """Sales, cash-in and receivable totals for the cashflow page (from ContractSummary)."""
+    price = contract.price_per_portion
+
+    credit_sales_total = summary.credit_portions * price
+    credit_paid_total = summary.paid_credit
+    return {
+        "sales_total": summary.portions * price,
+        "cash_in_total": summary.paid_total,
+        "credit_sales_total": credit_sales_total,
+        "credit_paid_total": credit_paid_total,
+        "ar_outstanding": max(ZERO, credit_sales_total - credit_paid_total),
+    }
+
+
+def _cashflow_rows_qs(contract, days: int):
+    since = now().date() - timedelta(days=days - 1)
+    return (
+        DailyEntry.objects.filter(contract=contract, date__gte=since)
+        .order_by("date")
+        .annotate(sales=sales_expression(contract.price_per_portion))
+        .values("date", "payment_type", "sales", cash_in=F("paid_amount"), due=F("credit_due_date"))
+    )
+
+
+def cashflow_rows(contract, days: int = 7) -> list[dict]:
+    """Daily sales vs cash-in rows for the last `days` days, oldest first."""
+    return list(_cashflow_rows_qs(contract, days))
+
+
+async def acashflow_rows(contract, days: int = 7) -> list[dict]:
+    return [row async for row in _cashflow_rows_qs(contract, days)]
+
+
+# =========================
+# PIUTANG (AR aging)
+# =========================
+AGING_BUCKETS = [
+    ("current", "Belum jatuh tempo"),
+    ("d1_30", "1-30 hari"),
+    ("d31_60", "31-60 hari"),
+    ("d60_plus", "> 60 hari"),
+]
+
+
+def _outstanding_credit(contract):
+    """Credit entries with their outstanding amount (sales - paid) annotated, > 0 only."""
+    outstanding = ExpressionWrapper(
+        sales_expression(contract.price_per_portion) - F("paid_amount"), output_field=MONEY
+    )
+    return (
+        DailyEntry.objects.filter(contract=contract, payment_type="CREDIT")
+        .annotate(outstanding=outstanding)
+        .filter(outstanding__gt=0)
+    )
+
+
+def ar_aging(contract, as_of: date | None = None) -> dict:
+    """Outstanding credit per aging bucket (days past credit_due_date), in one aggregate query.
+
+    Entries without a due date count as current.
+    """
+    as_of = as_of or now().date()
+    o = F("outstanding")
+    bands = {
+        "current": Q(credit_due_date__isnull=True) | Q(credit_due_date__gte=as_of),
+        "d1_30": Q(credit_due_date__lt=as_of, credit_due_date__gte=as_of - timedelta(days=30)),
+        "d31_60": Q(credit_due_date__lt=as_of - timedelta(days=30), credit_due_date__gte=as_of - timedelta(days=60)),
+        "d60_plus": Q(credit_due_date__lt=as_of - timedelta(days=60)),
+    }
+    agg = _outstanding_credit(contract).aggregate(
+        **{f"sum_{key}": Sum(Case(When(q, then=o), default=Value(ZERO), output_field=MONEY)) for key, q in bands.items()},
+        **{f"count_{key}": Count("id", filter=q) for key, q in bands.items()},
+    )
+    buckets = [
+        {"key": key, "label": label, "amount": agg[f"sum_{key}"] or ZERO, "count": agg[f"count_{key}"]}
+        for key, label in AGING_BUCKETS
+    ]
+    return {
+        "as_of": as_of,
+        "buckets": buckets,
+        "total": sum((b["amount"] for b in buckets), ZERO),
+        "count": sum(b["count"] for b in buckets),
+    }
+
+
+def ar_open_items(contract, as_of: date | None = None, limit: int = 200) -> list[DailyEntry]:
+    """Oldest-due outstanding credit entries (uses the contract/payment_type/due-date index)."""
+    as_of = as_of or now().date()
+    items = list(
+        _outstanding_credit(contract)
+        .order_by(F("credit_due_date").asc(nulls_last=True), "date")
+        .only("date", "portions", "paid_amount", "credit_due_date")[:limit]
+    )
+    for e in items:
+        e.days_overdue = max(0, (as_of - e.credit_due_date).days) if e.credit_due_date else 0
+    return items
+
+
+# =========================
+# DASHBOARD
+# =========================
+def _daily_series_qs(contract):
+    total_cost = ExpressionWrapper(
+        F("cost_material") + F("cost_labor") + F("cost_overhead"), output_field=MONEY
+    )
+    # margin untuk grafik: dibagi sebagai float supaya SQLite tidak melakukan pembagian integer
+    price = Value(float(contract.price_per_portion), output_field=FloatField())
+    margin = Case(
+        When(portions__gt=0, then=price - F("total_cost") / Cast("portions", FloatField())),
+        default=price,
+        output_field=FloatField(),
+    )
+    return (
+        DailyEntry.objects.filter(contract=contract)
+        .order_by("date")
+        .annotate(total_cost=total_cost)
+        .annotate(margin=margin)
+        .values_list(
+            "date", "portions", "cost_material", "cost_labor", "cost_overhead", "total_cost", "margin"
+        )
+    )
+
+
+def daily_series(contract) -> list[tuple]:
+    """(date, portions, material, labor, overhead, total_cost, margin_per_portion) per day, oldest first."""
+    return list(_daily_series_qs(contract))
+
+
+def dashboard_data(contract, series: list[tuple] | None = None) -> dict:
+    """KPI and chart series for the dashboard, from a single query (alerts: core/alerts.py).
+
+    Money KPIs are Decimal; the chart lists (labels, margin_series,
+    target_series, donut) are floats for Chart.js. Pass `series` when it
+    has already been fetched (see adashboard_data).
+    """
+    if series is None:
+        series = daily_series(contract)
+
+    total_portions = 0
+    sum_mat = sum_lab = sum_ovh = ZERO
+    labels: list[str] = []
+    margin_series: list[float] = []
+    for day, portions, mat, lab, ovh, _cost, margin in series:
+        total_portions += portions or 0
+        sum_mat += mat
+        sum_lab += lab
+        sum_ovh += ovh
+        labels.append(day.strftime("%d %b"))
+        margin_series.append(round(margin, 2))
+    total_cost = sum_mat + sum_lab + sum_ovh
+
+    price = contract.price_per_portion
+    revenue = total_portions * price
+    profit = revenue - total_cost
+
+    cpp = money(ratio(total_cost, total_portions))
+    mpp = price - cpp
+
+    target_margin_per_portion = money(price * contract.target_margin_pct / HUNDRED)
+    target_cost_per_portion = price - target_margin_per_portion
+
+    target_total_portions = int(contract.target_portions_per_day * contract.duration_days)
+    target_profit_total = target_margin_per_portion * target_total_portions
+
+    progress_portions = ratio(total_portions * HUNDRED, target_total_portions)
+
+    projected_profit = (price - cpp) * target_total_portions
+    dev_vs_target_pct = ratio((projected_profit - target_profit_total) * HUNDRED, target_profit_total)
+
+    return {
+        "kpi": {
+            "kpi_mpp": mpp,
+            "kpi_cpp": cpp,
+            "kpi_profit": profit,
+            "kpi_projected_profit": projected_profit,
+            "price": price,
+            "target_margin_per_portion": target_margin_per_portion,
+            "target_cost_per_portion": target_cost_per_portion,
+            "total_portions": total_portions,
+            "revenue": revenue,
+            "total_cost": total_cost,
+            "progress_portions": progress_portions.quantize(CENT),
+            "target_total_portions": target_total_portions,
+            "target_profit_total": target_profit_total,
+            "dev_vs_target_pct": dev_vs_target_pct.quantize(CENT),
+            "sum_mat": sum_mat,
+            "sum_lab": sum_lab,
+            "sum_ovh": sum_ovh,
+        },
+        "labels": labels,
+        "margin_series": margin_series,
+        "target_series": [float(target_margin_per_portion)] * len(series),
+        "donut": [float(sum_mat), float(sum_lab), float(sum_ovh)],
+    }
+
+
+async def adashboard_data(contract) -> dict:
+    return dashboard_data(contract, [row async for row in _daily_series_qs(contract)])
+
+
+# =========================
+# HISTORY (keyset pagination)
+# =========================
+def parse_cursor(raw: str | None) -> tuple[date, int] | None:
+    """`YYYY-MM-DD_<id>` -> (date, id); anything invalid means "from the top"."""
+    if not raw:
+        return None
+    try:
+        day, pk = raw.split("_", 1)
+        return date.fromisoformat(day), int(pk)
+    except ValueError:
+        return None
+
+
+def history_page(contract, cursor: tuple[date, int] | None, page_size: int) -> tuple[list, str | None]:
+    """One page of entries (newest first) after `cursor`, plus the cursor for the next page."""
+    total_cost = ExpressionWrapper(
+        F("cost_material") + F("cost_labor") + F("cost_overhead"), output_field=MONEY
+    )
+    qs = (
+        DailyEntry.objects.filter(contract=contract)
+        .only("id", "date", "portions", "cost_material", "cost_labor", "cost_overhead")
+        .annotate(cost_total=total_cost)
+        .order_by("-date", "-id")
+    )
+    if cursor:
+        day, pk = cursor
+        qs = qs.filter(Q(date__lt=day) | Q(date=day, id__lt=pk))
+
+    rows = list(qs[: page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = f"{last.date.isoformat()}_{last.pk}"
+    return rows, next_cursor
+
+
+# =========================
+# TREND (period rollups)
+# =========================
+def trend(contract, period: str) -> list[dict]:
+    """Weekly/monthly P&L rows read from PeriodRollup, oldest first."""
+    price = contract.price_per_portion
+    rows = []
+    for r in PeriodRollup.objects.filter(contract=contract, period=period).order_by("period_start"):
+        if not r.entry_count and not (r.manual_in or r.manual_out):
+            continue
+        revenue = r.portions * price
+        total_cost = r.total_cost
+        rows.append(
+            {
+                "period_start": r.period_start,
+                "portions": r.portions,
+                "revenue": revenue,
+                "cost_material": r.cost_material,
+                "cost_labor": r.cost_labor,
+                "cost_overhead": r.cost_overhead,
+                "total_cost": total_cost,
+                "profit": revenue - total_cost,
+                "cost_per_portion": money(ratio(total_cost, r.portions)),
+                "cash_in": r.paid_total + r.manual_in,
+                "cash_out": r.manual_out,
+                "credit_outstanding": max(ZERO, r.credit_portions * price - r.paid_credit),
+            }
+        )
+    return rows
+
+
+# =========================
+# BAHAN (rincian pembelian)
+# =========================
+def top_ingredients(contract, start: date, end: date, limit: int = 10) -> dict:
+    """Ingredients ranked by spend in [start, end], grouped in SQL (contract/date index).
+
+    Each row also carries its share of the period's itemized material cost
+    and its cost per portion over the entries of the same period.
+    """
+    lines = PurchaseLine.objects.filter(contract=contract, date__range=(start, end)).order_by()
+    totals = lines.aggregate(spend=Sum("amount"), count=Count("id"))
+    portions = (
+        DailyEntry.objects.filter(contract=contract, date__range=(start, end)).aggregate(p=Sum("portions"))["p"] or 0
+    )
+
+    rows = list(
+        lines.values("ingredient", "unit")
+        .annotate(quantity=Sum("qty"), spend=Sum("amount"), lines=Count("id"), days=Count("date", distinct=True))
+        .order_by("-spend", "ingredient")[:limit]
+    )
+    material_total = totals["spend"] or ZERO
+    for r in rows:
+        r["avg_price"] = money(ratio(r["spend"], r["quantity"]))
+        r["share_pct"] = (ratio(r["spend"], material_total) * HUNDRED).quantize(CENT)
+        r["cost_per_portion"] = money(ratio(r["spend"], portions))
+    return {
+        "rows": rows,
+        "material_total": material_total,
+        "line_count": totals["count"],
+        "portions": portions,
+        "cost_per_portion": money(ratio(material_total, portions)),
+    }
+
+
+# =========================
+# PORTFOLIO (semua kontrak)
+# =========================
+def portfolio(contracts=None) -> list[dict]:
+    """KPI rows for every contract, read from ContractSummary in one joined query.
+
+    Contracts whose summary has not been built yet are rebuilt once here.
+    """
+    if contracts is None:
+        contracts = Contract.objects.all()
+    qs = contracts.select_related("summary").order_by("-is_active", "-created_at", "-id")
+
+    rows = []
+    for c in qs:
+        try:
+            s = c.summary
+        except ContractSummary.DoesNotExist:
+            s = ledger.rebuild_summary(c.pk)
+
+        price = c.price_per_portion
+        target_total_portions = int(c.target_portions_per_day * c.duration_days)
+        target_margin_per_portion = money(price * c.target_margin_pct / HUNDRED)
+        mpp = price - money(ratio(s.total_cost, s.portions)) if s.portions else ZERO
+        revenue = s.portions * price
+        rows.append(
+            {
+                "contract": c,
+                "portions": s.portions,
+                "target_total_portions": target_total_portions,
+                "progress_portions": ratio(s.portions * HUNDRED, target_total_portions).quantize(CENT),
+                "revenue": revenue,
+                "total_cost": s.total_cost,
+                "profit": revenue - s.total_cost,
+                "margin_per_portion": mpp,
+                "target_margin_per_portion": target_margin_per_portion,
+                "below_target": bool(s.portions) and mpp < target_margin_per_portion,
+                "ar_outstanding": max(ZERO, s.credit_portions * price - s.paid_credit),
+                "updated_at": s.updated_at,
+            }
+        )
+    return rows
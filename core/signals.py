@@ -0,0 +1,26 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import perf
+from .contracts import invalidate_active_contract
+from .ledger import bump_version
+from .models import Contract
+
+
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+def contract_changed(sender, instance, **kwargs):
+    invalidate_active_contract()
+
+
+@receiver(post_save, sender=Contract)
+def contract_saved(sender, instance, **kwargs):
+    # harga/target berubah -> angka turunan ikut berubah
+    bump_version(instance.pk)
+
+
+@receiver(connection_created)
+def track_queries(sender, connection, **kwargs):
+    # PerfMiddleware: hitung query di koneksi mana pun (termasuk thread ORM async)
+    perf.install(connection)
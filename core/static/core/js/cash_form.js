@@ -0,0 +1,12 @@
+// Pastikan select "flow" benar-benar bisa dipilih (kadang widget ke-render tanpa class)
+(function(){
+  const elFlow = document.getElementById("id_flow");
+  if (elFlow) elFlow.classList.add("form-select");
+  const ids = ["id_date","id_category","id_amount","id_notes"];
+  ids.forEach(id => {
+    const el = document.getElementById(id);
+    if (!el) return;
+    if (el.tagName === "SELECT") el.classList.add("form-select");
+    else el.classList.add("form-control");
+  });
+})();
@@ -0,0 +1,94 @@
+// grafik dashboard (Chart.js)
+(function(){
+
+  if (!window.Chart) return;
+
+  // data: <script id="dashboardData" type="application/json"> dari dashboard_charts.html
+  const dataEl = document.getElementById("dashboardData");
+  if (!dataEl) return;
+  const { labels, margin, target, donut: donutData } = JSON.parse(dataEl.textContent);
+
+  const isDark = document.documentElement.dataset.theme === "dark";
+  const tickColor = isDark ? "#E2E8F0" : "#0F172A";
+  const gridColor = isDark ? "rgba(255,255,255,.08)" : "rgba(15,23,42,.08)";
+
+  // LINE
+  const ctx1 = document.getElementById("marginChart");
+  if (ctx1){
+    new Chart(ctx1, {
+      type: "line",
+      data: {
+        labels: labels,
+        datasets: [
+          {
+            label: "Margin/porsi",
+            data: margin,
+            borderColor: "#3B82F6",
+            tension: 0.35,
+            borderWidth: 2
+          },
+          {
+            label: "Target",
+            data: target,
+            borderColor: "#F97316",
+            borderDash: [6,6],
+            borderWidth: 2
+          }
+        ]
+      },
+      options: {
+        responsive: true,
+        scales: {
+          x: {
+            ticks: { 
+              color: tickColor,
+              font: {
+                weight: "700",   // tebalkan
+                size: 13         // sedikit lebih besar
+              }
+            },
+            grid: { color: gridColor }
+          },
+          y: {
+            ticks: {
+              color: tickColor,
+              font: {
+                weight: "700",   // tebalkan
+                size: 13
+              },
+              callback: v => "Rp " + Math.round(v).toLocaleString("id-ID")
+            },
+            grid: { color: gridColor }
+          }
+        }
+      }
+    });
+  }
+
+  // DONUT
+  const ctx2 = document.getElementById("costChart");
+  if (ctx2){
+    new Chart(ctx2, {
+      type: "doughnut",
+      data: {
+        labels: ["Bahan", "Tenaga Kerja", "Overhead"],
+        datasets: [{
+          data: donutData,
+          backgroundColor: ["#F97316", "#3B82F6", "#A855F7"],
+          borderWidth: 0
+        }]
+      },
+      options: {
+        responsive: true,
+        cutout: "68%",
+        plugins: {
+          legend: {
+            position: "bottom",
+            labels: { color: tickColor }
+          }
+        }
+      }
+    });
+  }
+
+})();
@@ -0,0 +1,35 @@
+// preview biaya/margin per porsi di form Input Harian
+(function(){
+  const form = document.getElementById("entryForm");
+  if (!form) return;
+  const price = Number(form.dataset.price) || 0;
+
+  const elP = document.getElementById("id_portions");
+  const elM = document.getElementById("id_cost_material");
+  const elL = document.getElementById("id_cost_labor");
+  const elO = document.getElementById("id_cost_overhead");
+
+  const pvTotal = document.getElementById("pvTotal");
+  const pvCpp = document.getElementById("pvCpp");
+  const pvMpp = document.getElementById("pvMpp");
+
+  function n(v){ return Number(String(v||"0").replace(",", ".")) || 0; }
+  function fmt(x){
+    try { return new Intl.NumberFormat("id-ID").format(Math.round(x)); }
+    catch(e){ return String(x); }
+  }
+
+  function recalc(){
+    const portions = elP ? n(elP.value) : 0;
+    const total = (elM ? n(elM.value) : 0) + (elL ? n(elL.value) : 0) + (elO ? n(elO.value) : 0);
+    const cpp = portions > 0 ? (total / portions) : 0;
+    const mpp = price - cpp;
+
+    if (pvTotal) pvTotal.textContent = "Rp " + fmt(total);
+    if (pvCpp) pvCpp.textContent = "Rp " + fmt(cpp);
+    if (pvMpp) pvMpp.textContent = "Rp " + fmt(mpp);
+  }
+
+  [elP, elM, elL, elO].forEach(el => el && el.addEventListener("input", recalc));
+  recalc();
+})();
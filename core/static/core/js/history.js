@@ -0,0 +1,17 @@
+// "Muat lebih banyak": ambil baris berikutnya tanpa reload halaman
+(function(){
+  const tbody = document.querySelector("#historyRows");
+  if (!tbody) return;
+
+  tbody.addEventListener("click", async (ev) => {
+    const link = ev.target.closest(".history-more a");
+    if (!link) return;
+    ev.preventDefault();
+    link.classList.add("disabled");
+
+    const res = await fetch(link.href + "&partial=1", { credentials: "same-origin" });
+    if (!res.ok) { window.location = link.href; return; }
+    link.closest("tr").remove();
+    tbody.insertAdjacentHTML("beforeend", await res.text());
+  });
+})();
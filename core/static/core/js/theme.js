@@ -0,0 +1,17 @@
+// tema gelap/terang, disimpan di localStorage
+(function(){
+  const key = "bd_theme";
+  const html = document.documentElement;
+  const saved = localStorage.getItem(key);
+  if (saved === "light" || saved === "dark") html.dataset.theme = saved;
+
+  const btn = document.getElementById("themeToggle");
+  if (btn){
+    btn.addEventListener("click", () => {
+      const next = html.dataset.theme === "dark" ? "light" : "dark";
+      html.dataset.theme = next;
+      localStorage.setItem(key, next);
+      location.reload();
+    });
+  }
+})();
@@ -0,0 +1,17 @@
+"""Static files storage: hashed names plus gzip/Brotli copies (WhiteNoise).
+
+`collectstatic` writes `app.<hash>.css` etc. and a precompressed .gz (and
+.br when the Brotli package is installed) next to each file; WhiteNoise
+serves the hashed names with a far-future immutable Cache-Control and picks
+the compressed variant from Accept-Encoding.
+"""
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+    def url(self, name, force=False):
+        if not self.hashed_files:
+            # manifest belum ada (dev/test tanpa collectstatic): URL apa adanya, dilayani lewat finders
+            return StaticFilesStorage.url(self, name)
+        return super().url(name, force)
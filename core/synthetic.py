@@ -0,0 +1,125 @@
+"""Synthetic ledgers for load testing and benchmarks (manage.py seed_synthetic).
+
+Rows are generated from a seeded RNG and written with plain bulk_create in
+batches; each contract's summary and rollups are rebuilt once at the end,
+so seeding a million rows costs a handful of aggregate queries per contract
+instead of one ledger update per row.
+"""
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from . import contracts, ledger
+from .models import CashTransaction, Contract, DailyEntry
+
+NAME_PREFIX = "Sintetis"
+PRICE = Decimal("15000")
+
+CASH_IN_CATEGORIES = ["Modal", "Pelunasan Piutang", "Lain-lain"]
+CASH_OUT_CATEGORIES = ["Gas", "Transport", "Listrik", "Peralatan", "Sewa"]
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(round(value)).quantize(Decimal("0.01"))
+
+
+def _entries(rng: random.Random, contract: Contract, days: int):
+    for i in range(days):
+        day = contract.start_date + timedelta(days=i)
+        portions = rng.randint(800, 3500)
+        revenue = portions * float(PRICE)
+        credit = rng.random() < 0.3
+        sales = _money(revenue)
+        yield DailyEntry(
+            contract=contract,
+            date=day,
+            portions=portions,
+            cost_material=_money(revenue * rng.uniform(0.55, 0.70)),
+            cost_labor=_money(revenue * rng.uniform(0.10, 0.15)),
+            cost_overhead=_money(revenue * rng.uniform(0.05, 0.08)),
+            payment_type="CREDIT" if credit else "CASH",
+            paid_amount=_money(revenue * rng.choice((0, 0, 0.5, 1))) if credit else sales,
+            credit_due_date=day + timedelta(days=rng.randint(14, 30)) if credit else None,
+        )
+
+
+def _cash(rng: random.Random, contract: Contract, days: int, count: int):
+    for _ in range(count):
+        flow = CashTransaction.IN if rng.random() < 0.25 else CashTransaction.OUT
+        categories = CASH_IN_CATEGORIES if flow == CashTransaction.IN else CASH_OUT_CATEGORIES
+        yield CashTransaction(
+            contract=contract,
+            date=contract.start_date + timedelta(days=rng.randrange(max(days, 1))),
+            flow=flow,
+            category=rng.choice(categories),
+            amount=_money(rng.uniform(50_000, 5_000_000)),
+        )
+
+
+def _bulk(model, rows, batch_size: int) -> int:
+    written = 0
+    batch = []
+    for obj in rows:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def clear() -> int:
+    """Delete every synthetic contract (and, by cascade, its rows)."""
+    deleted, _ = Contract.objects.filter(name__startswith=NAME_PREFIX).delete()
+    return deleted
+
+
+def seed(
+    contract_count: int = 1,
+    days: int = 365,
+    cash_per_contract: int = 100,
+    rng_seed: int = 0,
+    start: date = date(2020, 1, 1),
+    batch_size: int = 5000,
+    activate: bool = False,
+) -> dict:
+    """Create `contract_count` contracts with `days` entries and `cash_per_contract` cash rows each.
+
+    With `activate`, the first new contract becomes the active one: it is the
+    newest active contract, so real contracts keep their is_active flag and
+    only older synthetic ones are switched off.
+    Returns {"contracts": [...ids], "entries": int, "cash": int}.
+    """
+    rng = random.Random(rng_seed)
+    ids: list[int] = []
+    entries = cash = 0
+
+    for n in range(contract_count):
+        with transaction.atomic():
+            c = Contract.objects.create(
+                name=f"{NAME_PREFIX} {n + 1}",
+                start_date=start,
+                duration_days=days,
+                price_per_portion=PRICE,
+                target_portions_per_day=2000,
+                target_margin_pct=Decimal("15"),
+                is_active=False,
+            )
+            entries += _bulk(DailyEntry, _entries(rng, c, days), batch_size)
+            cash += _bulk(CashTransaction, _cash(rng, c, days, cash_per_contract), batch_size)
+            ledger.rebuild_summary(c.pk)
+        ids.append(c.pk)
+
+    if activate and ids:
+        Contract.objects.filter(name__startswith=NAME_PREFIX).exclude(pk=ids[0]).update(is_active=False)
+        Contract.objects.filter(pk=ids[0]).update(is_active=True)
+        contracts.invalidate_active_contract()
+
+    return {"contracts": ids, "entries": entries, "cash": cash}
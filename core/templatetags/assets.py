@@ -0,0 +1,10 @@
+from django import template
+
+from core.assets import vendor_url
+
+register = template.Library()
+
+@register.simple_tag(name="vendor")
+def vendor(name):
+    # file lokal (core/static/core/vendor/); CDN hanya saat DEBUG dan file belum di-vendor
+    return vendor_url(name)
@@ -1,11 +1,10 @@
 from django import template
 
+from core.money import try_format_rupiah
+
 register = template.Library()
 
 @register.filter(name="rupiah")
 def rupiah(value):
-    try:
-        value = float(value)
-    except (TypeError, ValueError):
-        return value
-    return "Rp {:,.0f}".format(value).replace(",", ".")
\ No newline at end of file
+    # Decimal langsung diformat, tanpa lewat float
+    return try_format_rupiah(value)
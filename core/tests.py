@@ -1,3 +1,1207 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import alerts, contracts, forecast, fragments, importers, journal, ledger, money, perf, reports, synthetic
+from .auth import SESSION_KEY, hash_pin, login_limiter, verify_pin
+from .models import (
+    Alert,
+    CashTransaction,
+    Contract,
+    ContractSummary,
+    CreditPayment,
+    DailyEntry,
+    LedgerEvent,
+    LedgerSnapshot,
+    PeriodRollup,
+    PurchaseLine,
+)
+
+
+class AuthedTestCase(TestCase):
+    def setUp(self):
+        cache.clear()  # id kontrak bisa terpakai ulang antar test
+        self.contract = Contract.objects.create(
+            name="Kontrak Uji",
+            start_date=date(2026, 1, 1),
+            duration_days=30,
+            price_per_portion=Decimal("15000"),
+            target_portions_per_day=100,
+        )
+        session = self.client.session
+        session[SESSION_KEY] = True
+        session.save()
+        # signed_cookies: kunci sesi = isi cookie, jadi pasang ulang setelah save
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    def entry_post(self, **overrides):
+        data = {
+            "date": "2026-01-05",
+            "portions": 100,
+            "cost_material": "700000",
+            "cost_labor": "200000",
+            "cost_overhead": "100000",
+            "notes": "",
+            "payment_type": "CASH",
+            "paid_amount": "0",
+            "credit_due_date": "",
+        }
+        data.update(overrides)
+        return data
+
+
+@override_settings(ACCESS_CODE="dapur", PIN_HASH_ITERATIONS=1000, LOGIN_MAX_ATTEMPTS=3)
+class LoginTests(TestCase):
+    def setUp(self):
+        login_limiter.clear()
+
+    def login(self, pin, code="dapur"):
+        return self.client.post(reverse("login"), {"access_code": code, "pin": pin})
+
+    def test_pbkdf2_hash_round_trip(self):
+        encoded = hash_pin("4321")
+        self.assertTrue(encoded.startswith("pbkdf2_sha256$1000$"))
+        self.assertNotEqual(encoded, hash_pin("4321"))  # salt acak
+        self.assertEqual(verify_pin("4321", encoded), (True, False))
+        self.assertEqual(verify_pin("1234", encoded), (False, False))
+        self.assertEqual(verify_pin("4321", hash_pin("4321", iterations=500)), (True, True))
+
+    def test_legacy_sha256_hash_still_logs_in_and_asks_for_upgrade(self):
+        legacy = hashlib.sha256(b"4321").hexdigest()
+        with self.settings(PIN_HASH=legacy), self.assertLogs("core.auth", "WARNING"):
+            response = self.login("4321")
+        self.assertRedirects(response, reverse("dashboard"), fetch_redirect_response=False)
+        self.assertTrue(self.client.session[SESSION_KEY])
+
+    def test_brute_force_is_rejected_before_hashing(self):
+        with self.settings(PIN_HASH=hash_pin("4321")):
+            for _ in range(3):
+                self.assertEqual(self.login("0000").status_code, 200)
+
+            with mock.patch("core.views.verify_login") as verify:
+                response = self.login("4321")
+            self.assertEqual(response.status_code, 429)
+            self.assertTrue(int(response["Retry-After"]) > 0)
+            verify.assert_not_called()
+
+            # access code lain dari IP yang sama juga ditahan
+            self.assertEqual(self.login("4321", code="lain").status_code, 429)
+
+
+class ContractSummaryTests(AuthedTestCase):
+    def assertInSync(self):
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+
+    def test_entry_crud_keeps_summary_in_sync(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        self.client.post(
+            reverse("entry_create"),
+            self.entry_post(date="2026-01-06", payment_type="CREDIT", paid_amount="500000"),
+        )
+        self.assertInSync()
+
+        summary = ContractSummary.objects.get(contract=self.contract)
+        self.assertEqual(summary.entry_count, 2)
+        self.assertEqual(summary.portions, 200)
+        self.assertEqual(summary.credit_portions, 100)
+        self.assertEqual(summary.paid_cash, Decimal("1500000"))
+        self.assertEqual(summary.paid_credit, Decimal("500000"))
+
+        credit = DailyEntry.objects.get(contract=self.contract, payment_type="CREDIT")
+        self.client.post(
+            reverse("entry_edit", args=[credit.pk]),
+            self.entry_post(date="2026-01-06", portions=80, payment_type="CASH"),
+        )
+        self.assertInSync()
+
+        self.client.post(reverse("entry_delete", args=[credit.pk]))
+        self.assertInSync()
+        self.assertEqual(ContractSummary.objects.get(contract=self.contract).entry_count, 1)
+
+    def test_cash_crud_keeps_summary_in_sync(self):
+        data = {"date": "2026-01-05", "flow": "IN", "category": "Modal", "amount": "250000", "notes": ""}
+        self.client.post(reverse("cash_create"), data)
+        tx = CashTransaction.objects.get()
+        self.client.post(reverse("cash_edit", args=[tx.pk]), {**data, "flow": "OUT"})
+        self.assertInSync()
+
+        summary = ContractSummary.objects.get(contract=self.contract)
+        self.assertEqual(summary.manual_in, 0)
+        self.assertEqual(summary.manual_out, Decimal("250000"))
+
+        self.client.post(reverse("cash_delete", args=[tx.pk]))
+        self.assertInSync()
+
+    def test_stale_instance_edit_uses_committed_row(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        first = DailyEntry.objects.get()
+        second = DailyEntry.objects.get()  # request kedua memuat baris yang sama
+
+        first.portions = 120
+        ledger.save_entry(first)
+        second.portions = 90
+        ledger.save_entry(second)
+        self.assertInSync()
+        self.assertEqual(ContractSummary.objects.get(contract=self.contract).portions, 90)
+
+        tx = CashTransaction.objects.create(
+            contract=self.contract, date=date(2026, 1, 5), flow="IN", category="Modal", amount=Decimal("100")
+        )
+        ledger.rebuild_summary(self.contract.pk)
+        stale = CashTransaction.objects.get(pk=tx.pk)
+        tx.amount = Decimal("300")
+        ledger.save_cash(tx)
+        ledger.delete_cash(stale)
+        self.assertInSync()
+
+    def test_missing_summary_is_rebuilt_on_read(self):
+        DailyEntry.objects.create(contract=self.contract, date=date(2026, 1, 2), portions=10)
+        self.assertFalse(ContractSummary.objects.exists())
+
+        response = self.client.get(reverse("profit_summary"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ContractSummary.objects.get(contract=self.contract).portions, 10)
+
+
+class DashboardDataTests(AuthedTestCase):
+    def setUp(self):
+        super().setUp()
+        for day, material in ((1, "1000000"), (2, "1300000"), (3, "1300000"), (4, "1300001")):
+            DailyEntry.objects.create(
+                contract=self.contract,
+                date=date(2026, 1, day),
+                portions=100,
+                cost_material=Decimal(material),
+                cost_labor=Decimal("0"),
+                cost_overhead=Decimal("0"),
+            )
+
+    def test_dashboard_data_is_one_query(self):
+        with self.assertNumQueries(1):
+            data = reports.dashboard_data(self.contract)
+
+        self.assertEqual(data["kpi"]["total_portions"], 400)
+        self.assertEqual(data["kpi"]["total_cost"], Decimal("4900001"))
+        self.assertEqual(data["kpi"]["kpi_cpp"], Decimal("12250.00"))
+        self.assertEqual(data["labels"][0], "01 Jan")
+        self.assertEqual(data["margin_series"], [5000.0, 2000.0, 2000.0, 1999.99])
+
+    def test_dashboard_view(self):
+        response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_portions"], 400)
+
+
+class MoneyTests(AuthedTestCase):
+    def test_format_rupiah(self):
+        cases = {
+            Decimal("0"): "Rp 0",
+            Decimal("1234567.49"): "Rp 1.234.567",
+            Decimal("1234567.50"): "Rp 1.234.568",
+            Decimal("-0.4"): "Rp 0",
+            Decimal("-2500.5"): "Rp -2.501",
+            0.1 + 0.2: "Rp 0",
+            "15000": "Rp 15.000",
+        }
+        for value, expected in cases.items():
+            self.assertEqual(money.format_rupiah(value), expected)
+        self.assertEqual(money.try_format_rupiah("abc"), "abc")
+
+    def test_totals_are_exact_for_random_ledgers(self):
+        # property-style: banyak nilai sen acak, total harus sama persis dengan jumlah Decimal
+        rng = random.Random(2026)
+        cents = lambda: Decimal(rng.randint(0, 99_999_999)) / 100  # noqa: E731
+        for _ in range(5):
+            DailyEntry.objects.filter(contract=self.contract).delete()
+            expected_cost = Decimal("0")
+            expected_portions = 0
+            for i in range(rng.randint(1, 40)):
+                e = DailyEntry.objects.create(
+                    contract=self.contract,
+                    date=date(2026, 1, 1) + timedelta(days=i),
+                    portions=rng.randint(0, 500),
+                    cost_material=cents(),
+                    cost_labor=cents(),
+                    cost_overhead=cents(),
+                )
+                expected_cost += e.cost_material + e.cost_labor + e.cost_overhead
+                expected_portions += e.portions
+            ledger.rebuild_summary(self.contract.pk)
+
+            summary = ledger.get_summary(self.contract)
+            self.assertEqual(summary.total_cost, expected_cost)
+
+            kpi = reports.dashboard_data(self.contract)["kpi"]
+            revenue = expected_portions * self.contract.price_per_portion
+            self.assertEqual(kpi["total_cost"], expected_cost)
+            self.assertEqual(kpi["revenue"], revenue)
+            self.assertEqual(kpi["kpi_profit"], revenue - expected_cost)
+            whole = int((revenue - expected_cost).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+            self.assertEqual(money.format_rupiah(kpi["kpi_profit"]), "Rp " + f"{whole:,}".replace(",", "."))
+
+
+class PortfolioTests(AuthedTestCase):
+    def test_portfolio_reads_all_contracts_in_one_query(self):
+        other = Contract.objects.create(
+            name="Kontrak Lain",
+            start_date=date(2026, 1, 1),
+            duration_days=10,
+            price_per_portion=Decimal("10000"),
+            target_portions_per_day=10,
+            target_margin_pct=Decimal("25"),
+            is_active=False,
+        )
+        self.client.post(reverse("entry_create"), self.entry_post(payment_type="CREDIT", paid_amount="500000"))
+        DailyEntry.objects.create(contract=other, date=date(2026, 1, 2), portions=50, cost_material=Decimal("400000"))
+        ledger.rebuild_summary(other.pk)
+
+        with self.assertNumQueries(1):
+            rows = {r["contract"].pk: r for r in reports.portfolio()}
+
+        mine = rows[self.contract.pk]
+        self.assertEqual(mine["progress_portions"], Decimal("3.33"))
+        self.assertEqual(mine["margin_per_portion"], Decimal("5000"))
+        self.assertEqual(mine["ar_outstanding"], Decimal("1000000"))
+        self.assertFalse(mine["below_target"])
+
+        theirs = rows[other.pk]
+        self.assertEqual(theirs["progress_portions"], Decimal("50.00"))
+        self.assertEqual(theirs["margin_per_portion"], Decimal("2000"))
+        self.assertTrue(theirs["below_target"])
+
+        response = self.client.get(reverse("portfolio"))
+        self.assertContains(response, "Kontrak Lain")
+
+
+class FragmentCacheTests(AuthedTestCase):
+    def test_dashboard_served_from_cache_until_next_write(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        fragments.reset_stats()
+
+        first = self.client.get(reverse("dashboard"))
+        self.assertContains(first, "Rp 1.500.000")
+        self.assertEqual(fragments.stats()["misses"], 4)
+
+        with self.assertNumQueries(0):  # sesi cached_db dari cache
+            again = self.client.get(reverse("dashboard"))
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(fragments.stats()["hits"], 4)
+
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-01-06"))
+        after = self.client.get(reverse("dashboard"))
+        self.assertContains(after, "Rp 3.000.000")
+        self.assertEqual(fragments.stats()["misses"], 8)
+
+    def test_contract_save_invalidates_profit_summary(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        self.assertContains(self.client.get(reverse("profit_summary")), "Rp 1.500.000")
+
+        self.contract.price_per_portion = Decimal("16000")
+        self.contract.save()
+        self.assertContains(self.client.get(reverse("profit_summary")), "Rp 1.600.000")
+
+
+class PerfMiddlewareTests(AuthedTestCase):
+    def test_requests_are_sampled_and_reported(self):
+        perf.clear()
+        self.client.post(reverse("entry_create"), self.entry_post())
+        response = self.client.get(reverse("history"))
+
+        self.assertIn('desc="', response["Server-Timing"])
+        sample = perf.recent(1)[0]
+        self.assertEqual(sample.url_name, "history")
+        self.assertEqual(sample.status, 200)
+        self.assertGreater(sample.queries, 0)
+        self.assertGreater(sample.template_ms, 0)
+        self.assertGreaterEqual(sample.total_ms, sample.db_ms)
+
+        page = self.client.get(reverse("perf_report"))
+        names = [r["name"] for r in page.context["rows"]]
+        self.assertIn("history", names)
+        self.assertIn("entry_create", names)
+
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(perf.percentile(values, 50), 50.0)
+        self.assertEqual(perf.percentile(values, 95), 95.0)
+        self.assertEqual(perf.percentile(values, 99), 99.0)
+        self.assertEqual(perf.percentile([7.0], 99), 7.0)
+
+
+class BenchmarkCommandTests(AuthedTestCase):
+    def setUp(self):
+        super().setUp()
+        from .management.commands.benchmark import Command
+
+        self.command = Command(stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_pk_comes_from_the_route_model(self):
+        from .urls import urlpatterns
+
+        routes = {p.name: p for p in urlpatterns}
+        self.client.post(reverse("entry_create"), self.entry_post())
+        entry = DailyEntry.objects.get()
+        line = ledger.save_purchase(
+            PurchaseLine(entry=entry, ingredient="Beras", unit="kg", qty=Decimal("1"), unit_price=Decimal("100"))
+        )
+
+        self.assertEqual(self.command._url_kwargs(routes["purchase_delete"]), {"pk": line.pk})
+        self.assertIsNone(self.command._url_kwargs(routes["credit_payment_delete"]))  # belum ada pembayaran
+
+    def test_compare_ignores_non_2xx_rows(self):
+        rows = [
+            {"scale": 1, "name": "cash_delete", "status": 405, "p50_ms": 1.0, "queries": 0},
+            {"scale": 1, "name": "history", "status": 200, "p50_ms": 10.0, "queries": 3},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as fh:
+            json.dump({"results": rows}, fh)
+        self.addCleanup(os.remove, fh.name)
+
+        slower = [{**r, "p50_ms": 90.0, "queries": 9} for r in rows]
+        with self.assertRaisesMessage(CommandError, "1 URL"):
+            self.command._compare(fh.name, slower, 25.0)
+
+class SyntheticSeedTests(AuthedTestCase):
+    def test_seed_is_reproducible_and_summaries_are_built(self):
+        first = synthetic.seed(contract_count=2, days=20, cash_per_contract=5, rng_seed=7, activate=True)
+        self.assertEqual((first["entries"], first["cash"]), (40, 10))
+        self.assertEqual(contracts.get_active_contract().pk, first["contracts"][0])
+        self.contract.refresh_from_db()
+        self.assertTrue(self.contract.is_active)
+        for pk in first["contracts"]:
+            self.assertEqual(ledger.summary_drift(pk), {})
+
+        portions = list(DailyEntry.objects.filter(contract_id=first["contracts"][0]).values_list("portions", flat=True))
+        synthetic.clear()
+        second = synthetic.seed(contract_count=1, days=20, cash_per_contract=5, rng_seed=7)
+        again = list(DailyEntry.objects.filter(contract_id=second["contracts"][0]).values_list("portions", flat=True))
+        self.assertEqual(again, portions)
+
+    def test_seed_command_leaves_active_contract_alone_by_default(self):
+        call_command("seed_synthetic", "--days", "5", "--cash", "1", stdout=io.StringIO())
+        self.assertEqual(contracts.get_active_contract().pk, self.contract.pk)
+        self.assertEqual(Contract.objects.filter(is_active=True).count(), 1)
+
+
+class AsyncViewTests(AuthedTestCase):
+    def test_report_views_under_asgi(self):
+        self.client.post(reverse("entry_create"), self.entry_post(payment_type="CREDIT", paid_amount="500000"))
+        self.client.post(
+            reverse("cash_create"),
+            {"date": "2026-01-05", "flow": "OUT", "category": "Gas", "amount": "50000", "notes": ""},
+        )
+        self.async_client.cookies = self.client.cookies
+        perf.clear()
+
+        for name, text in (
+            ("dashboard", "Rp 1.500.000"),
+            ("profit_summary", "Rp 1.500.000"),
+            ("cashflow", "Rp 1.000.000"),
+            ("cash_list", "Gas"),
+        ):
+            response = async_to_sync(self.async_client.get)(reverse(name))
+            self.assertContains(response, text)
+            self.assertGreater(perf.recent(1)[0].queries, 0)  # query dari thread ORM async ikut terhitung
+
+    def test_async_views_require_login(self):
+        response = async_to_sync(self.async_client.get)(reverse("cash_list"))
+        self.assertRedirects(response, reverse("login"), fetch_redirect_response=False)
+
+
+class ForecastTests(AuthedTestCase):
+    def setUp(self):
+        super().setUp()
+        # biaya/porsi naik 100/hari: proyeksi sisa 20 hari harus di bawah rata-rata seumur kontrak
+        for i in range(10):
+            DailyEntry.objects.create(
+                contract=self.contract,
+                date=date(2026, 1, 1) + timedelta(days=i),
+                portions=100,
+                cost_material=Decimal(100 * (10000 + 100 * i)),
+            )
+        ledger.rebuild_summary(self.contract.pk)
+
+    def test_trend_forecast_with_interval(self):
+        result = forecast.compute_forecast(self.contract)
+        self.assertEqual(result["remaining_days"], 20)
+        self.assertEqual(result["cpp_next"], Decimal("11000.00"))
+        self.assertLess(result["forecast_profit"], reports.dashboard_data(self.contract)["kpi"]["kpi_projected_profit"])
+        self.assertLessEqual(result["low"], result["forecast_profit"])
+        self.assertGreaterEqual(result["high"], result["forecast_profit"])
+
+        # sisa hari: porsi 100 * (15.000 - (11.000 + 100*k)), k = 0..19
+        expected = result["realized_profit"] + sum(100 * (4000 - 100 * k) for k in range(20))
+        self.assertEqual(result["forecast_profit"], expected)
+
+    def test_remaining_days_use_rolling_average_portions(self):
+        # porsi naik 10/hari (100..190), biaya/porsi tetap naik 100/hari
+        for i, e in enumerate(DailyEntry.objects.filter(contract=self.contract).order_by("date")):
+            e.portions = 100 + 10 * i
+            e.cost_material = Decimal(e.portions * (10000 + 100 * i))
+            e.save()
+
+        result = forecast.compute_forecast(self.contract)
+        self.assertEqual(result["portions_rolling"], 160.0)  # rata-rata 130..190, bukan tren 200+
+        expected = result["realized_profit"] + 160 * sum(4000 - 100 * k for k in range(20))
+        self.assertEqual(result["forecast_profit"], expected)
+
+    def test_cached_per_data_version(self):
+        first = forecast.cached_forecast(self.contract)
+        with self.assertNumQueries(1):  # versi saja
+            self.assertEqual(forecast.cached_forecast(self.contract), first)
+
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-01-11", portions=50))
+        self.assertEqual(forecast.cached_forecast(self.contract)["remaining_days"], 19)
+        self.assertContains(self.client.get(reverse("dashboard")), "sisa 19 hari")
+
+
+class ActiveContractCacheTests(AuthedTestCase):
+    def test_lookup_is_cached_until_contract_changes(self):
+        self.assertEqual(contracts.get_active_contract(), self.contract)
+        with self.assertNumQueries(0):
+            self.assertEqual(contracts.get_active_contract(), self.contract)
+
+        newer = Contract.objects.create(
+            name="Kontrak Baru", start_date=date(2026, 2, 1), price_per_portion=Decimal("16000")
+        )
+        self.assertEqual(contracts.get_active_contract(), newer)
+
+        newer.delete()
+        self.assertEqual(contracts.get_active_contract(), self.contract)
+
+    def test_contract_setup_switches_active_contract(self):
+        self.client.get(reverse("dashboard"))
+        self.client.post(
+            reverse("contract_setup"),
+            {
+                "name": "Kontrak Diubah",
+                "start_date": "2026-01-01",
+                "duration_days": 30,
+                "price_per_portion": "15000",
+                "target_portions_per_day": 100,
+                "target_margin_pct": "20",
+                "is_active": "on",
+            },
+        )
+        self.assertEqual(contracts.get_active_contract().name, "Kontrak Diubah")
+
+
+@override_settings(HISTORY_PAGE_SIZE=2)
+class EntryBatchTests(AuthedTestCase):
+    def batch_post(self, rows, total=7):
+        # sisa baris dibiarkan seperti tampilan awal: tanggal terisi, biaya 0
+        blank = {"payment_type": "CASH", "cost_material": "0", "cost_labor": "0", "cost_overhead": "0"}
+        data = {"form-TOTAL_FORMS": str(total), "form-INITIAL_FORMS": "0"}
+        for i in range(total):
+            row = self.entry_post(**rows[i]) if i < len(rows) else {**blank, "date": f"2026-01-{20 + i:02d}"}
+            data.update({f"form-{i}-{k}": v for k, v in row.items()})
+        return self.client.post(reverse("entry_batch"), data)
+
+    def test_week_prefilled_after_last_entry(self):
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-01-04"))
+        response = self.client.get(reverse("entry_batch"))
+        dates = [f.initial["date"] for f in response.context["formset"]]
+        self.assertEqual(dates, [date(2026, 1, 5) + timedelta(days=i) for i in range(7)])
+
+    def test_rows_upserted_in_one_write(self):
+        rows = [
+            {"date": "2026-01-05"},
+            {"date": "2026-01-06", "payment_type": "CREDIT", "paid_amount": "0", "credit_due_date": "2026-01-20"},
+            {"date": "2026-01-07", "portions": 50},
+        ]
+        response = self.batch_post(rows)
+        self.assertRedirects(response, reverse("history"))
+
+        entries = {e.date.day: e for e in DailyEntry.objects.filter(contract=self.contract)}
+        self.assertEqual(sorted(entries), [5, 6, 7])
+        self.assertEqual(entries[5].paid_amount, Decimal("1500000"))  # tunai: auto isi
+        self.assertEqual(entries[6].paid_amount, 0)
+        self.assertEqual(ContractSummary.objects.get(contract=self.contract).portions, 250)
+
+        # satu event per baris, lengkap dengan isi barisnya
+        events = LedgerEvent.objects.filter(contract=self.contract, source=LedgerEvent.BATCH)
+        self.assertEqual(sorted(e.object_id for e in events), sorted(e.pk for e in entries.values()))
+        self.assertEqual({e.changes["portions"] for e in events}, {100, 50})
+
+    def test_existing_date_is_overwritten_and_journaled(self):
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-01-05", portions=10))
+        entry = DailyEntry.objects.get(contract=self.contract)
+
+        response = self.batch_post([{"date": "2026-01-05", "portions": 40}, {"date": "2026-01-06"}])
+        self.assertRedirects(response, reverse("history"))
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.portions, 40)
+        self.assertEqual(ContractSummary.objects.get(contract=self.contract).portions, 140)
+        jan = PeriodRollup.objects.get(contract=self.contract, period="M", period_start=date(2026, 1, 1))
+        self.assertEqual((jan.entry_count, jan.portions), (2, 140))
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+        self.assertEqual(ledger.rollup_drift(self.contract.pk), {})
+
+        update = LedgerEvent.objects.get(contract=self.contract, source=LedgerEvent.BATCH, object_id=entry.pk)
+        self.assertEqual(update.action, LedgerEvent.UPDATE)
+        self.assertEqual(update.changes["portions"], [10, 40])
+        self.assertEqual(update.delta["portions"], 30)
+        self.assertEqual(journal.replay_drift(self.contract), {})
+
+    def test_dates_with_payments_are_not_overwritten(self):
+        self.client.post(
+            reverse("entry_create"),
+            self.entry_post(date="2026-01-05", payment_type="CREDIT", credit_due_date="2026-01-20"),
+        )
+        entry = DailyEntry.objects.get(contract=self.contract)
+        ledger.add_credit_payment(CreditPayment(entry=entry, date=date(2026, 1, 10), amount=Decimal("400000")))
+
+        response = self.batch_post([{"date": "2026-01-05", "portions": 40}, {"date": "2026-01-06"}])
+        self.assertContains(response, "sudah ada pelunasan piutang")
+        entry.refresh_from_db()
+        self.assertEqual((entry.portions, entry.paid_amount), (100, Decimal("400000")))
+        self.assertFalse(DailyEntry.objects.filter(contract=self.contract, date=date(2026, 1, 6)).exists())
+
+    def test_invalid_row_saves_nothing(self):
+        response = self.batch_post([{"date": "2026-01-05"}, {"date": "2026-01-06", "portions": "-1"}])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(DailyEntry.objects.filter(contract=self.contract).exists())
+
+        response = self.batch_post([{"date": "2026-01-05"}, {"date": "2026-01-05"}])
+        self.assertContains(response, "diisi lebih dari sekali")
+        self.assertFalse(DailyEntry.objects.filter(contract=self.contract).exists())
+
+
+class PurchaseLineTests(AuthedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.post(reverse("entry_create"), self.entry_post())
+        self.entry = DailyEntry.objects.get(contract=self.contract)
+
+    def add_line(self, entry, ingredient, qty, unit_price, unit="kg"):
+        return self.client.post(
+            reverse("entry_purchases", args=[entry.pk]),
+            {"ingredient": ingredient, "unit": unit, "qty": qty, "unit_price": unit_price, "cash_tx": ""},
+        )
+
+    def test_lines_drive_cost_material(self):
+        self.add_line(self.entry, "beras", "10", "12000")
+        self.add_line(self.entry, "Telur", "30", "2000.50", unit="Butir")
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.cost_material, Decimal("180015.00"))
+        self.assertEqual(ContractSummary.objects.get(contract=self.contract).cost_material, Decimal("180015.00"))
+        event = LedgerEvent.objects.filter(contract=self.contract).last()
+        self.assertEqual((event.source, event.action), ("purchase", "create"))
+
+        line = PurchaseLine.objects.get(ingredient="Telur")
+        self.assertEqual((line.unit, line.date), ("butir", self.entry.date))
+        self.client.post(reverse("purchase_delete", args=[line.pk]))
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.cost_material, Decimal("120000.00"))
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+
+        # pindah tanggal: salinan tanggal di rincian ikut; biaya bahan tidak bisa ditimpa dari form
+        self.client.post(
+            reverse("entry_edit", args=[self.entry.pk]), self.entry_post(date="2026-01-09", cost_material="1")
+        )
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.cost_material, Decimal("120000.00"))
+        self.assertEqual(PurchaseLine.objects.get().date, date(2026, 1, 9))
+
+        # upsert (import / input massal) juga tidak menimpa biaya bahan yang berasal dari rincian
+        ledger.bulk_upsert_entries(self.contract, [DailyEntry(date=date(2026, 1, 9), portions=100, cost_material=5)])
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.cost_material, Decimal("120000.00"))
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+
+    def test_top_ingredients(self):
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-01-06", portions=50))
+        other = DailyEntry.objects.get(contract=self.contract, date=date(2026, 1, 6))
+        self.add_line(self.entry, "Beras", "10", "12000")
+        self.add_line(other, "  beras ", "5", "13000")
+        self.add_line(other, "Telur", "20", "2000", unit="butir")
+        self.add_line(self.entry, "Garam", "1", "5000")
+
+        data = reports.top_ingredients(self.contract, date(2026, 1, 1), date(2026, 1, 31), limit=2)
+        self.assertEqual([r["ingredient"] for r in data["rows"]], ["Beras", "Telur"])
+        beras = data["rows"][0]
+        self.assertEqual((beras["quantity"], beras["spend"], beras["days"]), (Decimal("15"), Decimal("185000"), 2))
+        self.assertEqual(beras["avg_price"], Decimal("12333.33"))
+        self.assertEqual(data["material_total"], Decimal("230000"))
+        self.assertEqual(beras["share_pct"], Decimal("80.43"))
+        self.assertEqual(beras["cost_per_portion"], Decimal("1233.33"))  # 185.000 / 150 porsi
+
+        only_6th = reports.top_ingredients(self.contract, date(2026, 1, 6), date(2026, 1, 6))
+        self.assertEqual(only_6th["material_total"], Decimal("105000"))
+        self.assertContains(self.client.get(reverse("ingredient_report") + "?start=2026-01-01&end=2026-01-31"), "Beras")
+
+
+class HistoryPaginationTests(AuthedTestCase):
+    def test_keyset_pages_cover_all_entries_once(self):
+        for day in range(1, 6):
+            DailyEntry.objects.create(contract=self.contract, date=date(2026, 1, day), portions=day)
+
+        seen = []
+        url = reverse("history")
+        response = self.client.get(url)
+        while True:
+            seen += [e.date.day for e in response.context["entries"]]
+            cursor = response.context["next_cursor"]
+            if not cursor:
+                break
+            response = self.client.get(url, {"after": cursor, "partial": 1})
+            self.assertTemplateUsed(response, "core/history_rows.html")
+            self.assertTemplateNotUsed(response, "core/base.html")
+
+        self.assertEqual(seen, [5, 4, 3, 2, 1])
+
+
+class QueryIndexTests(AuthedTestCase):
+    """The hot queries should be served by the indexes from 0005_query_indexes / 0008_ar_aging / 0012_purchase_lines."""
+
+    def assertUsesIndex(self, qs, *index_names):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest("EXPLAIN format not checked for this backend")
+        if connection.vendor == "postgresql":
+            # tabel uji kecil: paksa planner menunjukkan index yang akan dipakai pada data nyata
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = qs.explain()
+        self.assertTrue(any(name in plan for name in index_names), msg=plan)
+
+    def test_active_contract_lookup(self):
+        qs = Contract.objects.filter(is_active=True).order_by("-created_at")[:1]
+        self.assertUsesIndex(qs, "contract_active_idx")
+
+    def test_top_ingredients(self):
+        qs = (
+            PurchaseLine.objects.filter(contract=self.contract, date__range=(date(2026, 1, 1), date(2026, 1, 31)))
+            .values("ingredient", "unit")
+            .annotate(spend=Sum("amount"))
+        )
+        self.assertUsesIndex(qs, "purchase_contract_date_idx", "purchase_contract_ingr_idx")
+
+    def test_history_page(self):
+        qs = DailyEntry.objects.filter(contract=self.contract).order_by("-date", "-id")[:60]
+        self.assertUsesIndex(qs, "entry_contract_recent_idx")
+
+    def test_credit_totals(self):
+        qs = (
+            DailyEntry.objects.filter(contract=self.contract, payment_type="CREDIT")
+            .order_by()
+            .values("portions", "paid_amount")
+        )
+        if connection.vendor == "postgresql":
+            self.assertUsesIndex(qs, "entry_contract_payment_idx")  # covering (INCLUDE)
+        else:
+            # tanpa INCLUDE kedua index punya prefix (contract, payment_type) yang sama
+            self.assertUsesIndex(qs, "entry_contract_payment_idx", "entry_contract_credit_due_idx")
+
+    def test_ar_open_items(self):
+        qs = DailyEntry.objects.filter(contract=self.contract, payment_type="CREDIT").order_by("credit_due_date")
+        self.assertUsesIndex(qs, "entry_contract_credit_due_idx")
+
+    def test_cash_by_flow(self):
+        qs = CashTransaction.objects.filter(
+            contract=self.contract, flow=CashTransaction.OUT, date__gte=date(2026, 1, 1)
+        )
+        self.assertUsesIndex(qs, "cash_contract_flow_date_idx")
+
+
+class LedgerImportTests(AuthedTestCase):
+    def test_csv_import_upserts_and_reports_bad_rows(self):
+        DailyEntry.objects.create(contract=self.contract, date=date(2026, 1, 1), portions=1)
+        csv_bytes = (
+            "date,portions,cost_material,cost_labor,cost_overhead,payment_type,paid_amount\n"
+            "2026-01-01,100,700000,200000,100000,CASH,\n"
+            "2026-01-02,80,500000,0,0,CREDIT,100000\n"
+            "bukan-tanggal,80,0,0,0,CASH,\n"
+        ).encode()
+
+        result = importers.import_ledger(self.contract, "entries", io.BytesIO(csv_bytes), "data.csv")
+
+        self.assertEqual(result["imported"], 2)
+        self.assertEqual(result["error_count"], 1)
+        self.assertEqual(result["errors"][0][0], 4)
+
+        first = DailyEntry.objects.get(contract=self.contract, date=date(2026, 1, 1))
+        self.assertEqual(first.portions, 100)
+        self.assertEqual(first.paid_amount, Decimal("1500000"))  # auto isi tunai
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+
+    def test_batches_apply_deltas_without_reaggregating(self):
+        ledger.rebuild_summary(self.contract.pk)
+        rows = "".join(f"2026-01-{d:02d},100,700000,0,0,CREDIT,0\n" for d in range(1, 11))
+        csv_bytes = ("date,portions,cost_material,cost_labor,cost_overhead,payment_type,paid_amount\n" + rows).encode()
+
+        with mock.patch("core.ledger.compute_totals", wraps=ledger.compute_totals) as totals:
+            result = importers.import_ledger(self.contract, "entries", io.BytesIO(csv_bytes), "a.csv", batch_size=3)
+        self.assertEqual(result["imported"], 10)
+        totals.assert_not_called()
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+        self.assertEqual(ledger.rollup_drift(self.contract.pk), {})
+
+    def test_entries_with_payments_are_not_overwritten(self):
+        self.client.post(
+            reverse("entry_create"),
+            self.entry_post(date="2026-01-01", payment_type="CREDIT", credit_due_date="2026-01-15"),
+        )
+        entry = DailyEntry.objects.get()
+        ledger.add_credit_payment(CreditPayment(entry=entry, date=date(2026, 1, 10), amount=Decimal("400000")))
+
+        csv_bytes = b"date,portions,payment_type,paid_amount\n2026-01-01,100,CREDIT,0\n2026-01-02,90,CASH,\n"
+        result = importers.import_ledger(self.contract, "entries", io.BytesIO(csv_bytes), "p.csv")
+        self.assertEqual((result["imported"], result["error_count"]), (1, 1))
+        self.assertIn("pelunasan", result["errors"][0][1])
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.paid_amount, Decimal("400000"))
+        with self.assertRaises(ledger.EntryConflict):
+            ledger.bulk_upsert_entries(self.contract, [DailyEntry(date=date(2026, 1, 1), portions=1)])
+
+    def test_import_view_cash_csv(self):
+        upload = SimpleUploadedFile(
+            "kas.csv", b"date;flow;category;amount\n2026-01-03;OUT;Gas;250000\n", content_type="text/csv"
+        )
+        response = self.client.post(reverse("ledger_import"), {"kind": "cash", "file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["result"]["imported"], 1)
+        self.assertEqual(ContractSummary.objects.get(contract=self.contract).manual_out, Decimal("250000"))
+
+
+class LedgerExportTests(AuthedTestCase):
+    def test_combined_ledger_csv_streams_running_balances(self):
+        DailyEntry.objects.create(
+            contract=self.contract, date=date(2026, 1, 1), portions=10,
+            payment_type="CREDIT", paid_amount=Decimal("50000"),
+        )
+        CashTransaction.objects.create(
+            contract=self.contract, date=date(2026, 1, 1), flow="OUT", category="Gas", amount=Decimal("20000")
+        )
+
+        response = self.client.get(reverse("ledger_export", args=["ledger", "csv"]))
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(lines[0], "date,source,description,cash_in,cash_out,cash_balance,ar_balance")
+        self.assertEqual(lines[1], "2026-01-01,Penjualan,CREDIT,50000.00,0,50000.00,100000.00")
+        self.assertEqual(lines[2], "2026-01-01,Kas,Gas,0,20000.00,30000.00,100000.00")
+
+    def test_unknown_export_is_404(self):
+        response = self.client.get(reverse("ledger_export", args=["entries", "pdf"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class PeriodRollupTests(AuthedTestCase):
+    def test_rollups_follow_entry_and_cash_writes(self):
+        # 2026-01-30 (Jumat) dan 2026-02-02 (Senin): beda minggu & beda bulan
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-01-30"))
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-02-02"))
+        self.client.post(
+            reverse("cash_create"),
+            {"date": "2026-02-03", "flow": "OUT", "category": "Gas", "amount": "50000", "notes": ""},
+        )
+        entry = DailyEntry.objects.get(date=date(2026, 1, 30))
+        self.client.post(reverse("entry_edit", args=[entry.pk]), self.entry_post(date="2026-02-04"))
+
+        self.assertEqual(ledger.rollup_drift(self.contract.pk), {})
+        feb = PeriodRollup.objects.get(contract=self.contract, period="M", period_start=date(2026, 2, 1))
+        self.assertEqual(feb.entry_count, 2)
+        self.assertEqual(feb.manual_out, Decimal("50000"))
+
+        response = self.client.get(reverse("trend_json"), {"period": "M"})
+        rows = response.json()["rows"]
+        self.assertEqual([r["period_start"] for r in rows], ["2026-02-01"])
+        self.assertEqual(Decimal(rows[0]["revenue"]), Decimal("3000000"))
+
+
+class ArAgingTests(AuthedTestCase):
+    def credit(self, day, due, paid="0"):
+        return DailyEntry.objects.create(
+            contract=self.contract,
+            date=day,
+            portions=10,  # 150.000
+            payment_type="CREDIT",
+            paid_amount=Decimal(paid),
+            credit_due_date=due,
+        )
+
+    def test_buckets_in_one_query(self):
+        as_of = date(2026, 4, 1)
+        self.credit(date(2026, 3, 25), date(2026, 4, 10), paid="50000")  # current: 100.000
+        self.credit(date(2026, 3, 1), date(2026, 3, 20))  # 12 hari
+        self.credit(date(2026, 2, 1), date(2026, 2, 15))  # 45 hari
+        self.credit(date(2026, 1, 2), date(2026, 1, 10))  # 81 hari
+        self.credit(date(2026, 1, 3), date(2026, 1, 10), paid="150000")  # lunas: tidak dihitung
+        self.credit(date(2026, 3, 30), None)  # tanpa jatuh tempo: current
+
+        with self.assertNumQueries(1):
+            aging = reports.ar_aging(self.contract, as_of=as_of)
+
+        amounts = {b["key"]: b["amount"] for b in aging["buckets"]}
+        self.assertEqual(amounts, {
+            "current": Decimal("250000"),
+            "d1_30": Decimal("150000"),
+            "d31_60": Decimal("150000"),
+            "d60_plus": Decimal("150000"),
+        })
+        self.assertEqual(aging["count"], 5)
+        self.assertEqual(aging["total"], Decimal("700000"))
+
+    def test_partial_payments_update_entry_and_summary(self):
+        entry = self.credit(date(2026, 1, 5), date(2026, 1, 20))
+        ledger.rebuild_summary(self.contract.pk)
+
+        url = reverse("credit_payment_create", args=[entry.pk])
+        self.client.post(url, {"date": "2026-01-25", "amount": "100000", "notes": ""})
+        response = self.client.post(url, {"date": "2026-01-26", "amount": "60000", "notes": ""})
+        self.assertContains(response, "melebihi sisa piutang")
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.paid_amount, Decimal("100000"))
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+        self.assertEqual(ledger.get_summary(self.contract).paid_credit, Decimal("100000"))
+
+        payment = entry.payments.get()
+        self.client.post(reverse("credit_payment_delete", args=[payment.pk]))
+        entry.refresh_from_db()
+        self.assertEqual(entry.paid_amount, 0)
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+        self.assertEqual(self.client.get(reverse("ar_report")).status_code, 200)
+
+
+    def test_paid_amount_is_derived_from_payments(self):
+        entry = self.credit(date(2026, 1, 5), date(2026, 1, 20), paid="30000")  # DP saat input
+        ledger.rebuild_summary(self.contract.pk)
+
+        ledger.add_credit_payment(CreditPayment(entry=entry, date=date(2026, 1, 25), amount=Decimal("20000")))
+        entry.refresh_from_db()
+        self.assertEqual(entry.paid_amount, Decimal("50000"))
+        self.assertEqual(entry.payments.aggregate(t=Sum("amount"))["t"], entry.paid_amount)
+        with self.assertRaises(ledger.PaymentExceedsOutstanding):
+            ledger.add_credit_payment(CreditPayment(entry=entry, date=date(2026, 1, 26), amount=Decimal("100001")))
+
+        # hapus ganda (dua request dengan objek yang sama): paid_amount tetap = total yang tersisa
+        dp = entry.payments.get(notes=ledger.INITIAL_PAYMENT_NOTE)
+        again = CreditPayment.objects.get(pk=dp.pk)
+        ledger.delete_credit_payment(dp)
+        ledger.delete_credit_payment(again)
+        entry.refresh_from_db()
+        self.assertEqual(entry.paid_amount, Decimal("20000"))
+        ledger.delete_credit_payment(entry.payments.get())
+
+        # ada pembayaran: tipe & nominal dibayar tidak bisa diubah dari form edit
+        ledger.add_credit_payment(CreditPayment(entry=entry, date=date(2026, 1, 25), amount=Decimal("40000")))
+        self.client.post(
+            reverse("entry_edit", args=[entry.pk]),
+            self.entry_post(date="2026-01-05", portions=10, payment_type="CASH", paid_amount="999999"),
+        )
+        entry.refresh_from_db()
+        self.assertEqual((entry.payment_type, entry.paid_amount), ("CREDIT", Decimal("40000")))
+        self.assertEqual(ledger.summary_drift(self.contract.pk), {})
+
+class AlertTests(AuthedTestCase):
+    def post_day(self, day, material="700000", **overrides):
+        return self.client.post(
+            reverse("entry_create"), self.entry_post(date=f"2026-01-{day:02d}", cost_material=material, **overrides)
+        )
+
+    def active(self):
+        return {(a.rule, a.key) for a in alerts.active_alerts(self.contract)}
+
+    def test_margin_alert_raised_on_save_and_resolved(self):
+        # biaya 16.000/porsi -> margin -1.000, di bawah target 3.000
+        for day in (1, 2, 3):
+            self.post_day(day, material="1300000")
+        self.assertIn((Alert.MARGIN_LOW, ""), self.active())
+        self.assertContains(self.client.get(reverse("dashboard")), "Margin di bawah target 3 hari berturut-turut.")
+
+        self.post_day(4)
+        self.assertNotIn((Alert.MARGIN_LOW, ""), self.active())
+        alert = Alert.objects.get(contract=self.contract, rule=Alert.MARGIN_LOW)
+        self.assertFalse(alert.is_active)
+        self.assertIsNotNone(alert.resolved_at)
+
+    def test_cost_spike_vs_rolling_mean(self):
+        for day in (1, 2, 3, 4):
+            self.post_day(day)
+        self.assertEqual(self.active(), set())
+
+        self.post_day(5, material="1400000")  # bahan 14.000/porsi vs rata-rata 7.000
+        self.assertEqual(self.active(), {(Alert.COST_SPIKE, "cost_material")})
+        alert = alerts.active_alerts(self.contract).get()
+        self.assertEqual((alert.value, alert.threshold), (Decimal("14000.00"), Decimal("7000.00")))
+        self.assertIn("naik 100%", alert.message)
+
+    def test_ar_overdue_and_notifications(self):
+        self.post_day(1, payment_type="CREDIT", paid_amount="500000", credit_due_date="2026-01-10")
+        alert = alerts.active_alerts(self.contract).get()
+        self.assertEqual((alert.rule, alert.value), (Alert.AR_OVERDUE, Decimal("1000000.00")))
+
+        out = io.StringIO()
+        call_command("check_alerts", stdout=out)
+        self.assertIn("Piutang lewat jatuh tempo Rp 1.000.000 (1 entri).", out.getvalue())
+
+        out = io.StringIO()
+        call_command("check_alerts", stdout=out)
+        self.assertIn("0 alert baru.", out.getvalue())
+
+        # dibayar lunas -> alert selesai
+        entry = DailyEntry.objects.get(contract=self.contract)
+        self.client.post(
+            reverse("credit_payment_create", args=[entry.pk]), {"date": "2026-01-20", "amount": "1000000", "notes": ""}
+        )
+        self.assertEqual(self.active(), set())
+
+
+class JournalTests(AuthedTestCase):
+    def test_every_mutation_is_journaled_and_replayable(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        entry = DailyEntry.objects.get(contract=self.contract)
+        self.client.post(reverse("entry_edit", args=[entry.pk]), self.entry_post(portions=120))
+        self.client.post(
+            reverse("cash_create"), {"date": "2026-01-05", "flow": "OUT", "category": "Gas", "amount": "50000", "notes": ""}
+        )
+        self.client.post(reverse("entry_delete", args=[entry.pk]))
+
+        events = list(LedgerEvent.objects.filter(contract=self.contract))
+        self.assertEqual(
+            [(e.source, e.action) for e in events],
+            [("entry", "create"), ("entry", "update"), ("cash", "create"), ("entry", "delete")],
+        )
+        self.assertEqual(events[1].changes["portions"], [100, 120])
+        self.assertEqual(events[1].delta["portions"], 20)
+        self.assertEqual(events[3].object_id, entry.pk)
+
+        # jarakkan waktu event supaya "as of" tidak ambigu
+        base = timezone.now() - timedelta(hours=4)
+        for i, e in enumerate(events):
+            LedgerEvent.objects.filter(pk=e.pk).update(at=base + timedelta(hours=i))
+
+        after_edit = journal.replay(self.contract, base + timedelta(hours=1, minutes=30))
+        self.assertEqual((after_edit.portions, after_edit.cost_material), (120, Decimal("700000")))
+        self.assertEqual(after_edit.manual_out, 0)
+        self.assertEqual(journal.replay(self.contract, base - timedelta(hours=1)).entry_count, 0)
+        self.assertEqual(journal.replay_drift(self.contract), {})
+
+    @override_settings(LEDGER_SNAPSHOT_EVERY=2)
+    def test_replay_starts_from_nearest_snapshot(self):
+        for day in range(1, 6):
+            self.client.post(reverse("entry_create"), self.entry_post(date=f"2026-01-{day:02d}"))
+        self.assertEqual(LedgerSnapshot.objects.filter(contract=self.contract).count(), 2)
+
+        with self.assertNumQueries(2):  # snapshot + sisa event
+            replayed = journal.replay(self.contract)
+        self.assertEqual((replayed.entry_count, replayed.portions), (5, 500))
+
+        out = io.StringIO()
+        call_command("replay_ledger", self.contract.pk, "--check", stdout=out)
+        self.assertIn("cocok", out.getvalue())
+
+    def test_import_and_rebuild_are_journaled(self):
+        csv_body = "date,portions,cost_material\n2026-01-01,100,700000\n2026-01-02,100,700000\n"
+        importers.import_ledger(self.contract, "entries", io.BytesIO(csv_body.encode()), "x.csv")
+        events = list(LedgerEvent.objects.filter(contract=self.contract))
+        self.assertEqual([(e.source, e.action) for e in events], [("import", "create")] * 2)
+        self.assertEqual((events[0].changes["date"], events[0].delta["portions"]), ("2026-01-01", 100))
+
+        # baris yang ditimpa import dicatat per baris dengan nilai lama -> baru
+        csv_body = "date,portions,cost_material\n2026-01-02,80,700000\n"
+        importers.import_ledger(self.contract, "entries", io.BytesIO(csv_body.encode()), "y.csv")
+        update = LedgerEvent.objects.filter(contract=self.contract).last()
+        self.assertEqual((update.action, update.changes["portions"], update.delta["portions"]), ("update", [100, 80], -20))
+
+        # drift yang diperbaiki rebuild ikut tercatat, supaya replay tetap sama dengan ringkasan
+        DailyEntry.objects.filter(contract=self.contract, date=date(2026, 1, 2)).update(portions=90)
+        ledger.rebuild_summary(self.contract.pk)
+        ledger.rebuild_summary(self.contract.pk)  # tidak ada perubahan -> tidak ada event
+        rebuild = LedgerEvent.objects.filter(contract=self.contract).last()
+        self.assertEqual((rebuild.source, rebuild.delta), ("rebuild", {"portions": 10}))
+        self.assertEqual(LedgerEvent.objects.filter(contract=self.contract).count(), 4)
+        self.assertEqual(journal.replay_drift(self.contract), {})
+
+
+class ApiETagTests(AuthedTestCase):
+    def test_kpi_returns_304_until_data_changes(self):
+        url = reverse("api_kpi", args=[self.contract.pk])
+        self.client.post(reverse("entry_create"), self.entry_post())
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["kpi"]["total_portions"], 100)
+        etag = first["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        with self.assertNumQueries(1):  # versi saja; sesi dari cache
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-01-06"))
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+        # ubah harga kontrak juga mengubah versi
+        self.contract.price_per_portion = Decimal("16000")
+        self.contract.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=changed["ETag"]).status_code, 200)
+
+    def test_cashflow_etag_changes_at_midnight(self):
+        url = reverse("api_cashflow", args=[self.contract.pk])
+        self.client.post(reverse("entry_create"), self.entry_post())
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch("core.api.timezone.localdate", return_value=tomorrow):
+            moved = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(moved.status_code, 200)
+        self.assertNotEqual(moved["ETag"], etag)
+
+    def test_requires_login(self):
+        self.client.session.flush()
+        self.client.cookies.clear()
+        response = self.client.get(reverse("api_series", args=[self.contract.pk]))
+        self.assertEqual(response.status_code, 401)
+
+
+class StaticAssetTests(AuthedTestCase):
+    def test_pages_use_static_files_instead_of_inline_code(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        html = self.client.get(reverse("dashboard")).content.decode()
+
+        self.assertIn("/static/core/css/app.css", html)
+        self.assertIn("/static/core/js/dashboard.js", html)
+        self.assertNotIn("<style>", html)
+        # satu-satunya <script> inline: data chart dari json_script
+        self.assertEqual(html.count("<script>"), 0)
+        self.assertEqual(html.count('<script id="dashboardData" type="application/json">'), 1)
+
+    def test_vendor_url_falls_back_to_cdn_only_in_debug(self):
+        from .assets import VENDOR, check_vendored, is_vendored, vendor_url
+
+        path, origin, _integrity = VENDOR["chart.js"]
+        is_vendored.cache_clear()
+        with mock.patch("core.assets.finders.find", return_value=None):
+            with override_settings(DEBUG=True):
+                self.assertEqual(vendor_url("chart.js"), origin)
+                self.assertEqual(check_vendored(), [])
+            with override_settings(DEBUG=False):
+                self.assertEqual(vendor_url("chart.js"), settings.STATIC_URL + path)
+                self.assertEqual([w.id for w in check_vendored()], ["core.W001"])
+        is_vendored.cache_clear()
+        with mock.patch("core.assets.finders.find", return_value="/x"):
+            self.assertEqual(vendor_url("chart.js"), settings.STATIC_URL + path)
+        is_vendored.cache_clear()
+
+
+    def test_vendor_assets_refuses_unpinned_or_mismatched_download(self):
+        from .assets import VENDOR
+        from .management.commands import vendor_assets
+
+        body = b"/*! asset */\nbody{}\n/*# sourceMappingURL=x.map */"
+        pinned = {
+            "ok": ("core/vendor/ok.css", "https://cdn.test/ok.css", vendor_assets.sri(body)),
+            "bad": ("core/vendor/bad.css", "https://cdn.test/bad.css", vendor_assets.sri(b"lain")),
+            "unpinned": ("core/vendor/new.js", "https://cdn.test/new.js", None),
+        }
+        self.assertIsNotNone(VENDOR["bootstrap.css"][2])
+
+        def run(vendor, *args):
+            download = mock.MagicMock()
+            download.__enter__.return_value.read.return_value = body
+            with mock.patch.object(vendor_assets, "STATIC_DIR", Path(tmp)), mock.patch.object(
+                vendor_assets, "VENDOR", vendor
+            ), mock.patch.object(vendor_assets.urllib.request, "urlopen", return_value=download):
+                call_command("vendor_assets", *args, stdout=io.StringIO())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            run({"ok": pinned["ok"]})
+            self.assertEqual((Path(tmp) / "core/vendor/ok.css").read_bytes(), b"/*! asset */\nbody{}\n")
+
+            with self.assertRaisesMessage(CommandError, "tidak cocok"):
+                run({"bad": pinned["bad"]})
+            self.assertFalse((Path(tmp) / "core/vendor/bad.css").exists())
+
+            with self.assertRaisesMessage(CommandError, "belum dipin"):
+                run({"unpinned": pinned["unpinned"]})
+            self.assertFalse((Path(tmp) / "core/vendor/new.js").exists())
+            run({"unpinned": pinned["unpinned"]}, "--pin", "unpinned")
+            self.assertTrue((Path(tmp) / "core/vendor/new.js").exists())
+
+    def test_bootstrap_is_committed(self):
+        from django.contrib.staticfiles import finders
+
+        from .assets import VENDOR
+
+        self.assertIsNotNone(finders.find(VENDOR["bootstrap.css"][0]))
+
+class ConditionalGetTests(AuthedTestCase):
+    def test_history_returns_304_until_next_write(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        url = reverse("history")
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("Last-Modified", first)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        with self.assertNumQueries(1):  # versi ringkasan saja
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], first["ETag"])
+
+        self.client.post(reverse("entry_create"), self.entry_post(date="2026-01-06"))
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, "06 Jan 2026")
+
+    def test_dashboard_revalidates_without_db(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        etag = self.client.get(reverse("dashboard"))["ETag"]
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(reverse("dashboard"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        self.contract.price_per_portion = Decimal("16000")
+        self.contract.save()
+        self.assertEqual(self.client.get(reverse("dashboard"), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_portfolio_etag_changes_with_new_contract(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        etag = self.client.get(reverse("portfolio"))["ETag"]
+        self.assertEqual(self.client.get(reverse("portfolio"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Contract.objects.create(
+            name="Kontrak Baru",
+            start_date=date(2026, 2, 1),
+            duration_days=30,
+            price_per_portion=Decimal("10000"),
+            target_portions_per_day=10,
+            target_margin_pct=Decimal("25"),
+            is_active=False,
+        )
+        self.assertEqual(self.client.get(reverse("portfolio"), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_html_is_gzipped_when_accepted(self):
+        self.client.post(reverse("entry_create"), self.entry_post())
+        response = self.client.get(reverse("cash_list"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(b"Kontrak Uji", gzip.decompress(response.content))
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path("login/", views.login_view, name="login"),
@@ -8,13 +8,31 @@ urlpatterns = [
     path("", views.dashboard, name="dashboard"),
     path("contract/", views.contract_setup, name="contract_setup"),
     path("entry/new/", views.entry_create, name="entry_create"),
+    path("entry/batch/", views.entry_batch, name="entry_batch"),
     path("history/", views.history, name="history"),
+    path("portfolio/", views.portfolio, name="portfolio"),
     path("profit/", views.profit_summary, name="profit_summary"),
     path("cashflow/", views.cashflow, name="cashflow"),
+    path("reports/trend/", views.trend_report, name="trend_report"),
+    path("reports/trend.json", views.trend_json, name="trend_json"),
+    path("reports/ingredients/", views.ingredient_report, name="ingredient_report"),
     path("entry/<int:pk>/edit/", views.entry_edit, name="entry_edit"),
     path("entry/<int:pk>/delete/", views.entry_delete, name="entry_delete"),
+    path("entry/<int:pk>/purchases/", views.entry_purchases, name="entry_purchases"),
+    path("purchase/<int:pk>/delete/", views.purchase_delete, name="purchase_delete"),
+    path("ar/", views.ar_report, name="ar_report"),
+    path("ar/entry/<int:pk>/pay/", views.credit_payment_create, name="credit_payment_create"),
+    path("ar/payment/<int:pk>/delete/", views.credit_payment_delete, name="credit_payment_delete"),
+    path("import/", views.ledger_import, name="ledger_import"),
+    path("export/<slug:kind>.<slug:fmt>", views.ledger_export, name="ledger_export"),
+    path("debug/cache/", views.cache_stats, name="cache_stats"),
+    path("debug/perf/", views.perf_report, name="perf_report"),
     path("cash/", views.cash_list, name="cash_list"),
     path("cash/new/", views.cash_create, name="cash_create"),
     path("cash/<int:pk>/edit/", views.cash_edit, name="cash_edit"),
     path("cash/<int:pk>/delete/", views.cash_delete, name="cash_delete"),
+
+    path("api/v1/contracts/<int:contract_id>/kpi/", api.kpi, name="api_kpi"),
+    path("api/v1/contracts/<int:contract_id>/series/", api.series, name="api_series"),
+    path("api/v1/contracts/<int:contract_id>/cashflow/", api.cashflow, name="api_cashflow"),
 ]
@@ -1,21 +1,42 @@
 from __future__ import annotations
 
-import json
-from datetime import timedelta
+import asyncio
+from datetime import date, timedelta
 
-from django.db.models import Sum
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils.timezone import now
 from django.views.decorators.http import require_http_methods
 
-from .auth import SESSION_KEY, require_auth, verify_login
-from .forms import CashTransactionForm, ContractForm, DailyEntryForm
-from .models import CashTransaction, Contract, DailyEntry
+from . import alerts, contracts, exports, forecast, fragments, importers, ledger, money, perf, reports
+from .auth import SESSION_KEY, login_keys, login_limiter, require_auth, verify_login
+from .conditional import conditional_page, fragment_state, portfolio_state
+from .forms import (
+    CashTransactionForm,
+    ContractForm,
+    CreditPaymentForm,
+    DailyEntryBatchFormSet,
+    DailyEntryForm,
+    LedgerImportForm,
+    PurchaseLineForm,
+)
+from .models import CashTransaction, Contract, CreditPayment, DailyEntry, LedgerEvent, PeriodRollup, PurchaseLine
 
 
-def get_active_contract():
-    return Contract.objects.filter(is_active=True).order_by("-created_at").first()
+def get_active_contract(request):
+    # instance yang sama dipakai seluruh request (lihat ActiveContractMiddleware)
+    return contracts.for_request(request)
+
+
+async def aget_active_contract(request):
+    return await contracts.afor_request(request)
+
+
+async def _alist(qs) -> list:
+    return [obj async for obj in qs]
 
 
 # =========================
@@ -27,10 +48,22 @@ def login_view(request):
         access_code = request.POST.get("access_code", "").strip()
         pin = request.POST.get("pin", "").strip()
 
+        # batasi dulu sebelum hashing (PBKDF2 sengaja mahal)
+        keys = login_keys(request, access_code)
+        wait = login_limiter.retry_after(*keys)
+        if wait:
+            error = f"Terlalu banyak percobaan login. Coba lagi dalam {(wait + 59) // 60} menit."
+            response = render(request, "core/login.html", {"error": error}, status=429)
+            response["Retry-After"] = str(wait)
+            return response
+
         if verify_login(access_code, pin):
+            login_limiter.reset(*keys)
+            request.session.cycle_key()
             request.session[SESSION_KEY] = True
             return redirect(reverse("dashboard"))
 
+        login_limiter.hit(*keys)
         return render(request, "core/login.html", {"error": "Access Code atau PIN salah."})
 
     return render(request, "core/login.html")
@@ -44,163 +77,196 @@ def logout_view(request):
 # =========================
 # DASHBOARD
 # =========================
+DASHBOARD_FRAGMENTS = {
+    "dashboard_alerts": "core/dashboard_alerts.html",
+    "dashboard_kpi": "core/dashboard_kpi.html",
+    "dashboard_charts": "core/dashboard_charts.html",
+    "dashboard_progress": "core/dashboard_progress.html",
+}
+
+
+async def _dashboard_context(c) -> dict:
+    data, projection, active_alerts = await asyncio.gather(
+        reports.adashboard_data(c),
+        sync_to_async(forecast.cached_forecast)(c),
+        _alist(alerts.active_alerts(c)),  # sudah dihitung saat tulis (core/alerts.py)
+    )
+    return {
+        **data["kpi"],
+        "alerts": active_alerts,
+        "forecast": projection,
+        "chart_data": {
+            "labels": data["labels"],
+            "margin": data["margin_series"],
+            "target": data["target_series"],
+            "donut": data["donut"],
+        },
+    }
+
+
 @require_auth
-def dashboard(request):
-    c = get_active_contract()
+@conditional_page(fragment_state)
+async def dashboard(request):
+    c = await aget_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
-    entries_qs = DailyEntry.objects.filter(contract=c).order_by("date")
+    # fragmen KPI/grafik di-cache per versi data kontrak; hanya dihitung ulang setelah ada input
+    html = await fragments.arender_many(c.pk, DASHBOARD_FRAGMENTS, lambda: _dashboard_context(c))
+    return render(request, "core/dashboard.html", {"contract": c, **html})
 
-    agg = entries_qs.aggregate(
-        total_portions=Sum("portions"),
-        mat=Sum("cost_material"),
-        lab=Sum("cost_labor"),
-        ovh=Sum("cost_overhead"),
+
+# =========================
+# PORTFOLIO (semua kontrak)
+# =========================
+@require_auth
+@conditional_page(portfolio_state)
+def portfolio(request):
+    rows = reports.portfolio()
+    return render(
+        request,
+        "core/portfolio.html",
+        {
+            "rows": rows,
+            "total_revenue": sum((r["revenue"] for r in rows), money.ZERO),
+            "total_profit": sum((r["profit"] for r in rows), money.ZERO),
+            "total_ar": sum((r["ar_outstanding"] for r in rows), money.ZERO),
+        },
     )
 
-    total_portions = int(agg["total_portions"] or 0)
-    sum_mat = float(agg["mat"] or 0)
-    sum_lab = float(agg["lab"] or 0)
-    sum_ovh = float(agg["ovh"] or 0)
-    total_cost = sum_mat + sum_lab + sum_ovh
 
-    price = float(c.price_per_portion)
-    revenue = total_portions * price
-    profit = revenue - total_cost
+# =========================
+# PROFIT SUMMARY
+# =========================
+async def _profit_context(c) -> dict:
+    summary = await ledger.aget_summary(c)
 
-    cpp = (total_cost / total_portions) if total_portions > 0 else 0.0
-    mpp = price - cpp
+    total_cost = summary.total_cost
+    revenue = summary.portions * c.price_per_portion
+    profit = revenue - total_cost
+    margin_pct = money.ratio(profit * money.HUNDRED, revenue).quantize(money.CENT)
+    return {
+        "revenue": revenue,
+        "total_cost": total_cost,
+        "profit": profit,
+        "margin_pct": margin_pct,
+    }
 
-    target_margin_pct = float(c.target_margin_pct)
-    target_margin_per_portion = price * (target_margin_pct / 100.0)
-    target_cost_per_portion = price - target_margin_per_portion
 
-    target_total_portions = int(c.target_portions_per_day * c.duration_days)
-    target_profit_total = target_margin_per_portion * target_total_portions
+@require_auth
+@conditional_page(fragment_state)
+async def profit_summary(request):
+    c = await aget_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
 
-    progress_portions = (
-        (total_portions / target_total_portions * 100.0) if target_total_portions > 0 else 0.0
+    html = await fragments.arender_many(
+        c.pk, {"profit_summary_cards": "core/profit_summary_cards.html"}, lambda: _profit_context(c)
     )
+    return render(request, "core/profit_summary.html", {"contract": c, **html})
 
-    projected_profit = (price - cpp) * target_total_portions if target_total_portions > 0 else 0.0
-    dev_vs_target_pct = (
-        ((projected_profit - target_profit_total) / target_profit_total * 100.0)
-        if target_profit_total
-        else 0.0
-    )
 
-    # chart data
-    labels: list[str] = []
-    margin_series: list[float] = []
-    target_series: list[float] = []
-
-    for e in entries_qs:
-        labels.append(e.date.strftime("%d %b"))
-        portions = float(e.portions or 0)
-        tcost = float(e.total_cost)
-        cpp_day = (tcost / portions) if portions > 0 else 0.0
-        margin_series.append(round(price - cpp_day, 2))
-        target_series.append(round(target_margin_per_portion, 2))
-
-    # early warning: 3 hari terakhir di bawah target margin/porsi
-    warn = False
-    warn_text = None
-    last3 = list(entries_qs.order_by("-date")[:3])
-    if len(last3) == 3:
-        below = 0
-        for e in last3:
-            portions = float(e.portions or 0)
-            tcost = float(e.total_cost)
-            cpp_day = (tcost / portions) if portions > 0 else 0.0
-            mpp_day = price - cpp_day
-            if mpp_day < target_margin_per_portion:
-                below += 1
-        if below == 3:
-            warn = True
-            warn_text = "Margin di bawah target 3 hari berturut-turut."
+@require_auth
+def cache_stats(request):
+    return JsonResponse(fragments.stats())
 
-    ctx = {
-        "contract": c,
-        "kpi_mpp": mpp,
-        "kpi_cpp": cpp,
-        "kpi_profit": profit,
-        "kpi_projected_profit": projected_profit,
-        "price": price,
-        "target_margin_per_portion": target_margin_per_portion,
-        "target_cost_per_portion": target_cost_per_portion,
-        "total_portions": total_portions,
-        "revenue": revenue,
-        "total_cost": total_cost,
-        "progress_portions": progress_portions,
-        "target_total_portions": target_total_portions,
-        "target_profit_total": target_profit_total,
-        "dev_vs_target_pct": dev_vs_target_pct,
-        "sum_mat": sum_mat,
-        "sum_lab": sum_lab,
-        "sum_ovh": sum_ovh,
-        "chart_labels_json": json.dumps(labels),
-        "chart_margin_json": json.dumps(margin_series),
-        "chart_target_json": json.dumps(target_series),
-        "donut_cost_json": json.dumps([sum_mat, sum_lab, sum_ovh]),
-        "warn": warn,
-        "warn_text": warn_text,
-    }
 
-    return render(request, "core/dashboard.html", ctx)
+@require_auth
+def perf_report(request):
+    return render(
+        request,
+        "core/perf.html",
+        {
+            "enabled": settings.PERF_ENABLED,
+            "buffer_size": settings.PERF_BUFFER_SIZE,
+            "rows": perf.report(),
+            "recent": perf.recent(),
+            "cache": fragments.stats(),
+        },
+    )
 
 
 # =========================
-# PROFIT SUMMARY
+# TREND (mingguan / bulanan)
 # =========================
+def _trend_period(request):
+    period = request.GET.get("period", PeriodRollup.MONTH)
+    return period if period in dict(PeriodRollup.PERIOD_CHOICES) else PeriodRollup.MONTH
+
+
 @require_auth
-def profit_summary(request):
-    c = get_active_contract()
+@conditional_page()
+def trend_report(request):
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
-    entries = DailyEntry.objects.filter(contract=c)
-
-    agg = entries.aggregate(
-        portions=Sum("portions"),
-        mat=Sum("cost_material"),
-        lab=Sum("cost_labor"),
-        ovh=Sum("cost_overhead"),
+    ledger.get_summary(c)  # pastikan rollup sudah dibangun
+    period = _trend_period(request)
+    return render(
+        request,
+        "core/trend.html",
+        {
+            "contract": c,
+            "period": period,
+            "period_choices": PeriodRollup.PERIOD_CHOICES,
+            "rows": reports.trend(c, period),
+        },
     )
 
-    total_portions = float(agg["portions"] or 0)
-    total_cost = float((agg["mat"] or 0) + (agg["lab"] or 0) + (agg["ovh"] or 0))
 
-    price = float(c.price_per_portion)
-    revenue = total_portions * price
-    profit = revenue - total_cost
-    margin_pct = (profit / revenue * 100) if revenue else 0.0
+def _date_param(request, name, default):
+    try:
+        return date.fromisoformat(request.GET.get(name) or "")
+    except ValueError:
+        return default
+
+
+@require_auth
+@conditional_page()
+def ingredient_report(request):
+    c = get_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
 
+    end = _date_param(request, "end", now().date())
+    start = _date_param(request, "start", end - timedelta(days=29))
+    limit = request.GET.get("top", "")
+    limit = min(int(limit), 100) if limit.isdigit() and int(limit) > 0 else 10
     return render(
         request,
-        "core/profit_summary.html",
-        {
-            "contract": c,
-            "revenue": revenue,
-            "total_cost": total_cost,
-            "profit": profit,
-            "margin_pct": margin_pct,
-        },
+        "core/ingredients.html",
+        {"contract": c, "start": start, "end": end, "top": limit, **reports.top_ingredients(c, start, end, limit)},
     )
 
 
+@require_auth
+@conditional_page()
+def trend_json(request):
+    c = get_active_contract(request)
+    if not c:
+        return JsonResponse({"error": "Belum ada kontrak aktif."}, status=404)
+
+    ledger.get_summary(c)
+    period = _trend_period(request)
+    return JsonResponse({"contract": c.pk, "period": period, "rows": reports.trend(c, period)})
+
+
 # =========================
 # CONTRACT SETUP
 # =========================
 @require_auth
 @require_http_methods(["GET", "POST"])
 def contract_setup(request):
-    c = get_active_contract()
+    c = get_active_contract(request)
 
     if request.method == "POST":
-        form = ContractForm(request.POST, instance=c)
+        # edit salinan dari DB, bukan instance yang di-cache
+        instance = Contract.objects.filter(pk=c.pk).first() if c else None
+        form = ContractForm(request.POST, instance=instance)
         if form.is_valid():
             Contract.objects.update(is_active=False)
+            contracts.invalidate_active_contract()
             obj = form.save(commit=False)
             obj.is_active = True
             obj.save()
@@ -217,7 +283,7 @@ def contract_setup(request):
 @require_auth
 @require_http_methods(["GET", "POST"])
 def entry_create(request):
-    c = get_active_contract()
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
@@ -228,10 +294,9 @@ def entry_create(request):
             obj.contract = c
 
             # AUTO ISI paid_amount kalau Tunai dan kosong
-            if obj.payment_type == "CASH" and (obj.paid_amount is None or float(obj.paid_amount) == 0):
-                obj.paid_amount = float(obj.portions or 0) * float(c.price_per_portion)
+            ledger.autofill_paid_amount(obj, c)
 
-            obj.save()
+            ledger.save_entry(obj)
             return redirect("history")
     else:
         form = DailyEntryForm()
@@ -240,38 +305,86 @@ def entry_create(request):
 
 
 @require_auth
+@require_http_methods(["GET", "POST"])
+def entry_batch(request):
+    """Input Massal: beberapa hari sekaligus, satu transaksi (tanggal yang sudah ada ditimpa)."""
+    c = get_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
+
+    if request.method == "POST":
+        formset = DailyEntryBatchFormSet(request.POST, contract=c)
+        if formset.is_valid():
+            entries = []
+            for form in formset:
+                if not form.has_changed():
+                    continue  # baris yang dibiarkan kosong
+                obj = form.save(commit=False)
+                ledger.autofill_paid_amount(obj, c)
+                entries.append(obj)
+            try:
+                if entries:
+                    ledger.bulk_upsert_entries(c, entries, source=LedgerEvent.BATCH)
+                return redirect("history")
+            except ledger.EntryConflict as exc:
+                # pelunasan baru saja dicatat dari tempat lain sejak form divalidasi
+                formset.non_form_errors().append(
+                    f"Tanggal {exc} sudah ada pelunasan piutang; ubah lewat Edit di History."
+                )
+    else:
+        # satu minggu, lanjut dari hari sesudah input terakhir
+        last = DailyEntry.objects.filter(contract=c).order_by("-date").values_list("date", flat=True).first()
+        start = last + timedelta(days=1) if last else c.start_date
+        formset = DailyEntryBatchFormSet(
+            initial=[{"date": start + timedelta(days=i)} for i in range(DailyEntryBatchFormSet.extra)]
+        )
+
+    return render(request, "core/entry_batch.html", {"formset": formset, "contract": c})
+
+
+@require_auth
+@conditional_page()
 def history(request):
-    c = get_active_contract()
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
-    entries = DailyEntry.objects.filter(contract=c).order_by("-date", "-id")
-    return render(request, "core/history.html", {"contract": c, "entries": entries})
+    cursor = reports.parse_cursor(request.GET.get("after"))
+    entries, next_cursor = reports.history_page(c, cursor, settings.HISTORY_PAGE_SIZE)
+    ctx = {"contract": c, "entries": entries, "next_cursor": next_cursor}
+
+    # "muat lagi": hanya baris tabel berikutnya
+    if request.GET.get("partial"):
+        return render(request, "core/history_rows.html", ctx)
+    return render(request, "core/history.html", ctx)
 
 
 @require_auth
 @require_http_methods(["GET", "POST"])
 def entry_edit(request, pk):
-    c = get_active_contract()
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
     obj = get_object_or_404(DailyEntry, pk=pk, contract=c)
 
+    has_purchases = obj.purchases.exists()
+    has_payments = obj.payments.exists()
     if request.method == "POST":
         form = DailyEntryForm(request.POST, instance=obj)
+        _lock_derived(form, has_purchases, has_payments)
         if form.is_valid():
             edited = form.save(commit=False)
             edited.contract = c
 
             # auto isi paid_amount jika tunai & kosong
-            if edited.payment_type == "CASH" and (edited.paid_amount is None or float(edited.paid_amount) == 0):
-                edited.paid_amount = float(edited.portions or 0) * float(c.price_per_portion)
+            ledger.autofill_paid_amount(edited, c)
 
-            edited.save()
+            ledger.save_entry(edited)
             return redirect("history")
     else:
         form = DailyEntryForm(instance=obj)
+        _lock_derived(form, has_purchases, has_payments)
 
     return render(
         request,
@@ -281,130 +394,229 @@ def entry_edit(request, pk):
             "contract": c,
             "is_edit": True,
             "entry": obj,
+            "has_purchases": has_purchases,
+            "has_payments": has_payments,
         },
     )
 
 
+def _lock_derived(form, has_purchases: bool, has_payments: bool) -> None:
+    # biaya bahan = total rincian bahan; diubah lewat halaman rincian
+    if has_purchases:
+        form.fields["cost_material"].disabled = True
+    # dibayar = total pelunasan; diubah lewat halaman piutang
+    if has_payments:
+        form.fields["payment_type"].disabled = True
+        form.fields["paid_amount"].disabled = True
+
+
 @require_auth
 @require_http_methods(["GET", "POST"])
 def entry_delete(request, pk):
-    c = get_active_contract()
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
     obj = get_object_or_404(DailyEntry, pk=pk, contract=c)
 
     if request.method == "POST":
-        obj.delete()
+        ledger.delete_entry(obj)
         return redirect("history")
 
     return render(request, "core/entry_confirm_delete.html", {"entry": obj, "contract": c})
 
 
 # =========================
-# CASHFLOW (from DailyEntry)
+# RINCIAN BAHAN (purchase lines)
 # =========================
 @require_auth
-def cashflow(request):
-    c = get_active_contract()
+@require_http_methods(["GET", "POST"])
+def entry_purchases(request, pk):
+    c = get_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
+
+    entry = get_object_or_404(DailyEntry, pk=pk, contract=c)
+    form = PurchaseLineForm(request.POST or None, entry=entry, initial={"unit": "kg"})
+    if request.method == "POST" and form.is_valid():
+        line = form.save(commit=False)
+        line.entry = entry
+        ledger.save_purchase(line)
+        return redirect("entry_purchases", pk=entry.pk)
+
+    return render(
+        request,
+        "core/entry_purchases.html",
+        {
+            "contract": c,
+            "entry": entry,
+            "lines": entry.purchases.select_related("cash_tx"),
+            "form": form,
+        },
+    )
+
+
+@require_auth
+@require_http_methods(["POST"])
+def purchase_delete(request, pk):
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
-    qs = DailyEntry.objects.filter(contract=c).order_by("date")
+    line = get_object_or_404(PurchaseLine, pk=pk, contract=c)
+    entry_pk = line.entry_id
+    ledger.delete_purchase(line)
+    return redirect("entry_purchases", pk=entry_pk)
 
-    price = float(c.price_per_portion)
 
-    sales_total = sum(float(e.portions or 0) * price for e in qs)
-    cash_in_total = sum(float(e.paid_amount or 0) for e in qs)
+# =========================
+# PIUTANG (AR aging + pelunasan)
+# =========================
+@require_auth
+@conditional_page()
+def ar_report(request):
+    c = get_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
 
-    credit_sales_total = sum(
-        float(e.portions or 0) * price for e in qs if e.payment_type == "CREDIT"
+    aging = reports.ar_aging(c)
+    return render(
+        request,
+        "core/ar.html",
+        {"contract": c, **aging, "items": reports.ar_open_items(c, as_of=aging["as_of"])},
     )
-    credit_paid_total = sum(float(e.paid_amount or 0) for e in qs if e.payment_type == "CREDIT")
-    ar_outstanding = max(0.0, credit_sales_total - credit_paid_total)
-
-    since = now().date() - timedelta(days=6)
-    last7 = [e for e in qs if e.date >= since]
-
-    rows = []
-    for e in last7:
-        sales = float(e.portions or 0) * price
-        cash_in = float(e.paid_amount or 0)
-        rows.append(
-            {
-                "date": e.date,
-                "payment_type": e.payment_type,
-                "sales": sales,
-                "cash_in": cash_in,
-                "due": e.credit_due_date,
-            }
-        )
+
+
+@require_auth
+@require_http_methods(["GET", "POST"])
+def credit_payment_create(request, pk):
+    c = get_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
+
+    entry = get_object_or_404(DailyEntry, pk=pk, contract=c, payment_type="CREDIT")
+    outstanding = max(money.ZERO, entry.portions * c.price_per_portion - entry.paid_amount)
+
+    form = CreditPaymentForm(request.POST or None, outstanding=outstanding, initial={"date": now().date(), "amount": outstanding})
+    if request.method == "POST" and form.is_valid():
+        payment = form.save(commit=False)
+        payment.entry = entry
+        try:
+            ledger.add_credit_payment(payment)
+            return redirect("ar_report")
+        except ledger.PaymentExceedsOutstanding:
+            # ada pembayaran lain masuk sejak form dibuka
+            form.add_error("amount", "Nominal melebihi sisa piutang.")
 
     return render(
         request,
-        "core/cashflow.html",
+        "core/credit_payment_form.html",
         {
             "contract": c,
-            "sales_total": sales_total,
-            "cash_in_total": cash_in_total,
-            "credit_sales_total": credit_sales_total,
-            "credit_paid_total": credit_paid_total,
-            "ar_outstanding": ar_outstanding,
-            "rows": rows,
+            "entry": entry,
+            "sales": entry.portions * c.price_per_portion,
+            "outstanding": outstanding,
+            "payments": entry.payments.all(),
+            "form": form,
         },
     )
 
 
+@require_auth
+@require_http_methods(["POST"])
+def credit_payment_delete(request, pk):
+    c = get_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
+
+    payment = get_object_or_404(CreditPayment, pk=pk, entry__contract=c)
+    entry_pk = payment.entry_id
+    ledger.delete_credit_payment(payment)
+    return redirect("credit_payment_create", pk=entry_pk)
+
+
 # =========================
-# CASH TRANSACTION CRUD (manual cash in/out)
+# BULK IMPORT / EXPORT (CSV / XLSX)
 # =========================
-from django.db.models import Sum
-from django.shortcuts import render, redirect, get_object_or_404
-from django.views.decorators.http import require_http_methods
-from django.utils.timezone import now
-from datetime import timedelta
+@require_auth
+@require_http_methods(["GET", "POST"])
+def ledger_import(request):
+    c = get_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
+
+    result = None
+    form = LedgerImportForm(request.POST or None, request.FILES or None)
+    if request.method == "POST" and form.is_valid():
+        upload = form.cleaned_data["file"]
+        try:
+            result = importers.import_ledger(c, form.cleaned_data["kind"], upload.file, upload.name)
+        except importers.ImportFormatError as exc:
+            form.add_error("file", str(exc))
+
+    return render(request, "core/import_form.html", {"form": form, "contract": c, "result": result})
 
-from .auth import require_auth
-from .models import CashTransaction, DailyEntry
-from .forms import CashTransactionForm
 
 @require_auth
-def cash_list(request):
-    c = get_active_contract()
+@conditional_page()
+def ledger_export(request, kind, fmt):
+    c = get_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
+
+    try:
+        return exports.export_response(c, kind, fmt)
+    except exports.ExportFormatError as exc:
+        raise Http404(str(exc)) from exc
+
+
+# =========================
+# CASHFLOW (from DailyEntry)
+# =========================
+@require_auth
+@conditional_page()
+async def cashflow(request):
+    c = await aget_active_contract(request)
+    if not c:
+        return redirect("contract_setup")
+
+    summary, rows = await asyncio.gather(ledger.aget_summary(c), reports.acashflow_rows(c, days=7))
+    totals = reports.cashflow_totals(c, summary)
+
+    return render(request, "core/cashflow.html", {"contract": c, **totals, "rows": rows})
+
+
+# =========================
+# CASH TRANSACTION CRUD (manual cash in/out)
+# =========================
+@require_auth
+@conditional_page()
+async def cash_list(request):
+    c = await aget_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
     # ---- 1) Manual cash transactions (kas real di luar penjualan harian) ----
-    tx_qs = CashTransaction.objects.filter(contract=c)
+    # ringkasan + daftar transaksi tidak saling bergantung: ambil bersamaan
+    tx_qs = CashTransaction.objects.filter(contract=c).order_by("-date", "-id")
+    summary, rows = await asyncio.gather(ledger.aget_summary(c), _alist(tx_qs))
 
-    manual_in = tx_qs.filter(flow="IN").aggregate(s=Sum("amount"))["s"] or 0
-    manual_out = tx_qs.filter(flow="OUT").aggregate(s=Sum("amount"))["s"] or 0
+    manual_in = summary.manual_in
+    manual_out = summary.manual_out
 
     # ---- 2) Cash masuk dari penjualan harian (yang benar2 dibayar) ----
-    entry_qs = DailyEntry.objects.filter(contract=c)
-
-    sales_cash_in = entry_qs.aggregate(s=Sum("paid_amount"))["s"] or 0
+    sales_cash_in = summary.paid_total
 
     # ---- 3) Total kas ----
-    total_in = float(sales_cash_in) + float(manual_in)
-    total_out = float(manual_out)
+    total_in = sales_cash_in + manual_in
+    total_out = manual_out
     net = total_in - total_out
 
     # ---- 4) Info piutang (AR) dari transaksi kredit ----
-    price = float(c.price_per_portion)
-
-    credit_sales_total = 0.0
-    credit_paid_total = 0.0
-
-    for e in entry_qs:
-        if e.payment_type == "CREDIT":
-            credit_sales_total += float(e.portions or 0) * price
-            credit_paid_total += float(e.paid_amount or 0)
-
-    ar_outstanding = max(0.0, credit_sales_total - credit_paid_total)
+    credit_sales_total = summary.credit_portions * c.price_per_portion
+    credit_paid_total = summary.paid_credit
 
-    # ---- 5) List transaksi manual untuk tabel ----
-    rows = tx_qs.order_by("-date", "-id")
+    ar_outstanding = max(money.ZERO, credit_sales_total - credit_paid_total)
 
     ctx = {
         "contract": c,
@@ -430,7 +642,7 @@ def cash_list(request):
 @require_auth
 @require_http_methods(["GET", "POST"])
 def cash_create(request):
-    c = get_active_contract()
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
@@ -438,7 +650,7 @@ def cash_create(request):
     if request.method == "POST" and form.is_valid():
         obj = form.save(commit=False)
         obj.contract = c
-        obj.save()
+        ledger.save_cash(obj)
         return redirect("cash_list")
 
     return render(request, "core/cash_form.html", {"form": form, "is_edit": False, "contract": c})
@@ -447,7 +659,7 @@ def cash_create(request):
 @require_auth
 @require_http_methods(["GET", "POST"])
 def cash_edit(request, pk):
-    c = get_active_contract()
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
@@ -457,7 +669,7 @@ def cash_edit(request, pk):
     if request.method == "POST" and form.is_valid():
         updated = form.save(commit=False)
         updated.contract = c
-        updated.save()
+        ledger.save_cash(updated)
         return redirect("cash_list")
 
     return render(request, "core/cash_form.html", {"form": form, "is_edit": True, "contract": c})
@@ -466,10 +678,10 @@ def cash_edit(request, pk):
 @require_auth
 @require_http_methods(["POST"])
 def cash_delete(request, pk):
-    c = get_active_contract()
+    c = get_active_contract(request)
     if not c:
         return redirect("contract_setup")
 
     obj = get_object_or_404(CashTransaction, pk=pk, contract=c)
-    obj.delete()
+    ledger.delete_cash(obj)
     return redirect("cash_list")
\ No newline at end of file